@@ -1,25 +1,17 @@
 # -*- coding: utf-8 -*-
 
-import sys
-from os import path
-
 __author__ = 'onelife'
 __license__ = "Apache-2.0"
 __version__ = '1.10'
 
-__setup = False
-__depth = 1
-
-while True:
-    try:
-        stack = sys._getframe(__depth)
-        if (stack.f_globals.get('__file__')):
-            path.basename(stack.f_globals.get('__file__'))
-        __depth += 1
-    except ValueError:
-        break
+__all__ = ['termslides']
 
-__setup = stack.f_globals.get('__file__') and (path.basename(stack.f_globals.get('__file__')) == 'setup.py')
 
-if not __setup:
-    from .termslides import *
+def __getattr__(name):
+    # Import the command (and everything it depends on) on first use only, so
+    # that reading "__version__" (e.g. from "setup.py") stays cheap.
+    if name in __all__:
+        from termslides.termslides import termslides
+        globals()[name] = termslides
+        return termslides
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
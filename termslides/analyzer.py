@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+from time import perf_counter
+from types import MethodType
+
+from asciimatics.event import KeyboardEvent
+from asciimatics.exceptions import StopApplication
+from asciimatics.scene import Scene
+
+from termslides.headless import HeadlessScreen
+from termslides.loader import load_slides
+from termslides.metrics import _percentile
+from termslides.residency import footprint
+from termslides.spec import compile_slides
+from termslides.termslides import patch_draw_next_frame
+from termslides.widgets import _get_effects, _reseed
+
+__all__ = ['analyze', 'report']
+
+
+class _Frames(object):
+    # frame costs, recorded as metrics
+    def __init__(self):
+        self.costs = []
+        self.frames = 0
+
+    def input(self, event):
+        pass
+
+    def idle(self):
+        self.frames += 1
+
+    def frame(self, scene, frame_no, cost):
+        self.costs.append(cost)
+        self.frames += 1
+
+    def transition(self, old, new, cost):
+        pass
+
+
+def _cells(effects):
+    # the largest image of the effects, in cells
+    cells = 0
+    for effect in effects:
+        renderer = getattr(effect, '_renderer', None)
+        if renderer is not None:
+            cells = max(cells, renderer.max_width * renderer.max_height)
+    return cells
+
+
+def _simulate(screen, effects, frames):
+    # play the slide, then its ending animation, and return the frame costs
+    screen.clear()
+    screen._metrics = metrics = _Frames()
+    scene = Scene(effects, -1)
+    screen.set_scenes([scene], unhandled_input=lambda event: None)
+    try:
+        screen.run(frames)
+        scene.process_event(KeyboardEvent(ord(' ')))
+        screen.run(frames)
+    except StopApplication:
+        pass
+    return metrics
+
+
+def analyze(filename, height=40, width=120, frames=60, seed=None):
+    """
+    Estimate the cost of each slide of a deck, without a terminal.
+
+    Each content item is built on its own, then the slide is played on a
+    headless screen for some frames, and for as many after space is pressed,
+    so that the ending animation is measured too.
+
+    :param filename: The YAML file of the deck.
+    :param height: The height of the screen.
+    :param width: The width of the screen.
+    :param frames: The frames played before and after the ending animation.
+    :param seed: Seed of the animations, the deck "seed" by default.
+    :returns: A list of dict per slide, in the deck order: "slide" name,
+        "line" of the YAML, "build_ms", "effects" count, "cells" of the largest
+        image, "frame_ms" as "mean", "p90" and "max" of the drawn frames,
+        "memory_kb" and "items", each with "type", "build_ms" and "cells".
+    """
+    deck, slides = load_slides(filename)
+    slides = compile_slides(slides)
+    seed = deck['seed'] if seed is None else seed
+    screen = HeadlessScreen(height, width)
+    screen.draw_next_frame = MethodType(patch_draw_next_frame, screen)
+
+    records = []
+    for name, slide in slides.items():
+        _reseed(seed, name, 'build')
+        items = []
+        for item in slide.items:
+            started = perf_counter()
+            # diagrams rendered now, rather than their placeholder
+            effects = _get_effects(screen, [item], background=False)
+            items.append({'type': item.type, 'build_ms': (perf_counter() - started) * 1000,
+                          'cells': _cells(effects)})
+        # the transitions and page animation
+        started = perf_counter()
+        _get_effects(screen, [], slide.start, slide.end, slide.page)
+        build = (perf_counter() - started) * 1000 + sum(x['build_ms'] for x in items)
+
+        _reseed(seed, name, 'build')
+        effects = _get_effects(screen, slide.items, slide.start, slide.end, slide.page, background=False)
+        memory = footprint(effects)
+        _reseed(seed, name)
+        costs = _simulate(screen, effects, frames).costs or [0.0]
+        records.append({
+            'slide': name,
+            'line': slide.mark[1] if slide.mark else None,
+            'build_ms': build,
+            'effects': len(effects),
+            'cells': max([x['cells'] for x in items] + [0]),
+            'frame_ms': {'mean': sum(costs) * 1000 / len(costs),
+                         'p90': _percentile(costs, 90) * 1000,
+                         'max': max(costs) * 1000},
+            'memory_kb': memory / 1024,
+            'items': items,
+        })
+    return records
+
+
+def report(records, key='p90'):
+    """
+    :param records: The slides as returned by :py:func:`.analyze`.
+    :param key: The frame time to sort by, "mean", "p90" or "max", or "build"
+        or "memory".
+    :returns: Lines of a table of the slides, most costly first, each followed
+        by its content items.
+    """
+    if key == 'build':
+        order = sorted(records, key=lambda x: -x['build_ms'])
+    elif key == 'memory':
+        order = sorted(records, key=lambda x: -x['memory_kb'])
+    else:
+        order = sorted(records, key=lambda x: -x['frame_ms'][key])
+    lines = [f'{"Slide":<32}{"Build ms":>10}{"Effects":>9}{"Cells":>9}'
+             f'{"Frame ms":>10}{"p90 ms":>9}{"Max ms":>9}{"Memory KB":>11}']
+    for record in order:
+        frame = record['frame_ms']
+        lines.append(f'{str(record["slide"]):<32}{record["build_ms"]:>10.1f}{record["effects"]:>9}'
+                     f'{record["cells"]:>9}{frame["mean"]:>10.2f}{frame["p90"]:>9.2f}{frame["max"]:>9.2f}'
+                     f'{record["memory_kb"]:>11.1f}')
+        for item in record['items']:
+            lines.append(f'  {item["type"]:<30}{item["build_ms"]:>10.1f}{"":>9}{item["cells"]:>9}')
+    return lines
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+
+from itertools import zip_longest
+
+import numpy
+from asciimatics.screen import Canvas, Screen
+
+__all__ = ['ArrayCanvas', 'Planes']
+
+# the cell left of half a double-width glyph, as asciimatics does
+_ORPHAN = (ord('x'), 0, 0, 0, 1)
+# code point, colour, attribute, background and width of each cell
+_TYPES = (numpy.uint32, numpy.int16, numpy.uint8, numpy.int16, numpy.int8)
+
+
+class Planes(object):
+    """
+    Double buffer with the methods of the asciimatics one, which holds the
+    characters, colours, attributes, backgrounds and widths of the cells in
+    typed arrays, a plane each, rather than a tuple per cell.
+
+    Besides the access to single cells and slices of rows, blocks of cells are
+    written, copied and scrolled at once by array operations, and the cells
+    written since the last sync are kept in a mask rather than compared.
+    """
+
+    def __init__(self, height, width):
+        """
+        :param height: Height of the buffer to create.
+        :param width: Width of the buffer to create.
+        """
+        self._height = height
+        self._width = width
+        # the cells drawn, and those written since the last sync
+        self._planes = self._blank(Screen.COLOUR_WHITE, 0, 0)
+        self._dirty = numpy.ones((height, width), dtype=bool)
+
+    def _blank(self, fg, attr, bg):
+        return [numpy.full((self._height, self._width), value, dtype=type_)
+                for value, type_ in zip((ord(' '), fg, attr, bg, 1), _TYPES)]
+
+    def clear(self, fg, attr, bg, x=0, y=0, w=None, h=None):
+        """
+        Clear a box in the double-buffer, the whole buffer by default.
+
+        :param fg: The foreground colour to use for the new buffer.
+        :param attr: The attribute value to use for the new buffer.
+        :param bg: The background colour to use for the new buffer.
+        :param x: Optional X coordinate for top left of box.
+        :param y: Optional Y coordinate for top left of box.
+        :param w: Optional width of the box.
+        :param h: Optional height of the box.
+        """
+        width = max(0, min(self._width - x, self._width if w is None else w))
+        height = max(0, min(self._height - y, self._height if h is None else h))
+        for plane, value in zip(self._planes, (ord(' '), fg, attr, bg, 1)):
+            plane[y:y + height, x:x + width] = value
+        self._dirty[y:y + height, x:x + width] = True
+
+    def invalidate(self):
+        """
+        Invalidate the screen buffer to force a full refresh.
+        """
+        self._dirty[:] = True
+
+    def get(self, x, y):
+        """
+        :param x: The column (x coord) of the character.
+        :param y: The row (y coord) of the character.
+        :return: A 5-tuple of (unicode, foreground, attributes, background, width).
+        """
+        chars, fg, attr, bg, widths = self._planes
+        return chr(chars[y, x]), int(fg[y, x]), int(attr[y, x]), int(bg[y, x]), int(widths[y, x])
+
+    def set(self, x, y, value):
+        """
+        :param x: The column (x coord) of the character, or a slice of columns.
+        :param y: The row (y coord) of the character.
+        :param value: A 5-tuple of (unicode, foreground, attributes, background,
+            width), or a list of them for a slice.
+        """
+        if isinstance(x, slice):
+            if not value:
+                return
+            chars, fg, attr, bg, widths = zip(*value)
+            value = ([ord(c) for c in chars], fg, attr, bg, widths)
+        else:
+            value = (ord(value[0]),) + tuple(value[1:])
+        for plane, values in zip(self._planes, value):
+            plane[y, x] = values
+        self._dirty[y, x] = True
+
+    def put(self, x, y, chars, fg, attr, bg, widths=1, fix=True):
+        """
+        Set many cells at once.  Each of the values is an array, or a value
+        for all the cells.
+
+        :param x: The columns of the cells.
+        :param y: The rows of the cells.
+        :param chars: The code points of the characters.
+        :param fg: The foreground colours.
+        :param attr: The attributes.
+        :param bg: The background colours.
+        :param widths: The widths of the cells.
+        :param fix: Whether to fix up the double-width glyphs bisected, as
+            print_at does on unicode aware screens.
+        """
+        if isinstance(x, int) and isinstance(y, int):
+            # a single cell, e.g. a particle
+            for plane, value in zip(self._planes, (chars, fg, attr, bg, widths)):
+                plane[y, x] = value
+            self._dirty[y, x] = True
+            if fix and x > 0 and self._planes[4][y, x - 1] == 2:
+                self.set(x - 1, y, ('x', 0, 0, 0, 1))
+            if fix and x + 1 < self._width and self._planes[4][y, x + 1] == 0:
+                self.set(x + 1, y, ('x', 0, 0, 0, 1))
+            return
+
+        for plane, values in zip(self._planes, (chars, fg, attr, bg, widths)):
+            plane[y, x] = values
+        self._dirty[y, x] = True
+        if not fix:
+            return
+        if numpy.ndim(y) == 0:
+            # a row: the double-width glyphs bisected next to the columns written
+            written = numpy.zeros(self._width + 2, dtype=bool)
+            written[numpy.asarray(x) + 1] = True
+            widths = self._planes[4][y]
+            near = ~written[1:-1] & ((written[2:] & (widths == 2)) | (written[:-2] & (widths == 0)))
+            near_y, near_x = y, numpy.flatnonzero(near)
+        else:
+            # cells anywhere, fixed up on either side unless written too
+            x, y = numpy.broadcast_arrays(x, y)
+            written = y * self._width + x
+            near_y, near_x = [], []
+            for side, half in ((-1, 2), (1, 0)):
+                near = (x + side >= 0) & (x + side < self._width)
+                near = numpy.flatnonzero(near)[self._planes[4][y[near], x[near] + side] == half]
+                near = near[~numpy.isin(written[near] + side, written)]
+                near_y.append(y[near])
+                near_x.append(x[near] + side)
+            near_y, near_x = numpy.concatenate(near_y), numpy.concatenate(near_x)
+        for plane, value in zip(self._planes, _ORPHAN):
+            plane[near_y, near_x] = value
+        self._dirty[near_y, near_x] = True
+
+    def deltas(self, start, height):
+        """
+        :return: The (y, x) of the cells written since the last sync.
+        """
+        y, x = numpy.nonzero(self._dirty[start:start + height])
+        return zip((y + start).tolist(), x.tolist())
+
+    def scroll(self, lines):
+        """
+        Scroll the window up or down.
+
+        :param lines: Number of lines to scroll.  Negative numbers move the buffer up.
+        """
+        lines = max(-self._height, min(lines, self._height))
+        for plane, value in zip(self._planes, (ord(' '), Screen.COLOUR_WHITE, 0, 0, 1)):
+            if lines > 0:
+                plane[:self._height - lines] = plane[lines:]
+                plane[self._height - lines:] = value
+            elif lines < 0:
+                plane[-lines:] = plane[:self._height + lines]
+                plane[:-lines] = value
+        if lines:
+            self._dirty[:] = True
+
+    def block_transfer(self, buffer, x, y):
+        """
+        Copy a buffer entirely to this double buffer, a block of each plane at
+        once if it is :py:obj:`.Planes` too.
+
+        :param buffer: The double buffer to copy
+        :param x: The X origin for where to place it in this buffer
+        :param y: The Y origin for where to place it in this buffer
+        """
+        left, right = max(0, x), min(x + buffer.width, self._width)
+        if left > right:
+            return
+        top, bottom = max(0, y), min(y + buffer.height, self._height)
+        if isinstance(buffer, Planes):
+            for plane, source in zip(self._planes, buffer._planes):
+                plane[top:bottom, left:right] = source[top - y:bottom - y, left - x:right - x]
+            self._dirty[top:bottom, left:right] = True
+        else:
+            for row in range(top, bottom):
+                self.set(slice(left, right), row, buffer.slice(left - x, row - y, right - left))
+
+    def slice(self, x, y, width):
+        """
+        :return: The cells of a row from the specified location, as tuples.
+        """
+        chars, fg, attr, bg, widths = (plane[y, x:x + width].tolist() for plane in self._planes)
+        return list(zip(map(chr, chars), fg, attr, bg, widths))
+
+    def sync(self):
+        """
+        Synchronize the screen buffer with the double buffer.
+        """
+        self._dirty[:] = False
+
+    @property
+    def height(self):
+        """
+        The height of this buffer.
+        """
+        return self._height
+
+    @property
+    def width(self):
+        """
+        The width of this buffer.
+        """
+        return self._width
+
+    @property
+    def nbytes(self):
+        """
+        The size of the planes, in bytes.
+        """
+        return sum(x.nbytes for x in self._planes) + self._dirty.nbytes
+
+    @property
+    def plain_image(self):
+        return self._planes[0].view(f'<U{self._width}').ravel().tolist()
+
+    @property
+    def colour_map(self):
+        return [list(zip(*(plane[y].tolist() for plane in self._planes[1:4]))) for y in range(self._height)]
+
+
+class ArrayCanvas(Canvas):
+    """
+    A Canvas drawn into :py:obj:`.Planes`, for previews of large slides and
+    off-screen rendering.  It takes the place of a Canvas or a Screen for the
+    effects, and text is printed a whole line at a time.
+
+    The content persists from a frame to the next, and only the cells written
+    since the last refresh are turned into tuples for the Screen, or the
+    planes are copied at once if the Screen uses :py:obj:`.Planes` too.
+    """
+
+    def __init__(self, screen, height, width, x=None, y=None):
+        """
+        See :py:obj:`asciimatics.screen.Canvas`.
+        """
+        # the cells as copied to the Screen, and the cells made, shared
+        self._rows = None
+        self._cells = {}
+        super(ArrayCanvas, self).__init__(screen, height, width, x, y)
+
+    def reset(self):
+        self._start_line = 0
+        self._x = self._y = None
+        self._buffer = Planes(self._buffer_height, self.width)
+        self._reset()
+
+    def _reset(self):
+        # all the cells are copied at the next refresh
+        self._rows = None
+        self._cells = {}
+        self._buffer.invalidate()
+
+    def print_at(self, text, x, y, colour=7, attr=0, bg=0, transparent=False):
+        """
+        See :py:meth:`asciimatics.screen._AbstractCanvas.print_at`.
+        """
+        y -= self._start_line
+        if y < 0 or y >= self._buffer_height or x > self.width:
+            return
+        text = str(text)
+        if not text:
+            return
+        buffer = self._buffer
+
+        if not self._unicode_aware or max(text) < 'Ā':
+            # all narrow, clipped to the canvas
+            if x < 0:
+                text = text[-x:]
+                x = 0
+            text = text[:self.width - x]
+            if len(text) == 1:
+                if not (transparent and text == ' '):
+                    buffer.put(x, y, ord(text), colour, attr, bg, 1, self._unicode_aware)
+                return
+            if not text:
+                return
+            chars = numpy.frombuffer(text.encode('utf-32-le'), dtype=numpy.uint32)
+            columns = numpy.arange(x, x + len(text))
+            if transparent:
+                columns, chars = columns[chars != ord(' ')], chars[chars != ord(' ')]
+            buffer.put(columns, y, chars, colour, attr, bg, 1, self._unicode_aware)
+            return
+
+        # the cells of the glyphs, as print_at lays them out
+        from wcwidth import wcwidth
+        columns, chars, widths = [], [], []
+        j = 0
+        for i, c in enumerate(text):
+            width = wcwidth(c) if ord(c) >= 256 else 1
+            if x + i + j < 0:
+                x += (width - 1)
+                continue
+            if x + i + j + width > self.width:
+                break
+            if width == 0:
+                j -= 1
+                continue
+            if c != ' ' or not transparent:
+                columns.append(x + i + j)
+                chars.append(ord(c))
+                widths.append(width)
+                if width == 2:
+                    j += 1
+                    columns.append(x + i + j)
+                    chars.append(ord(c))
+                    widths.append(0)
+        if columns:
+            buffer.put(numpy.array(columns), y, numpy.array(chars, dtype=numpy.uint32), colour, attr, bg,
+                       numpy.array(widths, dtype=numpy.int8))
+
+    def paint(self, text, x, y, colour=7, attr=0, bg=0, transparent=False, colour_map=None):
+        """
+        See :py:meth:`asciimatics.screen._AbstractCanvas.paint`.  Text without
+        double-width glyphs is painted at once, whatever its colours.
+        """
+        text = str(text)
+        if colour_map is None or not text or max(text) >= 'Ā':
+            super(ArrayCanvas, self).paint(text, x, y, colour, attr, bg, transparent, colour_map)
+            return
+        y -= self._start_line
+        if y < 0 or y >= self._buffer_height or x > self.width:
+            return
+
+        # the colours of each character, as the runs of asciimatics get them
+        colours = []
+        for c, m in zip_longest(text, colour_map):
+            if m:
+                colour = colour if m[0] is None else m[0]
+                attr = attr if len(m) < 2 or m[1] is None else m[1]
+                bg = bg if len(m) < 3 or m[2] is None else m[2]
+            if c is None:
+                break
+            colours.append((colour, attr, bg))
+        fg, attr, bg = (numpy.array(x) for x in zip(*colours))
+        chars = numpy.frombuffer(text.encode('utf-32-le'), dtype=numpy.uint32)
+        columns = numpy.arange(x, x + len(text))
+        keep = (columns >= 0) & (columns < self.width)
+        if transparent:
+            keep &= chars != ord(' ')
+        self._buffer.put(columns[keep], y, chars[keep], fg[keep], attr[keep], bg[keep], 1, self._unicode_aware)
+
+    def refresh(self):
+        """
+        Flush the canvas content to the underlying screen.
+        """
+        buffer = self._buffer
+        target = self._screen._buffer
+        if isinstance(target, Planes):
+            target.block_transfer(buffer, self._dx, self._dy)
+            return
+
+        if self._rows is None:
+            self._rows = [[None] * self.width for _ in range(self._buffer_height)]
+        y, x = numpy.nonzero(buffer._dirty)
+        if len(y):
+            rows = self._rows
+            cells = self._cells
+            chars, fg, attr, bg, widths = (plane[y, x].tolist() for plane in buffer._planes)
+            for row, column, cell in zip(y.tolist(), x.tolist(), zip(map(chr, chars), fg, attr, bg, widths)):
+                rows[row][column] = cells.setdefault(cell, cell)
+            buffer.sync()
+
+        left, right = max(0, self._dx), min(self._dx + self.width, target.width)
+        if left > right:
+            return
+        columns = slice(left, right)
+        whole = right - left == self.width
+        for row in range(max(0, self._dy), min(self._dy + buffer.height, target.height)):
+            cells = self._rows[row - self._dy]
+            target.set(columns, row, cells if whole else cells[left - self._dx:right - self._dx])
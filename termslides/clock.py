@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+from time import perf_counter
+
+__all__ = ['Clock', 'FRAME_TIME']
+
+# the frame period of asciimatics, in seconds
+FRAME_TIME = 0.05
+
+
+class Clock(object):
+    """
+    Schedule of the frames of the scene being played on the monotonic clock,
+    so that durations and delays counted in frames last the same time however
+    long the frames take to draw.
+
+    Frame N of a scene is due N - 1 frame periods after the scene starts.  A
+    scene entered when the previous one ran out of time starts when it was
+    due rather than when it is entered, so that the time taken to build it
+    does not add up over a looping deck.
+    """
+
+    def __init__(self, frame_time, catch_up=20):
+        """
+        :param frame_time: The frame period in seconds.
+        :param catch_up: The most frames to catch up at once.  Beyond, as after
+            the process was suspended, the schedule is pushed back instead.
+        """
+        self._frame_time = frame_time
+        self._catch_up = catch_up
+        self._origin = perf_counter()
+
+    def start(self, frames=None):
+        """
+        Start the schedule of a scene.
+
+        :param frames: The frames played by the previous scene if it ran out of
+            time, so that the scene starts when it was due.  Otherwise, the
+            scene starts now.
+        """
+        if frames is None:
+            self._origin = perf_counter()
+        else:
+            self._origin += frames * self._frame_time
+
+    def seek(self, frame_no):
+        """
+        Move the schedule so that the frame after the given one is due now, as
+        when a scene is seeked to that frame.
+        """
+        self._origin = perf_counter() - frame_no * self._frame_time
+
+    def due(self, frame_no):
+        """
+        :param frame_no: The last frame drawn.
+        :returns: The frame due now, at least the next one.
+        """
+        due = int((perf_counter() - self._origin) / self._frame_time) + 1
+        if due - frame_no > self._catch_up:
+            self._origin += (due - frame_no - self._catch_up) * self._frame_time
+            due = frame_no + self._catch_up
+        return max(due, frame_no + 1)
+
+    def deadline(self, frame_no):
+        """
+        :returns: The time the frame is due, on :py:func:`time.perf_counter`.
+        """
+        return self._origin + (frame_no - 1) * self._frame_time
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 
+from itertools import zip_longest
 from random import random
 
-from asciimatics.effects import Effect, Matrix, Wipe
+from asciimatics.effects import Effect, Matrix, Print, Wipe
 from asciimatics.particles import Particle, DropEmitter, DropScreen, ShotEmitter, ShootScreen
 from asciimatics.exceptions import NextScene
 from asciimatics.event import KeyboardEvent
@@ -64,6 +65,171 @@ class Mirage(Effect):
         return self._stop_frame
 
 
+def _runs(line, colours, colour, attr, bg, transparent, unicode_aware, cells):
+    """
+    Turn a line of text into the cells a Screen would be painted with, as
+    runs of (column offset, cells), split at the spaces if transparent.
+
+    :param colours: The colour map of the line as (colour, attribute,
+        background), or None to use the given colours.
+    :param cells: A dict of cells already made, so that equal cells are shared.
+    """
+    from wcwidth import wcwidth
+    runs = []
+    run = None
+    x = 0
+    for c, m in zip_longest(line, colours or ()):
+        if m:
+            colour = colour if m[0] is None else m[0]
+            attr = attr if len(m) < 2 or m[1] is None else m[1]
+            bg = bg if len(m) < 3 or m[2] is None else m[2]
+        if c is None:
+            break
+        width = wcwidth(c) if unicode_aware and ord(c) >= 256 else 1
+        if width == 0:
+            # modifier glyphs are dropped
+            continue
+        if c == ' ' and transparent:
+            run = None
+            x += 1
+            continue
+        if run is None:
+            run = []
+            runs.append((x, run))
+        cell = (c, colour, attr, bg, width)
+        run.append(cells.setdefault(cell, cell))
+        x += 1
+        if width == 2:
+            cell = (c, colour, attr, bg, 0)
+            run.append(cells.setdefault(cell, cell))
+            x += 1
+        elif colours is not None and ord(c) >= 256 and wcwidth(c) == 2:
+            # multi-colour text leaves room for the glyph, even if printed narrow
+            run = None
+            x += 1
+    return runs
+
+
+def _blit(screen, lines, x, y):
+    """
+    Copy lines of runs made by :py:func:`._runs` to the Screen, a whole run at
+    a time, clipped to the Screen.
+    """
+    buffer = screen._buffer
+    width = screen.width
+    y -= screen._start_line
+    for runs in lines:
+        if 0 <= y < screen._buffer_height:
+            for dx, run in runs:
+                left = x + dx
+                start, end = max(0, -left), min(len(run), width - left)
+                # never keep half of a double-width glyph
+                if start < end and run[start][4] == 0:
+                    start += 1
+                if start < end and run[end - 1][4] == 2:
+                    end -= 1
+                if start >= end:
+                    continue
+                buffer.set(slice(left + start, left + end), y, run[start:end])
+                # fix up the double-width glyphs bisected on either side
+                if left + start > 0 and buffer.get(left + start - 1, y)[4] == 2:
+                    buffer.set(left + start - 1, y, ('x', 0, 0, 0, 1))
+                if left + end < width and buffer.get(left + end, y)[4] == 0:
+                    buffer.set(left + end, y, ('x', 0, 0, 0, 1))
+        y += 1
+
+
+class ColourCycle(Effect):
+    """
+    Special effect to cycle the colours of the text from a Renderer, as
+    :py:obj:`asciimatics.effects.Cycle`.  The text is centred to the width of
+    the Screen.
+
+    The cells of each colour are computed once per rendered image, then
+    copied to the Screen whole lines at a time.
+    """
+
+    def __init__(self, screen, renderer, y, **kwargs):
+        """
+        :param screen: The Screen being used for the Scene.
+        :param renderer: The Renderer which is to be cycled.
+        :param y: The line (y coordinate) for the start of the text.
+
+        Also see the common keyword arguments in :py:obj:`.Effect`.
+        """
+        super(ColourCycle, self).__init__(screen, **kwargs)
+        self._renderer = renderer
+        self._y = y
+        self._colour = 0
+        # id of image -> (image, screen width, lines of runs for each colour)
+        self._frames = {}
+        self._cells = {}
+
+    def reset(self):
+        pass
+
+    def _lines(self, image):
+        # the lines of the image in the current colour, centred
+        from wcwidth import wcswidth
+        screen = self._screen
+        frames = self._frames.get(id(image))
+        if frames is None or frames[0] is not image or frames[1] != screen.width:
+            frames = self._frames[id(image)] = (image, screen.width, [None] * 8)
+        lines = frames[2][self._colour]
+        if lines is None:
+            lines = frames[2][self._colour] = []
+            for line in image:
+                x = (screen.width - (wcswidth(line) if screen.unicode_aware else len(line))) // 2
+                lines.append([(x + dx, run) for dx, run in _runs(
+                    line, None, self._colour, 0, 0, False, screen.unicode_aware, self._cells)])
+        return lines
+
+    def _update(self, frame_no):
+        if frame_no % 2 == 0:
+            return
+
+        image, _ = self._renderer.rendered_text
+        _blit(self._screen, self._lines(image), 0, self._y)
+        self._colour = (self._colour + 1) % 8
+
+    @property
+    def stop_frame(self):
+        return 0
+
+
+class ColourPrint(Print):
+    """
+    Special effect that prints the multi-colour text from a Renderer, as
+    :py:obj:`asciimatics.effects.Print`, with the cells computed once per
+    rendered image and copied to the Screen whole runs at a time.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        See :py:obj:`asciimatics.effects.Print`.
+        """
+        super(ColourPrint, self).__init__(*args, **kwargs)
+        # id of image -> (image, lines of runs)
+        self._lines = {}
+        self._cells = {}
+
+    def _update(self, frame_no):
+        if self._clear and (frame_no == self._stop_frame - 1) or (self._delete_count == 1) or \
+                not (self._speed == 0 or frame_no % self._speed == 0):
+            super(ColourPrint, self)._update(frame_no)
+            return
+
+        self._frame_no = frame_no
+        image, colours = self._renderer.rendered_text
+        lines = self._lines.get(id(image))
+        if lines is None or lines[0] is not image:
+            lines = self._lines[id(image)] = (image, [
+                _runs(line, colours[i], self._colour, self._attr, self._bg, self._transparent,
+                      self._screen.unicode_aware, self._cells)
+                for i, line in enumerate(image)])
+        _blit(self._screen, lines[1], self._x, self._y)
+
+
 class Typing(Effect):
     """
     Special effect that simulate typewriter to print the specified text (from a
@@ -105,11 +271,15 @@ class Typing(Effect):
         self._step = step
         self._speed = speed
         self._frame_no = 0
-        self._frame_cnt = (sum([len(line) for line in self._renderer.rendered_text[0]]
-                               ) + self._step - 1) // self._step * self._speed
+        self._frame_cnt = self._count_frames()
         self._image_idx = 0
         self._line_idx = 0
 
+    def _count_frames(self):
+        # the frames needed to type the whole text
+        return (sum([len(line) for line in self._renderer.rendered_text[0]]
+                    ) + self._step - 1) // self._step * self._speed
+
     def reset(self):
         self._image_idx = 0
         self._line_idx = 0
@@ -155,6 +325,74 @@ class Typing(Effect):
         return self._speed - (self._frame_no % self._speed) if self._speed > 0 else 1
 
 
+class ScrollTable(Effect):
+    """
+    Special effect to show a scrollable window of a large table.
+    """
+
+    def __init__(self, screen, renderer, y, x=None, colour=7, attr=0, bg=0, **kwargs):
+        """
+        :param screen: The Screen being used for the Scene.
+        :param renderer: The :py:obj:`.CSVTableText` renderer to be displayed.
+        :param y: The line (y coordinate) for the start of the table.
+        :param x: The column (x coordinate) for the start of the table.
+            If not specified, defaults to centring the table on screen.
+        :param colour: The foreground colour to use for the table.
+        :param attr: The colour attribute to use for the table.
+        :param bg: The background colour to use for the table.
+
+        Also see the common keyword arguments in :py:obj:`.Effect`.
+        """
+        super(ScrollTable, self).__init__(screen, **kwargs)
+        self._renderer = renderer
+        self._y = y
+        self._x = x
+        self._colour = colour
+        self._attr = attr
+        self._bg = bg
+        self._height = 0
+
+    def reset(self):
+        pass
+
+    def _update(self, frame_no):
+        image, colours = self._renderer.rendered_text
+        x = (self._screen.width - self._renderer.max_width) // 2 if self._x is None else self._x
+        for i, line in enumerate(image):
+            self._screen.paint(line, x, self._y + i, self._colour, self._attr, self._bg,
+                               colour_map=colours[i])
+        # clear the lines left over by a longer window
+        for i in range(len(image), self._height):
+            self._screen.print_at(' ' * self._renderer.max_width, x, self._y + i, bg=self._bg)
+        self._height = len(image)
+
+    @property
+    def stop_frame(self):
+        return self._stop_frame
+
+    def process_event(self, event):
+        """
+        Process any input event.
+
+        :param event: The event that was triggered.
+        :returns: None if the Effect processed the event, else the original
+                  event.
+        """
+        if isinstance(event, KeyboardEvent):
+            lines = {
+                Screen.KEY_UP: -1,
+                Screen.KEY_DOWN: 1,
+                Screen.KEY_PAGE_UP: -self._renderer.page,
+                Screen.KEY_PAGE_DOWN: self._renderer.page,
+                Screen.KEY_HOME: -self._renderer.rows,
+                Screen.KEY_END: self._renderer.rows,
+            }.get(event.key_code, None)
+            if lines is not None:
+                self._renderer.scroll(lines)
+                return None
+        return event
+
+
 class ScrollSlide(Effect):
     """
     Special effect to scroll the slide up at a required rate.
@@ -218,6 +456,10 @@ class ScrollSlide(Effect):
 class MatrixSlide(Matrix):
     """
     Matrix-like effect.
+
+    With NumPy installed, the trails of all the columns are moved at once by
+    :py:obj:`termslides.matrix.Trails`, which is many times faster on wide
+    screens.
     """
 
     def __init__(self, screen, duration=100, is_ending=False, next_fn=False, **kwargs):
@@ -235,9 +477,16 @@ class MatrixSlide(Matrix):
         self._count = duration
         self._current = 0
         self._go = not self._isEnding
+        self._trails = None
 
     def reset(self):
-        super(MatrixSlide, self).reset()
+        try:
+            from termslides.matrix import Trails
+        except ImportError:
+            # without NumPy, a _Trail per column
+            super(MatrixSlide, self).reset()
+        else:
+            self._trails = Trails(self._screen)
         self._current = 0
         self._go = not self._isEnding
 
@@ -249,7 +498,10 @@ class MatrixSlide(Matrix):
             else:
                 raise NextScene()
         if self._go and (self._current < self._count):
-            super(MatrixSlide, self)._update(frame_no)
+            if self._trails is None:
+                super(MatrixSlide, self)._update(frame_no)
+            elif frame_no % 2 == 0:
+                self._trails.update((self._stop_frame == 0) or (self._stop_frame - frame_no > 100))
             self._current += 1
 
     @property
@@ -275,7 +527,7 @@ class MatrixSlide(Matrix):
 
 class WipeSlide(Wipe):
     """
-    Wipe the screen down from top to bottom.
+    Wipe the screen down from top to bottom, a whole row at a time.
     """
 
     def __init__(self, screen, next_fn=False, **kwargs):
@@ -306,7 +558,12 @@ class WipeSlide(Wipe):
             else:
                 raise NextScene()
         if self._go and (self._current < self._count):
-            super(WipeSlide, self)._update(frame_no)
+            if frame_no % 2 == 0:
+                screen = self._screen
+                if screen.is_visible(0, self._y):
+                    screen.clear_buffer(Screen.COLOUR_WHITE, 0, self._bg, 0, self._y - screen._start_line,
+                                        screen.width, 1)
+                self._y += 1
             self._current += 1
 
     @property
@@ -330,28 +587,63 @@ class WipeSlide(Wipe):
         return event
 
 
-def patch_drop_next_particle(self):
+def _scan(emitter, order):
+    """
+    Find all the particles on the Screen, in the order given by a function of
+    the cells.  The particles are kept with the screen content they were found
+    in, and reused while the screen shows the same content, e.g. when a looping
+    show ends the same slide again.
+    """
+    screen = emitter._screen
+    rows = [screen._buffer.slice(0, y, screen.width) for y in range(screen.height)]
+    content = (screen._start_line, [tuple(row) for row in rows])
+    if content != emitter._content:
+        cells = []
+        for x in range(screen.width):
+            for y in range(screen.height):
+                ch, fg, attr, bg = rows[y][x][:4]
+                if ch != ' ':
+                    cells.append((x, y + screen._start_line, ord(ch), fg, attr, bg))
+        emitter._content = content
+        emitter._cells = order(cells)
+    return emitter._cells
+
+
+def _rewind(emitter):
+    """
+    Restart a particle emitter, keeping its particles found on the Screen.
+    """
+    del emitter.particles[:]
+    emitter.time_left = emitter._life_time
+    emitter._particles = None
+
+
+def _shuffle(cells):
     from random import randint
+    particles = []
+    for cell in cells:
+        particles.insert(randint(0, len(particles)), cell)
+    return particles
+
+
+def patch_drop_next_particle(self):
     # Find all particles on the Screen when we create our first particle.
     if self._particles is None:
-        self._particles = []
-        for x in range(self._screen.width):
-            for y in range(self._screen.height):
-                y += self._screen._start_line
-                ch, fg, attr, bg = self._screen.get_from(x, y)
-                if ch != 32:
-                    self._particles.insert(randint(0, len(self._particles)), (x, y, ch, fg, attr, bg))
+        self._particles = _scan(self, _shuffle)
+        self._left = len(self._particles)
 
     # Stop now if there were no more particles to move.
-    if len(self._particles) == 0:
+    if self._left == 0:
         return None
 
     # We got here, so there must still be some screen estate to move.
-    x, y, ch, fg, attr, bg = self._particles.pop()
+    self._left -= 1
+    x, y, ch, fg, attr, bg = self._particles[self._left]
     return Particle(chr(ch), x, y, 0.0, 0.0, [(fg, attr, bg)], self._life_time, self._move)
 
 
 DropEmitter._next_particle = patch_drop_next_particle
+DropEmitter._content = None
 
 
 def patch_shoot_next_particle(self):
@@ -359,21 +651,16 @@ def patch_shoot_next_particle(self):
     # Find all particles on the Screen when we create our first particle
     # and sort by distance from the origin.
     if self._particles is None:
-        self._particles = []
-        for x in range(self._screen.width):
-            for y in range(self._screen.height):
-                y += self._screen._start_line
-                ch, fg, attr, bg = self._screen.get_from(x, y)
-                if ch != 32:
-                    self._particles.append((x, y, ch, fg, attr, bg))
-        self._particles = sorted(self._particles, key=self._sort, reverse=True)
+        self._particles = _scan(self, lambda cells: sorted(cells, key=self._sort, reverse=True))
+        self._left = len(self._particles)
 
     # Stop now if there were no more particles to move.
-    if len(self._particles) == 0:
+    if self._left == 0:
         return None
 
     # We got here, so there must still be some screen estate to move.
-    x, y, ch, fg, attr, bg = self._particles.pop()
+    self._left -= 1
+    x, y, ch, fg, attr, bg = self._particles[self._left]
     r = min(10,
             max(0.001,
                 sqrt(((x - self._x) ** 2) + ((y - self._y) ** 2))))
@@ -382,6 +669,7 @@ def patch_shoot_next_particle(self):
 
 
 ShotEmitter._next_particle = patch_shoot_next_particle
+ShotEmitter._content = None
 
 
 class DropSlide(DropScreen):
@@ -400,11 +688,17 @@ class DropSlide(DropScreen):
         self._count = duration
         self._current = 0
         self._go = not self._isEnding
+        self._emitter = None
         super(DropSlide, self).__init__(screen, duration, **kwargs)
 
     def reset(self):
-        self._active_systems = []
-        self._active_systems.append(DropEmitter(self._screen, self._life_time))
+        # reuse the emitter on every loop of the show
+        if self._emitter is None:
+            self._emitter = DropEmitter(self._screen, self._life_time)
+        else:
+            _rewind(self._emitter)
+        del self._active_systems[:]
+        self._active_systems.append(self._emitter)
         self._current = 0
         self._go = not self._isEnding
 
@@ -456,11 +750,17 @@ class ShootSlide(ShootScreen):
         self._count = duration
         self._current = 0
         self._go = not self._isEnding
+        self._emitter = None
         super(ShootSlide, self).__init__(screen, screen.width // 2, y_offset + screen.height // 2, duration, **kwargs)
 
     def reset(self):
-        self._active_systems = []
-        self._active_systems.append(ShotEmitter(self._screen, self._x, self._y, self._life_time))
+        # reuse the emitter on every loop of the show
+        if self._emitter is None:
+            self._emitter = ShotEmitter(self._screen, self._x, self._y, self._diameter, self._life_time)
+        else:
+            _rewind(self._emitter)
+        del self._active_systems[:]
+        self._active_systems.append(self._emitter)
         self._current = 0
         self._go = not self._isEnding
 
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+from asciimatics.event import Event
+
+__all__ = ['ControlEvent']
+
+
+class ControlEvent(Event):
+    """
+    A command received by the :py:obj:`.Remote`, for the handlers to move to
+    another slide.
+
+    Kept apart from :py:mod:`termslides.remote`, so that the handlers don't
+    import its server.
+    """
+
+    def __init__(self, command, argument, reply):
+        """
+        :param command: The command, one of :py:data:`.remote.COMMANDS`.
+        :param argument: The argument of the command, e.g. the slide of "goto".
+        :param reply: Function sending a line back to the client, from any thread.
+        """
+        self.command = command
+        self.argument = argument
+        self.reply = reply
+
+    def __repr__(self):
+        return f'ControlEvent: {self.command} {self.argument}'
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+from random import getrandbits
+
+import numpy
+from asciimatics.renderers import DynamicRenderer, Fire
+
+__all__ = ['FireText']
+
+
+class FireText(DynamicRenderer):
+    """
+    Renderer of the same fire as :py:obj:`asciimatics.renderers.Fire`, with
+    the heat simulated by array operations, and the text and colour map built
+    in bulk, so that wide banners are cheap to burn.
+
+    The heat of all cells cools down at once from the previous frame, rather
+    than cell by cell from the cooled left neighbour, so that the flames are
+    a little taller for the same parameters.
+    """
+
+    def __init__(self, height, width, emitter, intensity, spot, colours, bg=False):
+        """
+        :param height: Height of the box to contain the flames.
+        :param width: Width of the box to contain the flames.
+        :param emitter: Heat source for the flames.  Any non-whitespace
+            character is treated as part of the heat source.
+        :param intensity: The strength of the flames.  The bigger the number,
+            the hotter the fire.  0 <= intensity <= 1.0.
+        :param spot: Heat of each spot source.  Must be an integer > 0.
+        :param colours: Number of colours the screen supports.
+        :param bg: (Optional) Whether to render background colours only.
+        """
+        super(FireText, self).__init__(height, width, clear=False)
+        self._intensity = intensity
+        self._spot_heat = spot
+        # drawn from the seeded random generator, for repeatable shows
+        self._random = numpy.random.default_rng(getrandbits(64))
+        # heat of the flames, and an always cold row below
+        self._heat = numpy.zeros((height + 1, width), dtype=numpy.int64)
+
+        # emitter cells, centred at the bottom of the box
+        lines = emitter.split('\n')
+        x0 = (width - max(len(x) for x in lines)) // 2
+        y0 = height - len(lines)
+        spots = [(y0 + y, x0 + x) for y, line in enumerate(lines) for x, c in enumerate(line) if c != ' ']
+        spots = [(y, x) for y, x in spots if 0 <= y < height and 0 <= x < width]
+        self._spot_y = numpy.array([y for y, x in spots], dtype=numpy.intp)
+        self._spot_x = numpy.array([x for y, x in spots], dtype=numpy.intp)
+
+        # character and colours of each heat level
+        palette = Fire._COLOURS_256 if colours >= 256 else Fire._COLOURS_16
+        self._top = max(len(Fire._CHARS), len(palette)) - 1
+        chars = [' ']
+        cells = numpy.empty(self._top + 1, dtype=object)
+        cells[0] = (None, 0, 0)
+        for heat in range(1, self._top + 1):
+            fg, attr = palette[min(len(palette) - 1, heat)]
+            if bg:
+                chars.append(' ')
+                cells[heat] = (fg, attr, fg)
+            else:
+                chars.append(Fire._CHARS[min(len(Fire._CHARS) - 1, heat)])
+                cells[heat] = (fg, attr, 0)
+        self._chars = numpy.array(chars, dtype='<U1')
+        self._cells = cells
+
+    def _render_now(self):
+        heat = self._heat
+        height, width = heat.shape[0] - 1, heat.shape[1]
+
+        # First make the fire rise with convection
+        heat[:height - 1] = heat[1:height]
+        heat[height - 1] = 0
+
+        # Seed new hot spots
+        hot = self._random.random(len(self._spot_y)) < self._intensity
+        heat[self._spot_y[hot], self._spot_x[hot]] += self._random.integers(1, self._spot_heat + 1, hot.sum())
+
+        # Seed a few cooler spots
+        count = width // 2
+        numpy.subtract.at(heat, (self._random.integers(0, height, count), self._random.integers(0, width, count)), 10)
+
+        # Simulate cooling effect of the resulting environment.
+        cooled = heat[:height] + heat[1:]
+        cooled[:, 1:] += heat[:height, :-1]
+        cooled[:, :-1] += heat[:height, 1:]
+        heat[:height] = cooled // 4
+
+        # Now build the rendered text from the simulated flames.
+        levels = numpy.clip(heat[:height], 0, self._top)
+        text = numpy.ascontiguousarray(self._chars[levels]).view(f'<U{width}').ravel().tolist()
+        return text, self._cells[levels].tolist()
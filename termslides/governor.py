@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from weakref import WeakKeyDictionary
+
+from asciimatics.effects import Stars, Snow
+from asciimatics.particles import ParticleEffect
+
+from termslides.effects import MatrixSlide, WipeSlide, DropSlide, ShootSlide
+
+__all__ = ['Governor']
+
+logger = logging.getLogger(__name__)
+
+
+class Governor(object):
+    """
+    Shed animation work while frames cost more than the frame budget, and
+    restore it when there is headroom again.
+
+    Each level adds to the previous ones:
+    1. Particle systems spawn half of their particles.
+    2. Decorative effects (particles, stars and snow) are only updated every
+       other frame.
+    3. Transitions not started yet ("drop", "shoot" and "matrix") are swapped
+       for "wipe".  They are swapped back below this level, unless the wipe
+       has started.
+    """
+    LEVELS = ['full quality', 'fewer particles', 'alternate frames', 'cheap transitions']
+    DECORATIVE = (ParticleEffect, Stars, Snow)
+    EXPENSIVE = (DropSlide, ShootSlide, MatrixSlide)
+
+    def __init__(self, budget=0.05, window=10, headroom=0.5, smoothing=0.2):
+        """
+        :param budget: The frame budget in seconds.
+        :param window: How many consecutive frames over budget raise the level.
+            Five times as many frames with headroom lower the level.
+        :param headroom: The fraction of the budget under which work is restored.
+        :param smoothing: The weight of the latest frame in the average frame cost.
+        """
+        self._budget = budget
+        self._window = window
+        self._headroom = headroom
+        self._smoothing = smoothing
+        self._over = 0
+        self._under = 0
+        self.cost = 0.0
+        self.level = 0
+        # (scene, index) -> the transition swapped out, and the wipe swapped in
+        self._swapped = {}
+        # particle system -> the particles it spawns at full quality
+        self._full_counts = WeakKeyDictionary()
+
+    def measure(self, scene, frame_no, cost):
+        """
+        Account the cost of a drawn frame and change level if needed.
+
+        :param scene: The scene being played.
+        :param frame_no: The frame number.
+        :param cost: The time spent on the frame in seconds.
+        """
+        self.cost += (cost - self.cost) * self._smoothing
+        if self.cost > self._budget:
+            self._over, self._under = self._over + 1, 0
+        elif self.cost < self._budget * self._headroom:
+            self._over, self._under = 0, self._under + 1
+        else:
+            self._over = self._under = 0
+
+        if self._over >= self._window and self.level < len(self.LEVELS) - 1:
+            self._change(scene, frame_no, self.level + 1)
+        elif self._under >= self._window * 5 and self.level > 0:
+            self._change(scene, frame_no, self.level - 1)
+
+    def _change(self, scene, frame_no, level):
+        logger.info('%s frame %d: %.1f ms against %.1f ms budget, level %d -> %d (%s)',
+                    scene.name, frame_no, self.cost * 1000, self._budget * 1000,
+                    self.level, level, self.LEVELS[level])
+        self._over = self._under = 0
+        if level == 0:
+            for effect in scene.effects:
+                self._scale_particles(effect, 1)
+        self.level = level
+
+    def apply(self, scene, frame_no):
+        """
+        Apply the current level to the effects of the scene, before they are
+        updated for the frame.
+
+        :param scene: The scene being played.
+        :param frame_no: The frame number.
+        """
+        if self.level < 3 and self._swapped:
+            self._swap_back(scene, frame_no)
+        if self.level == 0:
+            return
+        effects = scene.effects
+        for i, effect in enumerate(effects):
+            self._scale_particles(effect, 2)
+            if self.level >= 3 and isinstance(effect, self.EXPENSIVE) and effect._start_frame > frame_no:
+                wipe = WipeSlide(effect._screen, next_fn=effect._next_fn,
+                                 start_frame=effect._start_frame, stop_frame=effect._stop_frame)
+                wipe.reset()
+                wipe.register_scene(scene)
+                effects[i] = wipe
+                self._swapped[(scene, i)] = (effect, wipe)
+                logger.info('%s frame %d: %s swapped for %s',
+                            scene.name, frame_no, type(effect).__name__, type(wipe).__name__)
+
+    def _swap_back(self, scene, frame_no):
+        # the transitions of the scene swapped for a wipe not started yet
+        effects = scene.effects
+        for key, (effect, wipe) in list(self._swapped.items()):
+            if key[0] is not scene:
+                continue
+            i = key[1]
+            if i >= len(effects) or effects[i] is not wipe:
+                # the scene was built again
+                del self._swapped[key]
+            elif wipe._start_frame > frame_no:
+                effects[i] = effect
+                del self._swapped[key]
+                logger.info('%s frame %d: %s swapped back for %s',
+                            scene.name, frame_no, type(effect).__name__, type(wipe).__name__)
+
+    def skip(self, effect, frame_no):
+        """
+        :returns: Whether the effect update should be skipped for the frame.
+        """
+        return self.level >= 2 and frame_no % 2 == 1 and isinstance(effect, self.DECORATIVE)
+
+    def _scale_particles(self, effect, divisor):
+        if not isinstance(effect, ParticleEffect):
+            return
+        for system in effect._active_systems:
+            full = self._full_counts.get(system)
+            if full is None:
+                if divisor == 1:
+                    continue
+                full = self._full_counts[system] = system._count
+            system._count = max(1, full // divisor) if full > 0 else full
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from threading import Condition
+
+from asciimatics.exceptions import StopApplication
+from asciimatics.screen import Screen
+
+__all__ = ['HeadlessScreen']
+
+
+class HeadlessScreen(Screen):
+    """
+    A Screen without terminal, for tests, benchmarks and offline analysis.
+
+    It produces the escape sequences an ANSI terminal would be sent, so that
+    the output size can be measured, and takes its input events from a queue.
+    """
+
+    def __init__(self, height=24, width=80, colours=256, unicode_aware=True, record=False):
+        """
+        :param height: The height of the screen.
+        :param width: The width of the screen.
+        :param colours: The number of colours of the screen.
+        :param unicode_aware: Whether the screen can use unicode.
+        :param record: Whether to keep the output, see :py:meth:`.output`.
+        """
+        super(HeadlessScreen, self).__init__(height, width, None, unicode_aware)
+        self.colours = colours
+        self.written = 0
+        self._record = record
+        self._output = []
+        self._events = deque()
+        self._input = Condition()
+
+    def _safe_write(self, msg):
+        self.written += len(msg.encode('utf-8'))
+        if self._record:
+            self._output.append(msg)
+
+    @property
+    def output(self):
+        """
+        :return: The output since the last call, if recording.
+        """
+        output = ''.join(self._output)
+        self._output = []
+        return output
+
+    def run(self, frames):
+        """
+        Draw frames of the Scenes set with :py:meth:`.set_scenes`.
+
+        :param frames: The number of frames to draw.
+        :returns: False if the application stopped before, else True.
+        """
+        for _ in range(frames):
+            try:
+                self.draw_next_frame()
+            except StopApplication:
+                return False
+        return True
+
+    @property
+    def cells(self):
+        """
+        :return: The cells on the screen, as rows of (character, colour, attribute, background).
+        """
+        return [[cell[:4] for cell in row] for row in self._buffer._screen_buffer]
+
+    def feed(self, event):
+        """
+        Queue an input event, to be returned by :py:meth:`.get_event`.  Can be
+        called from another thread.
+        """
+        with self._input:
+            self._events.append(event)
+            self._input.notify()
+
+    def get_event(self):
+        with self._input:
+            return self._events.popleft() if self._events else None
+
+    def has_resized(self):
+        return False
+
+    def _change_colours(self, colour, attr, bg):
+        if attr != self._attr:
+            self._safe_write('\x1b[0m')
+            if attr:
+                self._safe_write({Screen.A_BOLD: '\x1b[1m', Screen.A_REVERSE: '\x1b[7m',
+                                  Screen.A_UNDERLINE: '\x1b[4m'}.get(attr, ''))
+            self._attr = attr
+            self._colour = None
+            self._bg = None
+        if colour != self._colour:
+            self._safe_write(f'\x1b[3{colour}m' if 0 <= colour < 8 else f'\x1b[38;5;{colour}m')
+            self._colour = colour
+        if bg != self._bg:
+            self._safe_write(f'\x1b[4{bg}m' if 0 <= bg < 8 else f'\x1b[48;5;{bg}m')
+            self._bg = bg
+
+    def _print_at(self, text, x, y, width):
+        cursor = ''
+        if x != self._cur_x or y != self._cur_y:
+            cursor = f'\x1b[{y + 1};{x + 1}H'
+        self._safe_write(cursor + text)
+        self._cur_x = x + width
+        self._cur_y = y
+
+    def wait_for_input(self, timeout):
+        with self._input:
+            if not self._events:
+                self._input.wait(timeout)
+
+    def _clear(self):
+        self._safe_write('\x1b[2J')
+
+    def _scroll(self, lines):
+        if lines < 0:
+            self._safe_write('\x1b[1;1H' + '\x1bM\x1b[K' * -lines)
+        else:
+            self._safe_write(f'\x1b[{self.height + 1};1H' + '\x1bD\x1b[K' * lines)
+
+    def set_title(self, title):
+        pass
+
+    def close(self, restore=True):
+        pass
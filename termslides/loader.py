@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+from os import path, stat
+
+import yaml
+
+from termslides.widgets import InvalidParameter
+
+__all__ = ['load_slides']
+
+# file name -> (stamp, data, included files)
+_CACHE = {}
+
+# top level keys which are deck settings rather than slides
+_DECK_KEYS = ('title', 'seed')
+
+
+class _Mapping(dict):
+    """
+    A YAML mapping, knowing where it and its keys are in the file.
+    """
+    __slots__ = ('mark', 'marks')
+
+
+def _mark(node):
+    return node.start_mark.name, node.start_mark.line + 1, node.start_mark.column + 1
+
+
+def _where(data, key=None):
+    """
+    :returns: The "file:line:column: " of a mapping, or of one of its keys, to
+        prefix error messages with, or nothing if unknown.
+    """
+    if not isinstance(data, _Mapping):
+        return ''
+    filename, line, column = data.marks.get(key, data.mark) if key is not None else data.mark
+    return f'{filename}:{line}:{column}: '
+
+
+class _Loader(yaml.FullLoader):
+    """
+    YAML loader resolving "!include" tags relative to the including file, and
+    keeping where mappings and their keys are, for error messages.
+    """
+
+    def __init__(self, stream, stack):
+        super(_Loader, self).__init__(stream)
+        self.stack = stack
+        self.includes = []
+
+    def construct_yaml_map(self, node):
+        data = _Mapping()
+        data.mark = _mark(node)
+        data.marks = {}
+        yield data
+        data.update(self.construct_mapping(node))
+        for key, _ in node.value:
+            if isinstance(key, yaml.ScalarNode):
+                data.marks[key.value] = _mark(key)
+
+
+def _include(loader, node):
+    filename = path.join(path.dirname(loader.name), loader.construct_scalar(node))
+    filename = path.abspath(filename)
+    loader.includes.append(filename)
+    return _load_file(filename, loader.stack)
+
+
+_Loader.add_constructor('!include', _include)
+_Loader.add_constructor('tag:yaml.org,2002:map', _Loader.construct_yaml_map)
+
+
+def _stamp(filename):
+    info = stat(filename)
+    return info.st_mtime_ns, info.st_size
+
+
+def _fresh(filename):
+    if filename not in _CACHE:
+        return False
+    stamp, _, includes = _CACHE[filename]
+    try:
+        if _stamp(filename) != stamp:
+            return False
+    except OSError:
+        return False
+    return all(_fresh(x) for x in includes)
+
+
+def _load_file(filename, stack):
+    if filename in stack:
+        raise InvalidParameter(f'Circular include: {" -> ".join(stack + [filename])}')
+    if _fresh(filename):
+        return _CACHE[filename][1]
+
+    stamp = _stamp(filename)
+    with open(filename, 'r') as stream:
+        loader = _Loader(stream, stack + [filename])
+        try:
+            data = loader.get_single_data()
+        finally:
+            loader.dispose()
+    _CACHE[filename] = (stamp, data, loader.includes)
+    return data
+
+
+def _merge(filename, slides, stack):
+    data = _load_file(filename, stack)
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise InvalidParameter(f'{filename}: expect slide name-content pairs')
+
+    deck = {}
+    for name, slide in data.items():
+        if name in _DECK_KEYS:
+            deck[name] = slide
+        elif name == 'include':
+            # slides of included files take the place of the "include" key
+            for include in ([slide] if isinstance(slide, str) else slide):
+                _merge(path.abspath(path.join(path.dirname(filename), include)), slides, stack + [filename])
+        elif name in slides:
+            raise InvalidParameter(f'{_where(data, name) or filename + ": "}duplicated slide {name}')
+        elif not isinstance(slide, dict):
+            raise InvalidParameter(f'{_where(data, name)}slide {name}: expect key-value pairs')
+        else:
+            slides[name] = slide
+    return deck
+
+
+def load_slides(filename):
+    """
+    Load slides from a YAML file, following the top level "include" list and
+    "!include" tags.
+
+    Parsed files are cached and only parsed again when modified, so reloading
+    a deck split in several files only costs the changed ones.  Slides of an
+    unchanged file are the same objects as of the previous load.
+
+    Settings of included files, like their title, are ignored.
+
+    :param filename: The YAML file to load.
+    :returns: A tuple of the deck settings ("title" and "seed") and an ordered
+        dict of slide name to slide.
+    """
+    slides = {}
+    deck = _merge(path.abspath(filename), slides, [])
+    deck.setdefault('title', 'TermSlides')
+    deck.setdefault('seed', None)
+    return deck, slides
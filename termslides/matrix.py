@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+from random import getrandbits
+
+import numpy
+from asciimatics.screen import Screen
+
+__all__ = ['Trails']
+
+# rows of a trail drawn, from its head
+_OFFSETS = numpy.array([0, 1, 2, 4, 5], dtype=numpy.intp)
+
+
+def _cells():
+    # a blank cell, then the printable characters in green, then in bold green
+    cells = numpy.empty(1 + 2 * 95, dtype=object)
+    cells[0] = (' ', Screen.COLOUR_WHITE, 0, 0, 1)
+    for i in range(95):
+        cells[1 + i] = (chr(32 + i), Screen.COLOUR_GREEN, 0, 0, 1)
+        cells[96 + i] = (chr(32 + i), Screen.COLOUR_GREEN, Screen.A_BOLD, 0, 1)
+    return cells
+
+
+class Trails(object):
+    """
+    The falling trails of :py:obj:`asciimatics.effects.Matrix`, with the
+    state of all the columns in arrays, so that each step updates them at
+    once and paints all the cells drawn in one pass, rather than a cell at a
+    time through ``print_at``.
+    """
+
+    _CELLS = _cells()
+    _CHARS = numpy.array([ord(x[0]) for x in _CELLS], dtype=numpy.uint32)
+    _FG = numpy.array([x[1] for x in _CELLS], dtype=numpy.int16)
+    _ATTR = numpy.array([x[2] for x in _CELLS], dtype=numpy.uint8)
+
+    def __init__(self, screen):
+        """
+        :param screen: The Screen being used for the Scene.
+        """
+        self._screen = screen
+        # drawn from the seeded random generator, for repeatable shows
+        self._random = numpy.random.default_rng(getrandbits(64))
+        width = screen.width
+        self._x = numpy.arange(width, dtype=numpy.intp)
+        self._y = numpy.zeros(width, dtype=numpy.intp)
+        self._life = numpy.zeros(width, dtype=numpy.intp)
+        self._rate = numpy.zeros(width, dtype=numpy.intp)
+        self._clear = numpy.ones(width, dtype=bool)
+        self._reseed(True)
+
+    def _reseed(self, normal):
+        # start a new trail in the columns whose trail is finished
+        height = self._screen.height
+        self._y += self._rate
+        self._life -= 1
+        done = self._life <= 0
+        count = int(done.sum())
+        if not count:
+            return
+        clear = ~self._clear[done] if normal else numpy.ones(count, dtype=bool)
+        rate = self._random.integers(1, 3, count)
+        y = numpy.where(clear, 0, self._random.integers(0, height // 2 + 1, count) - height // 4)
+        life = numpy.where(clear, height // rate, self._random.integers(1, height - y + 1) // rate)
+        self._clear[done] = clear
+        self._rate[done] = rate
+        self._y[done] = y
+        self._life[done] = life
+
+    def update(self, reseed):
+        """
+        Move all the trails one step down.
+
+        :param reseed: Whether we are in the normal reseed cycle or not.
+        """
+        screen = self._screen
+
+        # the cells drawn by every trail, with blanks erasing the cleared ones -
+        # trails print at "start_line" plus their row, as the stock ones do, which
+        # lands on buffer row "start_line" plus that, less the scrolled "_start_line"
+        y = self._y[:, None] + _OFFSETS + (screen.start_line - screen._start_line)
+        codes = self._random.integers(1, 96, y.shape)
+        codes[:, 3:] += 95
+        codes[self._clear] = 0
+        drawn = (y >= 0) & (y < screen._buffer_height)
+        drawn[self._clear, 3:] = False
+        y = y[drawn]
+        x = numpy.broadcast_to(self._x[:, None], drawn.shape)[drawn]
+        codes = codes[drawn]
+
+        put = getattr(screen._buffer, 'put', None)
+        if put is not None:
+            # straight into the planes of an ArrayCanvas
+            put(x, y, self._CHARS[codes], self._FG[codes], self._ATTR[codes], 0, 1, screen.unicode_aware)
+        elif not screen.unicode_aware:
+            rows = screen._buffer._double_buffer
+            for row, column, cell in zip(y.tolist(), x.tolist(), self._CELLS[codes].tolist()):
+                rows[row][column] = cell
+        else:
+            rows = screen._buffer._double_buffer
+            bisected = []
+            for row, column, cell in zip(y.tolist(), x.tolist(), self._CELLS[codes].tolist()):
+                line = rows[row]
+                if line[column][4] != 1:
+                    bisected.append((line, column, line[column][4]))
+                line[column] = cell
+            # fix up the other half of the double-width glyphs overwritten
+            for line, column, width in bisected:
+                if width == 2 and column + 1 < len(line) and line[column + 1][4] == 0:
+                    line[column + 1] = ('x', 0, 0, 0, 1)
+                elif width == 0 and column > 0 and line[column - 1][4] == 2:
+                    line[column - 1] = ('x', 0, 0, 0, 1)
+        self._reseed(reseed)
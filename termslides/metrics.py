@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+import json
+import socket
+from time import monotonic, perf_counter, time
+
+__all__ = ['Metrics', 'summarise']
+
+
+class Metrics(object):
+    """
+    Stream playback metrics as JSON lines, to a file or to a Unix socket
+    given as "unix:" followed by its path.
+
+    Records have a "type":
+    - "frame": a drawn frame, its cost in ms and the idle frames skipped before it.
+    - "input": the latency in ms from an input event to the next refresh.
+    - "scene": a scene transition and the time in ms to build and reset the new scene.
+
+    Writing never blocks playback: records are sent about once a second, and
+    dropped if a socket reader can't keep up.
+    """
+    FLUSH_INTERVAL = 1.0
+    # bytes kept for a slow socket reader
+    BACKLOG = 1024 * 1024
+
+    def __init__(self, target):
+        """
+        :param target: The file name, or "unix:" followed by the socket path.
+        """
+        self._file = None
+        self._socket = None
+        if target.startswith('unix:'):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(target[len('unix:'):])
+            self._socket.setblocking(False)
+        else:
+            self._file = open(target, 'a', encoding='utf-8')
+        self._records = []
+        self._backlog = b''
+        self._flushed = monotonic()
+        self._idle = 0
+        # time of the first input event not painted yet
+        self._pending = None
+
+    def _emit(self, record):
+        record['t'] = round(time(), 3)
+        self._records.append(json.dumps(record, separators=(',', ':')))
+        if monotonic() - self._flushed >= self.FLUSH_INTERVAL:
+            self.flush()
+
+    def input(self, event):
+        """
+        Note an input event, its latency is measured at the next refresh.
+        """
+        if self._pending is None:
+            self._pending = perf_counter()
+
+    def idle(self):
+        """
+        Note a frame skipped as no effect needed an update.
+        """
+        self._idle += 1
+
+    def frame(self, scene, frame_no, cost):
+        """
+        Note a drawn frame.
+
+        :param scene: The scene name.
+        :param frame_no: The frame number.
+        :param cost: The time spent on the frame in seconds.
+        """
+        self._emit({'type': 'frame', 'scene': scene, 'frame': frame_no,
+                    'ms': round(cost * 1000, 3), 'idle': self._idle})
+        self._idle = 0
+        if self._pending is not None:
+            self._emit({'type': 'input', 'scene': scene,
+                        'ms': round((perf_counter() - self._pending) * 1000, 3)})
+            self._pending = None
+
+    def transition(self, old, new, cost):
+        """
+        Note a scene transition.
+
+        :param old: The name of the scene left.
+        :param new: The name of the scene entered.
+        :param cost: The time spent building and resetting the new scene in seconds.
+        """
+        self._emit({'type': 'scene', 'from': old, 'to': new, 'ms': round(cost * 1000, 3)})
+
+    def flush(self):
+        data = ''.join(x + '\n' for x in self._records)
+        self._records = []
+        self._flushed = monotonic()
+        if self._file is not None:
+            self._file.write(data)
+            self._file.flush()
+            return
+
+        self._backlog += data.encode('utf-8')
+        try:
+            sent = self._socket.send(self._backlog)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
+            # the reader is gone, stop sending
+            sent = len(self._backlog)
+        self._backlog = self._backlog[sent:]
+        if len(self._backlog) > self.BACKLOG:
+            # drop the oldest records
+            self._backlog = self._backlog[self._backlog.find(b'\n', len(self._backlog) - self.BACKLOG) + 1:]
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+        else:
+            self._socket.close()
+
+
+def _percentile(values, percent):
+    # nearest rank
+    values = sorted(values)
+    return values[max(0, -(-len(values) * percent // 100) - 1)]
+
+
+def summarise(lines):
+    """
+    Summarise a metrics stream.
+
+    :param lines: The JSON lines written by :py:class:`.Metrics`.
+    :returns: Lines of frame time, input latency and scene build time
+        percentiles, per scene and overall.
+    """
+    frames, inputs, scenes = {}, {}, {}
+    idle = drawn = 0
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get('type') == 'frame':
+            frames.setdefault(record['scene'], []).append(record['ms'])
+            idle += record['idle']
+            drawn += 1
+        elif record.get('type') == 'input':
+            inputs.setdefault(record['scene'], []).append(record['ms'])
+        elif record.get('type') == 'scene':
+            scenes.setdefault(record['to'], []).append(record['ms'])
+
+    result = []
+
+    def table(title, groups):
+        result.append(f'{title:<32}{"Count":>8}{"p50 ms":>10}{"p90 ms":>10}{"p99 ms":>10}{"Max ms":>10}')
+        everything = [x for values in groups.values() for x in values]
+        for name, values in list(groups.items()) + ([('(all)', everything)] if len(groups) > 1 else []):
+            result.append(f'{str(name):<32}{len(values):>8}' +
+                          ''.join(f'{_percentile(values, x):>10.1f}' for x in (50, 90, 99, 100)))
+        result.append('')
+
+    table('Frame time', frames)
+    table('Input to paint latency', inputs)
+    table('Scene build time', scenes)
+    total = drawn + idle
+    result.append(f'Frames drawn: {drawn}, idle frames skipped: {idle}'
+                  f' ({idle * 100 / total if total else 0:.1f}%)')
+    return result
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+import sys
+from time import monotonic
+
+__all__ = ['OutputMeter', 'LowBandwidth']
+
+
+class OutputMeter(object):
+    """
+    Count the bytes written to the terminal, per frame and per slide.
+    """
+
+    def __init__(self):
+        self._bytes = 0
+        # slide name -> [frames, bytes, largest frame]
+        self.slides = {}
+
+    def install(self, screen):
+        """
+        Count everything the screen writes from now on.
+        """
+        write = screen._safe_write
+        refresh = screen.refresh
+
+        def counting_write(msg):
+            self._bytes += len(msg.encode('utf-8'))
+            write(msg)
+
+        def counting_refresh():
+            refresh()
+            self.frame(screen._scenes[screen._scene_index].name if screen._scenes else None)
+
+        screen._safe_write = counting_write
+        screen.refresh = counting_refresh
+
+    def frame(self, name):
+        """
+        Close the current frame, accounting it to the named slide.
+        """
+        stats = self.slides.setdefault(name, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += self._bytes
+        stats[2] = max(stats[2], self._bytes)
+        self._bytes = 0
+
+    def report(self):
+        """
+        :return: Lines of bytes written per slide.
+        """
+        lines = [f'{"Slide":<32}{"Frames":>8}{"Total KB":>10}{"Bytes/frame":>13}{"Max bytes":>11}']
+        total = 0
+        for name, (frames, nbytes, largest) in self.slides.items():
+            total += nbytes
+            lines.append(f'{str(name):<32}{frames:>8}{nbytes / 1024:>10.1f}'
+                         f'{nbytes // max(frames, 1):>13}{largest:>11}')
+        lines.append(f'Total: {total / 1024:.1f} KB')
+        return lines
+
+
+class LowBandwidth(object):
+    """
+    Terminal output tuned for slow links, on ANSI terminals.
+
+    Each frame is sent as a single write.  Changed cells are sent row by row in
+    runs, bridging short gaps of unchanged cells when that is cheaper than
+    moving the cursor, and cursor moves use the shortest sequence.  Scrolling
+    uses the terminal scroll region, and an optional cap on bytes per second
+    holds frames back, letting their changes merge into later ones.
+    """
+    # unchanged cells worth rewriting rather than moving the cursor over
+    GAP = 4
+
+    def __init__(self, rate=0):
+        """
+        :param rate: The cap in bytes per second, 0 for no cap.
+        """
+        self._rate = rate
+        self._tokens = rate
+        self._last = monotonic()
+        self._screen = None
+        self._region = None
+
+    def install(self, screen):
+        """
+        Replace the refresh and scroll of the screen.
+        """
+        self._screen = screen
+        screen.refresh = self.refresh
+        screen._scroll = self._scroll
+
+    def _throttled(self):
+        if self._rate <= 0:
+            return False
+        now = monotonic()
+        self._tokens = min(self._rate, self._tokens + (now - self._last) * self._rate)
+        self._last = now
+        return self._tokens <= 0
+
+    def _scroll(self, lines):
+        screen = self._screen
+        # set the scroll region to the whole screen once, then scroll it
+        if self._region != screen.height:
+            screen._safe_write(f'\x1b[1;{screen.height}r')
+            self._region = screen.height
+        count = str(abs(lines)) if abs(lines) > 1 else ''
+        screen._safe_write(f'\x1b[{count}S' if lines > 0 else f'\x1b[{count}T')
+
+    def _move(self, x, y):
+        screen = self._screen
+        if y == screen._cur_y and x == screen._cur_x:
+            return ''
+        if y == screen._cur_y and screen._cur_x is not None and x > screen._cur_x:
+            return f'\x1b[{x - screen._cur_x}C' if x - screen._cur_x > 1 else '\x1b[C'
+        if x == 0 and screen._cur_y is not None and y == screen._cur_y + 1:
+            return '\r\n'
+        if x == 0 and y == screen._cur_y:
+            return '\r'
+        return f'\x1b[{y + 1};{x + 1}H'
+
+    def refresh(self):
+        """
+        Refresh the screen with a single write.
+        """
+        screen = self._screen
+        if self._throttled():
+            return
+
+        # collect everything, colours included, then write it at once
+        write = screen._safe_write
+        out = []
+        screen._safe_write = out.append
+        try:
+            if screen._last_start_line != screen._start_line:
+                self._scroll(screen._start_line - screen._last_start_line)
+                screen._last_start_line = screen._start_line
+                screen._cur_x = screen._cur_y = None
+
+            buffer = screen._buffer
+            for y in range(min(screen.height, buffer.height)):
+                new_line = buffer._double_buffer[y]
+                old_line = buffer._screen_buffer[y]
+                if new_line == old_line:
+                    continue
+                changed = [x for x in range(buffer.width) if new_line[x] != old_line[x]]
+                runs = []
+                start = end = changed[0]
+                for x in changed[1:]:
+                    # bridge the gap only if it doesn't need colour changes
+                    colours = new_line[end][1:4]
+                    if x - end - 1 > self.GAP or any(new_line[i][1:4] != colours for i in range(end + 1, x)):
+                        runs.append((start, end))
+                        start = x
+                    end = x
+                runs.append((start, end))
+                for start, end in runs:
+                    for x in range(start, end + 1):
+                        cell = new_line[x]
+                        if cell[4] <= 0:
+                            continue
+                        screen._change_colours(cell[1], cell[2], cell[3])
+                        out.append(self._move(x, y))
+                        out.append(cell[0])
+                        screen._cur_x = x + cell[4]
+                        screen._cur_y = y
+        finally:
+            screen._safe_write = write
+
+        data = ''.join(out)
+        write(data)
+        if self._rate > 0:
+            self._tokens -= len(data.encode('utf-8'))
+        buffer.sync()
+        try:
+            sys.stdout.flush()
+        except (OSError, ValueError):
+            pass
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import cProfile
+import io
+import pstats
+import sys
+from contextlib import contextmanager
+from time import perf_counter, process_time
+
+__all__ = ['Profiler']
+
+
+def _code_key(function):
+    # the key of a function in profile stats
+    code = getattr(getattr(function, '__func__', function), '__code__', None)
+    if code is None:
+        return None
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+def _subclasses(cls):
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from _subclasses(sub)
+
+
+class Profiler(object):
+    """
+    Profile a show with cProfile, and break the CPU time down by phase: deck
+    loading, slide building, renderers by content type, effect updates by
+    effect class and terminal refresh.
+
+    Only the main thread is profiled, diagrams rendered in background are not.
+    """
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        # phase name -> [count, wall time, CPU time]
+        self._phases = {}
+        # label -> function
+        self._watched = {}
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Account the time spent in the block to the named phase.
+        """
+        wall, cpu = perf_counter(), process_time()
+        try:
+            yield
+        finally:
+            stats = self._phases.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += perf_counter() - wall
+            stats[2] += process_time() - cpu
+
+    def watch(self, label, function):
+        """
+        Report the cumulative time of a function, e.g. the screen refresh.
+        Watching a label again, e.g. for the screen opened again after a
+        resize, replaces its function.
+        """
+        self._watched[label] = function
+
+    def _renderers(self):
+        from termslides.widgets import _type_map
+        # "fire" animation and "rainbow" colour wrap renderers too
+        extra = [('fire', ('termslides.fire', 'FireText')), ('fire', ('asciimatics.renderers', 'Fire')),
+                 ('rainbow', ('termslides.renderers', 'RainbowText'))]
+        for type_, (module, name) in list(_type_map.items()) + extra:
+            # only renderers which were used, and so imported
+            cls = getattr(sys.modules.get(module), name, None)
+            if cls is not None:
+                yield type_, cls.__init__
+
+    def _effects(self):
+        from asciimatics.effects import Effect
+        for cls in set(_subclasses(Effect)):
+            if '_update' in cls.__dict__:
+                yield cls.__name__, cls._update
+
+    def summary(self):
+        """
+        :return: Lines of the time spent per phase, and the top functions.
+        """
+        stats = pstats.Stats(self._profile)
+        lines = [f'{"Phase":<40}{"Calls":>10}{"Wall s":>10}{"CPU s":>10}']
+        for name, (count, wall, cpu) in self._phases.items():
+            lines.append(f'{name:<40}{count:>10}{wall:>10.3f}{cpu:>10.3f}')
+
+        def section(title, functions):
+            rows = []
+            for label, function in functions:
+                entry = stats.stats.get(_code_key(function))
+                if entry is not None:
+                    rows.append((entry[3], entry[1], label))
+            lines.append('')
+            lines.append(f'{title:<40}{"Calls":>10}{"Cum. s":>10}')
+            for cumulative, calls, label in sorted(rows, reverse=True):
+                lines.append(f'{label:<40}{calls:>10}{cumulative:>10.3f}')
+
+        section('Renderer construction by type', self._renderers())
+        section('Effect updates by class', self._effects())
+        section('Watched', self._watched.items())
+
+        text = io.StringIO()
+        stats.stream = text
+        stats.sort_stats('cumulative').print_stats(20)
+        lines.append('')
+        lines.extend(text.getvalue().strip('\n').split('\n'))
+        return lines
+
+    def save(self, filename):
+        """
+        Write the profile stats to a file, loadable with pstats, and the
+        summary to the same file name with ".txt" appended.
+        """
+        self._profile.dump_stats(filename)
+        with open(f'{filename}.txt', 'w', encoding='utf-8') as summary:
+            summary.write('\n'.join(self.summary()) + '\n')
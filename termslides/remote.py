@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import select
+import sys
+import threading
+from collections import deque
+
+from asciimatics.event import KeyboardEvent
+from asciimatics.screen import Screen
+
+from termslides.events import ControlEvent
+
+__all__ = ['Remote', 'ControlEvent']
+
+# keys pressed for the commands, in presentation mode and in slides list mode
+_KEYS = {
+    False: {'next': ord(' '), 'prev': Screen.KEY_LEFT, 'list': ord('q')},
+    True: {'next': Screen.KEY_DOWN, 'prev': Screen.KEY_UP, 'list': None},
+}
+COMMANDS = ['next', 'prev', 'goto', 'list', 'current']
+
+
+class Remote(object):
+    """
+    Control endpoint taking line commands from presenter clickers and scripts,
+    on a Unix socket given as "unix:" followed by its path, or on TCP given as
+    "HOST:PORT".
+
+    - next, prev, list: As the keys, e.g. space, left and q in presentation
+      mode.
+    - goto SLIDE: Show a slide, by name or by number from 1.
+    - current: Reply the number and the name of the slide shown, or "list" in
+      slides list mode.
+
+    Each command is replied "ok", with the slide for "current", or "error"
+    followed by the reason.  The server runs on an asyncio loop in its own
+    thread, and wakes the frame loop when a command arrives, so that it is
+    handled at once rather than at the next frame.
+    """
+
+    def __init__(self, address):
+        """
+        :param address: The socket path after "unix:", or the TCP "HOST:PORT".
+        """
+        self.address = address
+        self._commands = deque()
+        self._screen = None
+        self._feed = None
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_w, False)
+        self._loop = None
+        self._stop = None
+        self._error = None
+        self._thread = None
+
+    def start(self):
+        """
+        Start serving, in a daemon thread.
+
+        :raises OSError: If the address can't be listened on.
+        """
+        ready = threading.Event()
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(ready),),
+                                        name='control', daemon=True)
+        self._thread.start()
+        ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """
+        Stop serving.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._stop.set_result, None)
+            self._thread.join()
+        if self.address.startswith('unix:') and os.path.exists(self.address[len('unix:'):]):
+            os.unlink(self.address[len('unix:'):])
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+    def install(self, screen):
+        """
+        Take commands as input events of the screen.
+
+        :param screen: The Screen, every time it is created.
+        """
+        self._screen = screen
+        get_event = screen.get_event
+
+        def remote_event():
+            while self._commands:
+                event = self._translate(self._commands.popleft())
+                if event is not None:
+                    return event
+            event = get_event()
+            return self._translate(event) if isinstance(event, ControlEvent) else event
+
+        screen.get_event = remote_event
+        # headless screens wait on their own input queue
+        self._feed = getattr(screen, 'feed', None)
+        if self._feed is None and os.name == 'posix':
+            def wait_for_input(timeout):
+                if self._commands:
+                    return
+                try:
+                    readable = select.select([sys.stdin, self._wake_r], [], [], timeout)[0]
+                except OSError:
+                    return
+                if self._wake_r in readable:
+                    os.read(self._wake_r, 4096)
+
+            screen.wait_for_input = wait_for_input
+
+    def _translate(self, event):
+        # from a command to the event handled by the scene, in the frame loop
+        screen = self._screen
+        scene = screen._scenes[screen._scene_index]
+        slides = [x.name for x in screen._scenes if x.name != '__slides_list__']
+        listing = scene.name == '__slides_list__'
+        if event.command == 'current':
+            event.reply('ok list' if listing else f'ok {slides.index(scene.name) + 1} {scene.name}')
+            return None
+        if event.command == 'goto':
+            name = event.argument
+            if name not in slides and name.isdigit() and 1 <= int(name) <= len(slides):
+                name = slides[int(name) - 1]
+            if name not in slides:
+                event.reply(f'error no slide {event.argument}')
+                return None
+            event.argument = name
+            event.reply('ok')
+            return event
+        event.reply('ok')
+        key = _KEYS[listing][event.command]
+        return None if key is None else KeyboardEvent(key)
+
+    def _post(self, event):
+        # from the server thread
+        if self._feed is not None:
+            self._feed(event)
+            return
+        self._commands.append(event)
+        try:
+            os.write(self._wake_w, b'.')
+        except BlockingIOError:
+            # already woken
+            pass
+
+    async def _serve(self, ready):
+        self._loop = asyncio.get_running_loop()
+        self._stop = self._loop.create_future()
+        try:
+            if self.address.startswith('unix:'):
+                path = self.address[len('unix:'):]
+                if os.path.exists(path):
+                    os.unlink(path)
+                server = await asyncio.start_unix_server(self._client, path)
+            else:
+                host, _, port = self.address.rpartition(':')
+                server = await asyncio.start_server(self._client, host or None, int(port))
+                # the port picked, if 0
+                self.address = '{}:{}'.format(*server.sockets[0].getsockname()[:2])
+        except (OSError, ValueError) as e:
+            self._error = e
+            ready.set()
+            return
+        async with server:
+            ready.set()
+            await self._stop
+
+    async def _client(self, reader, writer):
+        loop = asyncio.get_running_loop()
+
+        def write(text):
+            if not writer.is_closing():
+                writer.write(text.encode('utf-8') + b'\n')
+
+        def reply(text):
+            loop.call_soon_threadsafe(write, text)
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command, _, argument = line.decode('utf-8', 'replace').strip().partition(' ')
+                command = command.lower()
+                if not command:
+                    continue
+                if command not in COMMANDS:
+                    write(f'error unknown command {command}, expect one of {", ".join(COMMANDS)}')
+                    continue
+                self._post(ControlEvent(command, argument.strip(), reply))
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -1,21 +1,236 @@
 # -*- coding: utf-8 -*-
 
+import csv
+from hashlib import sha1
 from os import path
 from subprocess import Popen, PIPE
+from asciimatics.constants import (
+    COLOUR_RED, COLOUR_GREEN, COLOUR_YELLOW, COLOUR_BLUE, COLOUR_MAGENTA, COLOUR_CYAN, COLOUR_WHITE,
+    A_BOLD, A_NORMAL,
+)
 from asciimatics.renderers import StaticRenderer
-from tabulate import tabulate
+
+
+_ALIGNS = ['left', 'centre', 'center', 'right']
+
+
+def _tokens(paragraph):
+    """
+    Split a paragraph into the units a line may break between: words, and
+    each wide character, as (text, cells, whether a space comes before).
+    """
+    from wcwidth import wcwidth
+    tokens = []
+    space = joined = False
+    for c in paragraph:
+        if c == ' ':
+            space, joined = True, False
+            continue
+        cells = max(0, wcwidth(c))
+        if joined and cells < 2:
+            text, width, before = tokens[-1]
+            tokens[-1] = (text + c, width + cells, before)
+        else:
+            tokens.append((c, cells, space))
+        space, joined = False, cells < 2
+    return tokens
+
+
+def _split(token, width):
+    """
+    Break a token longer than the width into pieces that fit.
+    """
+    from wcwidth import wcwidth
+    pieces = []
+    text, cells = '', 0
+    for c in token[0]:
+        w = max(0, wcwidth(c))
+        if text and cells + w > width:
+            pieces.append((text, cells, False))
+            text, cells = '', 0
+        text, cells = text + c, cells + w
+    pieces.append((text, cells, False))
+    return [(pieces[0][0], pieces[0][1], token[2])] + pieces[1:]
 
 
 class NormalText(StaticRenderer):
     """
-    This class renders the supplied text without effect.
+    This class renders the supplied text without effect, optionally wrapped
+    to a width, aligned and justified.
     """
+    _CACHE = {}
 
-    def __init__(self, text):
+    def __init__(self, text, width=None, align='left', justify=False):
         """
         :param text: The text string to show.
+        :param width: The width in terminal cells to wrap the text to, wide
+            characters (e.g. CJK and emoji) taking two cells. Not wrapped by default.
+        :param align: The alignment of the lines in the width, "left", "centre" or "right".
+        :param justify: Whether to stretch the lines to the width, but the last
+            line of each paragraph.
+        """
+        if width is None:
+            super(NormalText, self).__init__([text])
+            return
+        if align not in _ALIGNS:
+            raise ValueError(f'Unknown text alignment: {align}')
+        if int(width) < 1:
+            raise ValueError(f'Invalid text width: {width}')
+        super(NormalText, self).__init__(['\n'.join(self.layout(text, int(width), align, justify))])
+
+    @staticmethod
+    def layout(text: str, width: int, align: str = 'left', justify: bool = False) -> list:
+        """
+        Wrap the text into lines of the width, padded with spaces.
+
+        The result is cached by text digest, width and options, so that a text
+        is only reflowed when its width changes, e.g. on resize.
+        """
+        key = (sha1(text.encode('utf-8')).hexdigest(), width, align, justify)
+        if key in NormalText._CACHE:
+            return NormalText._CACHE[key]
+
+        lines = []
+        for paragraph in text.split('\n'):
+            # fill the lines greedily, as [[token], cells]
+            wrapped = [[[], 0]]
+            for token in _tokens(paragraph):
+                for piece in (_split(token, width) if token[1] > width else [token]):
+                    line = wrapped[-1]
+                    gap = 1 if line[0] and piece[2] else 0
+                    if line[0] and line[1] + gap + piece[1] > width:
+                        wrapped.append([[], 0])
+                        line, gap = wrapped[-1], 0
+                    line[0].append(piece)
+                    line[1] += gap + piece[1]
+
+            for i, (tokens, cells) in enumerate(wrapped):
+                gaps = [j for j, token in enumerate(tokens) if j > 0 and token[2]]
+                extra = width - cells
+                spaces = {j: 1 for j in gaps}
+                if justify and gaps and i < len(wrapped) - 1:
+                    for n, j in enumerate(gaps):
+                        spaces[j] += extra // len(gaps) + (1 if n < extra % len(gaps) else 0)
+                    extra = 0
+                line = ''.join(' ' * spaces.get(j, 0) + token[0] for j, token in enumerate(tokens))
+                left = {'centre': extra // 2, 'center': extra // 2, 'right': extra}.get(align, 0)
+                lines.append(' ' * left + line + ' ' * (extra - left))
+
+        NormalText._CACHE[key] = lines
+        return lines
+
+
+# token type to (foreground, attribute, background), looked up through the token parents
+_CODE_THEMES = {
+    'default': {
+        'Token': (COLOUR_WHITE, A_NORMAL, None),
+        'Token.Keyword': (COLOUR_MAGENTA, A_BOLD, None),
+        'Token.Name.Builtin': (COLOUR_CYAN, A_NORMAL, None),
+        'Token.Name.Function': (COLOUR_BLUE, A_BOLD, None),
+        'Token.Name.Class': (COLOUR_BLUE, A_BOLD, None),
+        'Token.Name.Decorator': (COLOUR_CYAN, A_NORMAL, None),
+        'Token.Literal.String': (COLOUR_GREEN, A_NORMAL, None),
+        'Token.Literal.Number': (COLOUR_YELLOW, A_NORMAL, None),
+        'Token.Operator': (COLOUR_RED, A_NORMAL, None),
+        'Token.Comment': (COLOUR_BLUE, A_NORMAL, None),
+        'Token.Error': (COLOUR_RED, A_BOLD, None),
+    },
+    'monochrome': {
+        'Token': (COLOUR_WHITE, A_NORMAL, None),
+        'Token.Keyword': (COLOUR_WHITE, A_BOLD, None),
+        'Token.Name.Function': (COLOUR_WHITE, A_BOLD, None),
+        'Token.Name.Class': (COLOUR_WHITE, A_BOLD, None),
+    },
+}
+
+
+class CodeText(StaticRenderer):
+    """
+    This class renders the supplied source code with syntax highlighting.
+    """
+    _CACHE = {}
+
+    def __init__(self, text, lang=None, theme='default'):
+        """
+        :param text: The source code to show.
+        :param lang: The language name known by Pygments, e.g. "python".
+            Defaults to plain text.
+        :param theme: The colour theme, "default" or "monochrome".
+        """
+        super(CodeText, self).__init__()
+        if theme not in _CODE_THEMES:
+            raise ValueError(f'Unknown code theme: {theme}')
+        image, colour_map = self.highlight(text, lang, theme)
+        self._plain_images = [image]
+        self._colour_map = [colour_map]
+
+    @staticmethod
+    def highlight(text: str, lang: str = None, theme: str = 'default') -> tuple:
+        """
+        Tokenize the source code into lines and their per-cell colour map.
+
+        The result is cached by source digest, language and theme, so that
+        the same listing is only tokenized once.
+        """
+        key = (sha1(text.encode('utf-8')).hexdigest(), lang, theme)
+        if key in CodeText._CACHE:
+            return CodeText._CACHE[key]
+
+        from pygments.lexers import get_lexer_by_name
+        lexer = get_lexer_by_name(lang or 'text', stripnl=False, ensurenl=False, tabsize=4)
+        styles = _CODE_THEMES[theme]
+        token_colours = {}
+        image, colour_map = [''], [[]]
+        for token, value in lexer.get_tokens(text):
+            if token not in token_colours:
+                parent = token
+                while str(parent) not in styles:
+                    parent = parent.parent
+                token_colours[token] = styles[str(parent)]
+            colour = token_colours[token]
+            for i, part in enumerate(value.split('\n')):
+                if i > 0:
+                    image.append('')
+                    colour_map.append([])
+                image[-1] += part
+                colour_map[-1].extend([colour] * len(part))
+        # drop the empty line after the final newline
+        if len(image) > 1 and not image[-1]:
+            image.pop()
+            colour_map.pop()
+
+        CodeText._CACHE[key] = (image, colour_map)
+        return CodeText._CACHE[key]
+
+
+class RainbowText(StaticRenderer):
+    """
+    Chained renderer adding rainbow colours to another renderer, as
+    :py:obj:`asciimatics.renderers.Rainbow`, with the colour maps built
+    directly rather than parsed from colour mark-ups.
+    """
+    _CACHE = {}
+
+    def __init__(self, screen, renderer):
+        """
+        :param screen: The screen object for this renderer.
+        :param renderer: The renderer to wrap, without multi-colour text.
         """
-        super(NormalText, self).__init__([text])
+        super(RainbowText, self).__init__()
+        from asciimatics.renderers import Rainbow
+        palette = Rainbow._256_palette if screen.colours > 16 else Rainbow._16_palette
+        images = tuple(tuple(image) for image in renderer.images)
+        key = (images, len(palette))
+        if key not in RainbowText._CACHE:
+            # the colours of the cells are shared between the lines
+            colours = [(x, A_BOLD, None) for x in palette]
+            width = max([len(line) for image in images for line in image] + [0])
+            colours = colours * (width // len(colours) + 2)
+            RainbowText._CACHE[key] = [
+                [colours[y % len(palette):y % len(palette) + len(line)] for y, line in enumerate(image)]
+                for image in images]
+        self._plain_images = [list(image) for image in images]
+        self._colour_map = RainbowText._CACHE[key]
 
 
 class UMLText(StaticRenderer):
@@ -23,16 +238,129 @@ class UMLText(StaticRenderer):
     This class renders the supplied text to UML diagram.
     """
     PLANTUML_PATH = path.join(path.dirname(__file__), 'lib', 'plantuml.1.2021.9.jar')
-    PLANTUML_URL = 'http://www.plantuml.com/plantuml/txt/'
+    PLANTUML_URL = 'http://www.plantuml.com/plantuml'
+    PLACEHOLDER = 'rendering diagram…'
     _CACHE = {}
+    _BACKEND = None
+    _WORKER = None
 
-    def __init__(self, text: str) -> None:
+    def __init__(self, text: str, background: bool = False) -> None:
         """
         :param text: The text string to show.
+        :param background: Whether to render in a background worker, showing
+            a placeholder until the diagram is ready, see :py:meth:`.on_ready`.
         """
         super(UMLText, self).__init__()
-        self.uml = self.get_plantuml()
-        self._images = [self.uml.processes(text).decode("utf-8")]
+        self._future = None
+        self._listeners = []
+        if not background or hash(text) in UMLText._CACHE:
+            self.uml = self.get_plantuml()
+            self._images = [self.uml.processes(text).decode("utf-8")]
+            return
+
+        self.uml = None
+        self._images = [self._placeholder(text)]
+        if hasattr(UMLText._BACKEND, 'submit'):
+            # a server fetches in parallel
+            self._future = UMLText._BACKEND.submit(text)
+            return
+        if UMLText._WORKER is None:
+            from concurrent.futures import ThreadPoolExecutor
+            UMLText._WORKER = ThreadPoolExecutor(max_workers=1, thread_name_prefix='uml')
+        self._future = UMLText._WORKER.submit(lambda: self.get_plantuml().processes(text))
+
+    @staticmethod
+    def use_server(url, workers=8):
+        """
+        Render diagrams with a PlantUML server rather than the local jar.
+
+        :param url: The server URL, e.g. "http://localhost:8080".
+        :param workers: The maximum number of concurrent requests.
+        """
+        from termslides.umlserver import PlantUMLServer
+        UMLText._BACKEND = PlantUMLServer(url, workers)
+
+    @staticmethod
+    def prefetch(texts):
+        """
+        Start rendering diagrams with the PlantUML server in parallel, if
+        one is used, so that they are ready when shown.
+
+        :param texts: The diagram sources.
+        """
+        if hasattr(UMLText._BACKEND, 'prefetch'):
+            UMLText._BACKEND.prefetch(texts)
+
+    @classmethod
+    def _placeholder(cls, text):
+        # a box roughly the size of the diagram, a line per line of source
+        height = max(3, len([x for x in text.split('\n') if x.strip()]))
+        width = max(40, len(cls.PLACEHOLDER) + 4)
+        lines = ['+' + '-' * (width - 2) + '+']
+        lines += ['|' + ' ' * (width - 2) + '|'] * (height - 2)
+        lines += ['+' + '-' * (width - 2) + '+']
+        lines[height // 2] = '|' + cls.PLACEHOLDER.center(width - 2) + '|'
+        return '\n'.join(lines)
+
+    @property
+    def ready(self):
+        """
+        :return: Whether the diagram is rendered, rather than the placeholder.
+        """
+        self._poll()
+        return self._future is None
+
+    def on_ready(self, callback, wake=None):
+        """
+        Get notified when the diagram replaces the placeholder.
+
+        :param callback: Called with the width and height of the placeholder,
+            from the thread drawing the diagram, when it is swapped in.
+        :param wake: Optional function called from the worker thread once the
+            diagram is rendered, e.g. to force a screen update.
+        """
+        if self._future is None:
+            return
+        self._listeners.append(callback)
+        if wake is not None:
+            self._future.add_done_callback(lambda _: wake())
+
+    def _poll(self):
+        # swap the diagram in, from the thread using the renderer
+        if self._future is None or not self._future.done():
+            return
+        future, self._future = self._future, None
+        width, height = self.max_width, self.max_height
+        self.uml = UMLText._BACKEND
+        if future.exception() is not None:
+            self._images = [f'{type(future.exception()).__name__}: {future.exception()}']
+        else:
+            self._images = [future.result().decode("utf-8")]
+        self._plain_images = []
+        self._max_width = self._max_height = 0
+        for callback in self._listeners:
+            callback(width, height)
+        self._listeners = []
+
+    @property
+    def images(self):
+        self._poll()
+        return super(UMLText, self).images
+
+    @property
+    def rendered_text(self):
+        self._poll()
+        return super(UMLText, self).rendered_text
+
+    @property
+    def max_height(self):
+        self._poll()
+        return super(UMLText, self).max_height
+
+    @property
+    def max_width(self):
+        self._poll()
+        return super(UMLText, self).max_width
 
     @staticmethod
     def processes(text: str) -> str:
@@ -49,14 +377,22 @@ class UMLText(StaticRenderer):
 
     @staticmethod
     def get_plantuml() -> bool:
+        if UMLText._BACKEND is not None:
+            return UMLText._BACKEND
         from sys import platform
-        from plantuml import PlantUML
-        # check local lib
-        proc = Popen(['java', '-jar', UMLText.PLANTUML_PATH, '-version'], stdout=PIPE, stderr=PIPE)
-        _ = proc.communicate()
-        if proc.returncode or platform != 'linux':
-            return PlantUML(UMLText.PLANTUML_URL)
-        return UMLText
+        # check local lib, once
+        try:
+            proc = Popen(['java', '-jar', UMLText.PLANTUML_PATH, '-version'], stdout=PIPE, stderr=PIPE)
+            _ = proc.communicate()
+            failed = proc.returncode
+        except OSError:
+            failed = True
+        if failed or platform != 'linux':
+            from termslides.umlserver import PlantUMLServer
+            UMLText._BACKEND = PlantUMLServer(UMLText.PLANTUML_URL)
+        else:
+            UMLText._BACKEND = UMLText
+        return UMLText._BACKEND
 
 
 class TableText(StaticRenderer):
@@ -68,7 +404,163 @@ class TableText(StaticRenderer):
         """
         :param data: The table data to show.
         """
+        from tabulate import tabulate
         super(TableText, self).__init__()
         headers = 'firstrow' if hasHeader else ()
         self._images = [
             tabulate(data, headers=headers, tablefmt=tablefmt, numalign=numalign, floatfmt=floatfmt)]
+
+
+# border lines as (left, fill, junction, right) and row as (left, separator, right)
+_TABLE_STYLES = {
+    'plain': {'top': None, 'header': None, 'bottom': None, 'row': ('', '  ', ''), 'pad': 0},
+    'simple': {'top': None, 'header': ('', '-', '  ', ''), 'bottom': None, 'row': ('', '  ', ''), 'pad': 0},
+    'grid': {'top': ('+', '-', '+', '+'), 'header': ('+', '=', '+', '+'), 'bottom': ('+', '-', '+', '+'),
+             'row': ('|', '|', '|'), 'pad': 1},
+    'fancy_grid': {'top': ('╒', '═', '╤', '╕'), 'header': ('╞', '═', '╪', '╡'), 'bottom': ('╘', '═', '╧', '╛'),
+                   'row': ('│', '│', '│'), 'pad': 1},
+}
+
+
+class CSVTableText(StaticRenderer):
+    """
+    This class renders a window of rows from a CSV/TSV file to table.
+
+    Column widths are computed by a single streaming pass over the file, after
+    which only the rows inside the window are read back and formatted.  A
+    sparse index of file offsets (one per `INDEX_STEP` rows) makes scrolling
+    cheap without keeping the table in memory.
+    """
+    INDEX_STEP = 256
+
+    def __init__(self, source, height, hasHeader=False, tablefmt='grid', delimiter=None):
+        """
+        :param source: The CSV/TSV file to show.
+        :param height: The number of rows to show at once.
+        :param hasHeader: Whether the first row is the table header.
+        :param tablefmt: One of "plain", "simple", "grid" or "fancy_grid".
+        :param delimiter: The field delimiter, defaults to tab for ".tsv" files and comma otherwise.
+        """
+        super(CSVTableText, self).__init__()
+        if tablefmt not in _TABLE_STYLES:
+            raise ValueError(f'Unsupported table format for file source: {tablefmt}')
+        self._source = source
+        self._height = max(1, int(height))
+        self._has_header = hasHeader
+        self._style = _TABLE_STYLES[tablefmt]
+        if delimiter is None:
+            delimiter = '\t' if source.lower().endswith('.tsv') else ','
+        self._delimiter = delimiter
+        self._header = None
+        self._widths = []
+        self._numeric = []
+        self._offsets = []
+        self._rows = 0
+        self._top = 0
+        self._scan()
+        self._render()
+
+    def _reader(self, stream):
+        # "readline" (rather than iterating the file) keeps "tell" usable
+        return csv.reader(iter(stream.readline, ''), delimiter=self._delimiter)
+
+    def _scan(self):
+        with open(self._source, 'r', newline='', encoding='utf-8') as stream:
+            reader = self._reader(stream)
+            if self._has_header:
+                self._header = next(reader, [])
+                self._fit(self._header)
+            while True:
+                if self._rows % self.INDEX_STEP == 0:
+                    self._offsets.append(stream.tell())
+                row = next(reader, None)
+                if row is None:
+                    break
+                self._fit(row)
+                for i, cell in enumerate(row):
+                    if self._numeric[i] and cell.strip():
+                        try:
+                            float(cell)
+                        except ValueError:
+                            self._numeric[i] = False
+                self._rows += 1
+
+    def _fit(self, row):
+        if len(row) > len(self._widths):
+            self._widths.extend([0] * (len(row) - len(self._widths)))
+            self._numeric.extend([True] * (len(row) - len(self._numeric)))
+        for i, cell in enumerate(row):
+            self._widths[i] = max(self._widths[i], len(cell))
+
+    def _read(self, start, count):
+        rows = []
+        with open(self._source, 'r', newline='', encoding='utf-8') as stream:
+            stream.seek(self._offsets[start // self.INDEX_STEP])
+            reader = self._reader(stream)
+            for _ in range(start % self.INDEX_STEP):
+                next(reader, None)
+            for _ in range(count):
+                row = next(reader, None)
+                if row is None:
+                    break
+                rows.append(row)
+        return rows
+
+    def _line(self, spec):
+        left, fill, junction, right = spec
+        pad = self._style['pad'] * 2
+        return left + junction.join(fill * (w + pad) for w in self._widths) + right
+
+    def _row(self, row, align=True):
+        left, separator, right = self._style['row']
+        pad = ' ' * self._style['pad']
+        cells = []
+        for i, width in enumerate(self._widths):
+            cell = row[i] if i < len(row) else ''
+            cell = cell.rjust(width) if align and self._numeric[i] else cell.ljust(width)
+            cells.append(pad + cell + pad)
+        return left + separator.join(cells) + right
+
+    def _render(self):
+        lines = []
+        if self._style['top']:
+            lines.append(self._line(self._style['top']))
+        if self._header is not None:
+            lines.append(self._row(self._header, align=False))
+            if self._style['header']:
+                lines.append(self._line(self._style['header']))
+        lines.extend(self._row(row) for row in self._read(self._top, self._height))
+        if self._style['bottom']:
+            lines.append(self._line(self._style['bottom']))
+        # bypass "${c,a,b}" parsing, cells are plain text
+        self._plain_images = [lines]
+        self._colour_map = [[[(None, None, None)] * len(line) for line in lines]]
+        self._max_width = 0
+
+    def scroll(self, lines):
+        """
+        Move the window by the specified number of rows.
+
+        :param lines: Number of rows to scroll, negative numbers scroll up.
+        :returns: Whether the window has moved.
+        """
+        top = max(0, min(self._top + lines, self._rows - self._height))
+        if top == self._top:
+            return False
+        self._top = top
+        self._render()
+        return True
+
+    @property
+    def page(self):
+        """
+        The number of rows in the window.
+        """
+        return self._height
+
+    @property
+    def rows(self):
+        """
+        The number of rows in the table, excluding header.
+        """
+        return self._rows
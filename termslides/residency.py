@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+import random
+import sys
+from collections import OrderedDict
+from types import FunctionType, GeneratorType, MethodType, ModuleType
+
+from asciimatics.scene import Scene
+from asciimatics.screen import _AbstractCanvas
+
+from termslides.widgets import _reseed
+
+__all__ = ['SlideScene', 'Residency']
+
+
+def footprint(effects):
+    """
+    Estimate the memory used by effects, renderers and their images.
+
+    Objects shared with the rest of the application (canvas, scene, code) are
+    not counted.
+
+    :param effects: The effects to measure.
+    :returns: The estimated size in bytes.
+    """
+    size = 0
+    seen = set()
+    stack = list(effects)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, (_AbstractCanvas, Scene, type, ModuleType, FunctionType, MethodType)):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, '__dict__'):
+            stack.append(obj.__dict__)
+    return size
+
+
+class SlideScene(Scene):
+    """
+    A scene whose effects are built when needed and may be evicted to save
+    memory, to be built again when shown next time.
+    """
+
+    def __init__(self, build, handler, residency, duration=-1, clear=True, name=None, seed=None):
+        """
+        :param build: A function returning the effects of the slide, or a
+            generator building them a step at a time and returning them.
+        :param handler: The input handler effect, kept at the bottom of the effects.
+        :param residency: The :py:obj:`.Residency` managing this scene.
+        :param duration: The number of frames in this Scene, see :py:obj:`.Scene`.
+        :param clear: Whether to clear the Screen at the start of the Scene.
+        :param name: Optional name to identify the scene.
+        :param seed: Optional seed of the random generator, re-applied when the
+            effects are built and when the scene starts, for repeatable animations.
+        """
+        super(SlideScene, self).__init__([], -1, clear, name)
+        self._build = build
+        self._handler = handler
+        self._residency = residency
+        self._duration = duration
+        self._auto_duration = -1
+        self._resident = False
+        self._seed = seed
+        # the build in progress, and its random state between steps
+        self._steps = None
+        self._state = None
+        self.footprint = 0
+
+    def materialise(self):
+        """
+        Build the effects if they are not resident.
+        """
+        while not self.step():
+            pass
+
+    def step(self):
+        """
+        Build the effects a step at a time, e.g. a content item, so that a
+        slide is built in the spare time between frames.
+
+        :returns: Whether the effects are resident.
+        """
+        if self._resident:
+            return True
+        if self._steps is None:
+            self._steps = self._building()
+        # may be built while another slide plays, keep its random sequence
+        state = random.getstate()
+        if self._state is not None:
+            random.setstate(self._state)
+        try:
+            next(self._steps)
+            self._state = random.getstate()
+        except StopIteration:
+            self._steps = self._state = None
+        except Exception:
+            # built from the start next time
+            self._steps = self._state = None
+            raise
+        finally:
+            random.setstate(state)
+        return self._resident
+
+    def _building(self):
+        _reseed(self._seed, self.name, 'build')
+        effects = self._build()
+        if isinstance(effects, GeneratorType):
+            effects = yield from effects
+        self._effects = []
+        self.add_effect(self._handler, reset=False)
+        for effect in effects:
+            self.add_effect(effect, reset=False)
+        for effect in self._effects[1:]:
+            # convert the images of renderers now rather than on first frame
+            renderer = getattr(effect, '_renderer', None)
+            if renderer is not None:
+                renderer.max_width
+        self._auto_duration = max(x.stop_frame for x in self._effects)
+        self._resident = True
+        if self._residency.measured:
+            self.footprint = footprint(self._effects[1:])
+        self._residency.admit(self)
+
+    def evict(self):
+        """
+        Drop the effects, keeping only what is needed to build them again.
+        """
+        self._steps = self._state = None
+        self._effects = []
+        self._resident = False
+        self.footprint = 0
+
+    def reset(self, old_scene=None, screen=None):
+        self.materialise()
+        self._residency.enter(self)
+        _reseed(self._seed, self.name)
+        super(SlideScene, self).reset(old_scene, screen)
+
+    def exit(self):
+        super(SlideScene, self).exit()
+        if self._resident and self._residency.measured:
+            # effects may have grown while playing, e.g. particles
+            self.footprint = footprint(self._effects[1:])
+        self._residency.leave(self)
+
+    @property
+    def handler(self):
+        """
+        :return: The input handler effect of this Scene.
+        """
+        return self._handler
+
+    @handler.setter
+    def handler(self, handler):
+        if self._resident:
+            self._effects[0] = handler
+            handler.register_scene(self)
+        self._handler = handler
+
+    @property
+    def seed(self):
+        """
+        :return: The seed of the random generator for this Scene, if any.
+        """
+        return self._seed
+
+    @property
+    def resident(self):
+        """
+        :return: Whether the effects of this Scene are built.
+        """
+        return self._resident
+
+    @property
+    def effects(self):
+        self.materialise()
+        return self._effects
+
+    @property
+    def duration(self):
+        if self._duration == 0:
+            self.materialise()
+            return self._auto_duration
+        return self._duration
+
+
+class Residency(object):
+    """
+    Keep the effects of the recently used slides and their neighbours within a
+    memory budget, evicting the least recently used ones.
+    """
+
+    def __init__(self, budget=0, neighbours=1, report=False):
+        """
+        :param budget: The memory budget in bytes, 0 for no limit.
+        :param neighbours: How many slides on each side of the current slide
+            are never evicted.
+        :param report: Whether to measure the slides for :py:meth:`.report`
+            even without a budget.
+        """
+        self._budget = budget
+        self._neighbours = neighbours
+        self._report = report
+        self._scenes = []
+        self._lru = OrderedDict()
+        self._current = None
+        # name -> [builds, peak footprint]
+        self._stats = {}
+
+    def manage(self, scenes):
+        """
+        Set the slide scenes, in presentation order.
+        """
+        self._scenes = list(scenes)
+        self._lru = OrderedDict((id(x), x) for x in self._scenes if x.resident)
+        self._current = None
+
+    def admit(self, scene):
+        stats = self._stats.setdefault(scene.name, [0, 0])
+        stats[0] += 1
+        stats[1] = max(stats[1], scene.footprint)
+        self._lru[id(scene)] = scene
+
+    def enter(self, scene):
+        self._current = scene
+        self._lru.move_to_end(id(scene))
+        self._trim()
+
+    def leave(self, scene):
+        stats = self._stats.setdefault(scene.name, [0, 0])
+        stats[1] = max(stats[1], scene.footprint)
+
+    def prefetch(self):
+        """
+        Build a step of the next slide, or else the previous slide, if not
+        built yet, so that it's ready when navigated to.
+
+        :returns: Whether a step was built.
+        """
+        if self._current not in self._scenes:
+            return False
+        index = self._scenes.index(self._current)
+        for i in [index + 1, index - 1]:
+            if 0 <= i < len(self._scenes) and not self._scenes[i].resident:
+                self._scenes[i].step()
+                return True
+        return False
+
+    def _protected(self):
+        if self._current is None or self._current not in self._scenes:
+            return [self._current]
+        index = self._scenes.index(self._current)
+        return self._scenes[max(0, index - self._neighbours):index + self._neighbours + 1]
+
+    def _trim(self):
+        if self._budget <= 0:
+            return
+        protected = [id(x) for x in self._protected()]
+        for key in list(self._lru):
+            if self.total <= self._budget:
+                break
+            if key not in protected:
+                self._lru.pop(key).evict()
+
+    @property
+    def measured(self):
+        """
+        :return: Whether the footprint of the slides is measured, as walking
+            their effects is costly.
+        """
+        return self._budget > 0 or self._report
+
+    @property
+    def total(self):
+        """
+        :return: The estimated memory used by resident scenes, in bytes.
+        """
+        return sum(x.footprint for x in self._lru.values())
+
+    def report(self):
+        """
+        :return: Lines of per-slide memory footprint.
+        """
+        lines = [f'{"Slide":<32}{"Resident":>10}{"Current KB":>12}{"Peak KB":>10}{"Builds":>8}']
+        for scene in self._scenes:
+            builds, peak = self._stats.get(scene.name, [0, 0])
+            lines.append(f'{str(scene.name):<32}{"yes" if scene.resident else "no":>10}'
+                         f'{scene.footprint / 1024:>12.1f}{peak / 1024:>10.1f}{builds:>8}')
+        budget = f'{self._budget / 1024:.1f} KB' if self._budget > 0 else 'none'
+        lines.append(f'Resident total: {self.total / 1024:.1f} KB, budget: {budget}')
+        return lines
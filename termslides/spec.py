@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+
+from types import MappingProxyType
+
+from termslides.loader import _where
+from termslides.clock import FRAME_TIME
+from termslides.widgets import (
+    InvalidParameter, _type_map, _required_param_map, _param_map, _colour_map, _attr_map,
+    _valid_start, _valid_end, _valid_page,
+)
+
+__all__ = ['ItemSpec', 'SlideSpec', 'compile_item', 'compile_slide', 'compile_slides', 'check_deck']
+
+_valid_animation = [None, 'typing', 'mirage', 'fire', 'noise']
+
+# renderer parameters given by the content, and by the screen when built
+_content_param = {'figlet': 'text', 'text': 'text', 'code': 'text', 'uml': 'text',
+                  'table': 'data', 'color-image': 'filename', 'image': 'filename'}
+_screen_params = {'table-source': {'height'}, 'color-image': {'screen', 'uni', 'dither'}, 'image': {'colours'}}
+
+# id of a slide -> (slide, spec), for the slides of the last deck compiled
+_SPECS = {}
+_FONTS = []
+
+
+class _Spec(object):
+    """
+    Immutable record of validated values.
+    """
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __repr__(self):
+        values = ', '.join(f'{x}={getattr(self, x)!r}' for x in self.__slots__ if x != 'mark')
+        return f'{type(self).__name__}({values})'
+
+
+class ItemSpec(_Spec):
+    """
+    A content item of a slide, validated.
+
+    - type: The content type, "table-source" for a table with a "source".
+    - content: The content.
+    - params: The renderer parameters, but those given by the screen.
+    - animation, colour, attr, bg: As in the YAML, colours and attributes as
+      asciimatics constants.
+    - x, y: The position, None for the middle of the screen.
+    - delay: Frames before the item is shown, converted from seconds if given
+      so.
+    - after_start: Whether the item is shown after the starting animation.
+    - mark: The (file, line, column) of the item in the YAML, if known.
+    """
+    __slots__ = ('type', 'content', 'params', 'animation', 'colour', 'attr', 'bg',
+                 'x', 'y', 'delay', 'after_start', 'mark')
+
+
+class SlideSpec(_Spec):
+    """
+    A slide, validated.
+
+    - name: The slide name.
+    - items: The :py:obj:`.ItemSpec` of the content.
+    - notes: The notes, empty if none.
+    - duration: The duration in frames, converted from seconds if given so, -1
+      to wait for a key press, 0 for the time its animations take.
+    - start, end, page: The starting, ending and page animations, or None.
+    - mark: The (file, line, column) of the slide in the YAML, if known.
+    """
+    __slots__ = ('name', 'items', 'notes', 'duration', 'start', 'end', 'page', 'mark')
+
+
+def _integer(data, key, default=None):
+    value = data.get(key, default)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise InvalidParameter(f'{_where(data, key)}{key} must be an integer, got {value!r}')
+
+
+def _frames(data, key, default=None):
+    # frames, or seconds as e.g. "2.5s"
+    value = data.get(key, default)
+    try:
+        if isinstance(value, str) and value.endswith('s'):
+            return round(float(value[:-1]) / FRAME_TIME)
+        return _integer(data, key, default)
+    except (ValueError, InvalidParameter):
+        raise InvalidParameter(f'{_where(data, key)}{key} must be frames or seconds, e.g. "2.5s", got {value!r}')
+
+
+def _choice(data, key, valid, default=None, what=None):
+    value = data.get(key, default)
+    if value not in valid:
+        names = ', '.join(str(x) for x in valid if x is not None)
+        raise InvalidParameter(f'{_where(data, key)}Invalid {what or key}: {value}, expect one of {names}')
+    return value
+
+
+def _fonts():
+    if not _FONTS:
+        from pyfiglet import FigletFont
+        _FONTS.extend(FigletFont.getFonts())
+    return _FONTS
+
+
+def compile_item(item, where=''):
+    """
+    Validate a content item of a slide.
+
+    :param item: The item as loaded from YAML.
+    :param where: The location of the content, if the item has none.
+    :returns: The :py:obj:`.ItemSpec` of the item.
+    :raises InvalidParameter: At the line and column of the faulty value.
+    """
+    if not isinstance(item, dict):
+        raise InvalidParameter(f'{where}expect a content item of key-value pairs, got {item!r}')
+    where = _where(item) or where
+
+    type_ = item.get('type', None)
+    content = item.get('content', None)
+    if type_ == 'table' and 'source' in item:
+        # rows are streamed from an external file instead of "content"
+        type_ = 'table-source'
+        content = item['source']
+    if type_ not in _type_map:
+        raise InvalidParameter(f"{_where(item, 'type') or where}Invalid type: {type_}, "
+                               f"expect one of {', '.join(_type_map)}")
+    if content is None:
+        raise InvalidParameter(f"{where}{type_}: no 'content'")
+
+    # check required param
+    params = {k: item[k] for k in _param_map[type_] if k in item}
+    if type_ in _content_param:
+        params[_content_param[type_]] = content
+    missing = _required_param_map[type_].difference(params, _screen_params.get(type_, ()))
+    if missing:
+        raise InvalidParameter(f'{where}{type_}: require {", ".join(sorted(missing))}')
+
+    animation = _choice(item, 'animation', _valid_animation)
+    colour = _colour_map[_choice(item, 'colour', _colour_map, 'white')]
+    attr = _attr_map[_choice(item, 'attr', _attr_map, 'normal')]
+    bg = _colour_map[_choice(item, 'bg', [x for x in _colour_map if x not in ['rainbow', 'cycle']], 'black')]
+
+    # check conflict
+    if animation in ['typing', 'mirage', 'fire'] and colour == 'cycle':
+        raise InvalidParameter(f"{_where(item, 'colour') or where}'{animation}' and 'cycle' can't be used together")
+    elif animation in ['fire', 'noise'] and type_ != 'figlet':
+        raise InvalidParameter(f"{_where(item, 'animation') or where}'{animation}' only works with 'figlet'")
+    elif type_ == 'table-source' and (animation is not None or colour in ['rainbow', 'cycle']):
+        raise InvalidParameter(f"{where}'source' table doesn't work with '{animation or colour}'")
+
+    # check param values
+    if type_ == 'figlet' and params['font'] not in _fonts():
+        raise InvalidParameter(f"{_where(item, 'font')}Unknown figlet font: {params['font']}")
+    elif type_ == 'code':
+        from termslides.renderers import _CODE_THEMES
+        _choice(item, 'theme', list(_CODE_THEMES), 'default', 'code theme')
+        if item.get('lang') is not None:
+            from pygments.lexers import find_lexer_class_by_name
+            from pygments.util import ClassNotFound
+            try:
+                find_lexer_class_by_name(item['lang'])
+            except ClassNotFound:
+                raise InvalidParameter(f"{_where(item, 'lang')}Unknown code language: {item['lang']}")
+    elif type_ == 'text':
+        from termslides.renderers import _ALIGNS
+        _choice(item, 'align', _ALIGNS, 'left', 'text alignment')
+        width = item.get('width', None)
+        if isinstance(width, str) and width.endswith('%'):
+            if not width[:-1].isdigit() or not 0 < int(width[:-1]) <= 100:
+                raise InvalidParameter(f"{_where(item, 'width')}Invalid text width: {width}")
+        elif width is not None and (_integer(item, 'width') or 0) < 1:
+            raise InvalidParameter(f"{_where(item, 'width')}Invalid text width: {width}")
+    for key in ['width', 'height']:
+        if key in params and (type_, key) != ('text', 'width'):
+            _integer(item, key)
+
+    return ItemSpec(type=type_, content=content, params=MappingProxyType(params),
+                    animation=animation, colour=colour, attr=attr, bg=bg,
+                    x=_integer(item, 'x'), y=_integer(item, 'y'), delay=_frames(item, 'delay', 0),
+                    after_start=bool(item.get('afterStart', False)), mark=getattr(item, 'mark', None))
+
+
+def compile_slide(name, slide):
+    """
+    Validate a slide.
+
+    :param name: The slide name.
+    :param slide: The slide as loaded from YAML.
+    :returns: The :py:obj:`.SlideSpec` of the slide.
+    :raises InvalidParameter: At the line and column of the faulty value.
+    """
+    if not isinstance(slide, dict):
+        raise InvalidParameter(f'slide {name}: expect key-value pairs')
+    content = slide.get('content', None)
+    if content is None:
+        raise InvalidParameter(f"{_where(slide)}Page {name} no 'content'")
+    if not isinstance(content, list):
+        raise InvalidParameter(f"{_where(slide, 'content')}Page {name} 'content' must be a list of items")
+    notes = slide.get('notes', None)
+    return SlideSpec(
+        name=name,
+        items=tuple(compile_item(x, _where(slide, 'content')) for x in content),
+        notes='' if notes is None else str(notes),
+        duration=_frames(slide, 'duration', -1),
+        start=_choice(slide, 'startAnimation', _valid_start, what='starting animation'),
+        end=_choice(slide, 'endAnimation', _valid_end, what='ending animation'),
+        page=_choice(slide, 'pageAnimation', _valid_page, what='page animation'),
+        mark=getattr(slide, 'mark', None))
+
+
+def compile_slides(slides):
+    """
+    Validate the slides of a deck.
+
+    Specs are kept for the slides of the last deck compiled, so that reloading
+    a deck only compiles the changed slides, see :py:func:`.load_slides`.
+
+    :param slides: The slides as returned by :py:func:`.load_slides`.
+    :returns: An ordered dict of slide name to :py:obj:`.SlideSpec`.
+    :raises InvalidParameter: At the line and column of the faulty value.
+    """
+    specs = {}
+    compiled = {}
+    for name, slide in slides.items():
+        cached = _SPECS.get(id(slide))
+        if cached is None or cached[0] is not slide or cached[1].name != name:
+            cached = (slide, compile_slide(name, slide))
+        compiled[id(slide)] = cached
+        specs[name] = cached[1]
+    _SPECS.clear()
+    _SPECS.update(compiled)
+    return specs
+
+
+def check_deck(filename):
+    """
+    Load and validate a deck, without a terminal.
+
+    :param filename: The YAML file of the deck.
+    :returns: The error messages, one per faulty slide, empty if valid.
+    """
+    import yaml
+    from termslides.loader import load_slides
+
+    try:
+        deck, slides = load_slides(filename)
+    except yaml.MarkedYAMLError as e:
+        mark = e.problem_mark or e.context_mark
+        return [f'{mark.name}:{mark.line + 1}:{mark.column + 1}: {e.problem or e.context}']
+    except (yaml.YAMLError, InvalidParameter, OSError) as e:
+        message = str(e)
+        return [message if message.startswith(filename) else f'{filename}: {message}']
+
+    errors = []
+    if not isinstance(deck['seed'], (int, type(None))) or isinstance(deck['seed'], bool):
+        errors.append(f"{filename}: seed must be an integer, got {deck['seed']!r}")
+    for name, slide in slides.items():
+        try:
+            compile_slide(name, slide)
+        except InvalidParameter as e:
+            errors.append(str(e))
+    return errors
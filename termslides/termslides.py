@@ -1,18 +1,14 @@
 # -*- coding: utf-8 -*-
 
 import sys
+from contextlib import nullcontext
+from time import perf_counter
 from types import MethodType
 
-import yaml
 from asciimatics.exceptions import NextScene, ResizeScreenError, StopApplication
-from asciimatics.scene import Scene
-from asciimatics.screen import Screen
-from click import group, argument
+from click import Choice, Group, group, argument, option
 
-from termslides.widgets import (
-    InvalidParameter, InputHandler, TitleView, SlideView, NoteView, ListView,
-    _get_effects, _valid_start, _valid_end, _valid_page
-)
+from termslides.clock import FRAME_TIME, Clock
 
 __all__ = ['termslides']
 
@@ -22,16 +18,25 @@ def patch_draw_next_frame(self, repeat=True):
     Draw the next frame in the currently configured Scenes. You must call
     :py:meth:`.set_scenes` before using this for the first time.
 
+    With a "_clock", the frames due since the last one drawn are all played,
+    but only the last one is refreshed, so that animations keep to time when
+    frames are slow.  Decorative effects only play the last one.
+
     :param repeat: Whether to repeat the Scenes once it has reached the end.
         Defaults to True.
 
     :raises StopApplication: if the application should be terminated.
     """
     scene = self._scenes[self._scene_index]
+    metrics = getattr(self, '_metrics', None)
+    clock = getattr(self, '_clock', None)
+    got_event = False
     try:
         # Check for an event now and remember for refresh reasons.
         event = self.get_event()
         got_event = event is not None
+        if got_event and metrics is not None:
+            metrics.input(event)
 
         # Now process all the input events
         while event is not None:
@@ -43,30 +48,61 @@ def patch_draw_next_frame(self, repeat=True):
         # Only bother with a refresh if there was an event to process or
         # we have to refresh due to the refresh limit required for an
         # Effect.
-        self._frame += 1
-        self._idle_frame_count -= 1
+        due = self._frame + 1 if clock is None else clock.due(self._frame)
+        if scene.duration > 0:
+            # no further than the end of the scene
+            due = min(due, max(scene.duration, self._frame + 1))
+        self._idle_frame_count -= due - self._frame
         if got_event or self._idle_frame_count <= 0 or self._forced_update:
             self._forced_update = False
-            self._idle_frame_count = 1000000
-            for effect in scene.effects:
-                # Update the effect and delete if needed.
-                effect.update(self._frame)
-                if effect.delete_count is not None:
-                    effect.delete_count -= 1
-                    if effect.delete_count <= 0:
-                        scene.remove_effect(effect)
-
-                # Sort out when we next _need_ to do a refresh.
-                if effect.frame_update_count > 0:
-                    self._idle_frame_count = min(self._idle_frame_count,
-                                                 effect.frame_update_count)
+            # Shed work if frames are over budget.
+            governor = getattr(self, '_governor', None)
+            start = perf_counter()
+            if governor is not None:
+                governor.apply(scene, due)
+            # Play the frames skipped, if late, but for decorative effects.
+            frames = due - self._frame
+            decorative = ()
+            if frames > 1:
+                from termslides.governor import Governor
+                decorative = Governor.DECORATIVE
+            while self._frame < due:
+                self._frame += 1
+                self._idle_frame_count = 1000000
+                for effect in scene.effects:
+                    # Update the effect and delete if needed.
+                    late = self._frame < due and isinstance(effect, decorative)
+                    if not late and (governor is None or not governor.skip(effect, self._frame)):
+                        effect.update(self._frame)
+                    if effect.delete_count is not None:
+                        effect.delete_count -= 1
+                        if effect.delete_count <= 0:
+                            scene.remove_effect(effect)
+
+                    # Sort out when we next _need_ to do a refresh.
+                    if effect.frame_update_count > 0:
+                        self._idle_frame_count = min(self._idle_frame_count,
+                                                     effect.frame_update_count)
             self.refresh()
+            cost = perf_counter() - start
+            if governor is not None:
+                # charged per frame played
+                governor.measure(scene, self._frame, cost / max(frames, 1))
+            if metrics is not None:
+                metrics.frame(scene.name, self._frame, cost)
+        else:
+            self._frame = due
+            if metrics is not None:
+                metrics.idle()
 
         if 0 < scene.duration <= self._frame:
             raise NextScene()
     except NextScene as e:
         # Tidy up the current scene.
         scene.exit()
+        old_name = scene.name
+        # Keep to the schedule if the scene ran out of time, not on a key press.
+        played = None if got_event else self._frame
 
         # Find the specified next Scene
         if e.name is None:
@@ -89,9 +125,14 @@ def patch_draw_next_frame(self, repeat=True):
 
         # Reset the screen if needed.
         scene = self._scenes[self._scene_index]
+        start = perf_counter()
         scene.reset()
+        if metrics is not None:
+            metrics.transition(old_name, scene.name, perf_counter() - start)
         self._frame = 0
         self._idle_frame_count = 0
+        if clock is not None:
+            clock.start(played)
         if scene.clear:
             self.clear()
         else:
@@ -100,69 +141,345 @@ def patch_draw_next_frame(self, repeat=True):
             self._reset()
 
 
-@group()
-def cli():
-    pass
+def patch_play(self, scenes, stop_on_resize=False, unhandled_input=None,
+               start_scene=None, repeat=True, allow_int=True):
+    """
+    Play a set of scenes, see :py:meth:`.Screen.play`.
+
+    Between frames, this waits for input until the next frame is due rather
+    than sleeping, so that a key press is handled as soon as it arrives, and
+    the first frame of a new Scene is drawn at once rather than at the next
+    frame.  Frames are due on a :py:obj:`.Clock`, so that slow frames don't
+    stretch the durations.  Spare time between frames is used for the work of
+    the screen "_prefetch" function, if any, e.g. building the slides next to
+    the current one, a step at a time.
+
+    :param allow_int: Ignored, input always interrupts the wait.
+    """
+    self.set_scenes(scenes, unhandled_input=unhandled_input, start_scene=start_scene)
+    clock = self._clock = Clock(FRAME_TIME)
+    try:
+        while True:
+            self.draw_next_frame(repeat=repeat)
+            if self.has_resized():
+                if stop_on_resize:
+                    self._scenes[self._scene_index].exit()
+                    raise ResizeScreenError("Screen resized", self._scenes[self._scene_index])
+            if self._frame == 0:
+                # a Scene was entered, draw it now
+                continue
+            deadline = clock.deadline(self._frame + 1)
+            remaining = deadline - perf_counter()
+            # with time to spare, build the next slides, a step at a time
+            prefetch = getattr(self, '_prefetch', None)
+            while remaining > FRAME_TIME / 2 and prefetch is not None and prefetch():
+                remaining = deadline - perf_counter()
+            if remaining > 0:
+                self.wait_for_input(remaining)
+    except StopApplication:
+        return
+
+
+class DefaultGroup(Group):
+    """
+    A command group running its default command when the first argument is
+    not a command, so that "termslides FILE" shows the slides.
+    """
+
+    def __init__(self, *args, default=None, **kwargs):
+        super(DefaultGroup, self).__init__(*args, **kwargs)
+        self.default = default
+
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args = [self.default] + list(args)
+        return super(DefaultGroup, self).parse_args(ctx, args)
 
 
-@cli.command()
+@group(cls=DefaultGroup, default='show')
+def termslides():
+    """
+    Script your slides in YAML file and show it in terminal.
+
+    "termslides FILE" is short for "termslides show FILE".
+    """
+
+
+@termslides.command()
 @argument('file')
-def termslides(file):
+@option('--memory-budget', type=float, default=0,
+        help='Memory budget in MB for built slides, least recently used slides are evicted over it.')
+@option('--memory-report', is_flag=True, help='Print the memory footprint of each slide on exit.')
+@option('--frame-budget', type=float, default=0,
+        help='Frame budget in ms, animations are degraded while frames take longer.')
+@option('--low-bandwidth', is_flag=True, help='Minimise terminal output, for remote sessions on ANSI terminals.')
+@option('--bandwidth-cap', type=float, default=0,
+        help='Cap terminal output to this many KB per second, implies --low-bandwidth.')
+@option('--bandwidth-report', is_flag=True, help='Print the terminal output size of each slide on exit.')
+@option('--log', type=str, default=None, help='Write log messages to this file.')
+@option('--seed', type=int, default=None,
+        help='Seed of the animations, so that every run plays the same. Overrides the deck "seed".')
+@option('--plantuml-server', type=str, default=None,
+        help='URL of a PlantUML server rendering the diagrams, e.g. http://localhost:8080.')
+@option('--plantuml-workers', type=int, default=8, help='Maximum concurrent requests to the PlantUML server.')
+@option('--profile', type=str, default=None,
+        help='Profile the show into this pstats file, with a summary by phase in the same name plus ".txt".')
+@option('--metrics', type=str, default=None,
+        help='Stream frame, input latency and scene metrics as JSON lines to this file, or "unix:PATH" socket.')
+@option('--kiosk', is_flag=True,
+        help='Play the slides in a loop unattended, moving on after their duration. Only "q" is read, to stop.')
+@option('--control', type=str, default=None,
+        help='Take commands (next, prev, goto, list, current) from a "unix:PATH" socket or a TCP "HOST:PORT".')
+def show(file, memory_budget, memory_report, frame_budget,
+         low_bandwidth, bandwidth_cap, bandwidth_report, log, seed,
+         plantuml_server, plantuml_workers, profile, metrics, kiosk, control):
+    """
+    Show the slides of a YAML file.
+    """
+    from asciimatics.event import KeyboardEvent
+    from asciimatics.scene import Scene
+    from asciimatics.screen import Screen
     from tqdm import tqdm
 
-    with open(file, 'r') as stream:
-        slides = yaml.full_load(stream)
+    from termslides.loader import load_slides
+    from termslides.residency import SlideScene, Residency
+    from termslides.spec import compile_slides
+    from termslides.widgets import (
+        ReloadSlides, InputHandler, KioskHandler, TitleView, SlideView, NoteView, ListView, _build_effects
+    )
+
+    if log:
+        import logging
+        logging.basicConfig(filename=log, level=logging.INFO,
+                            format='%(asctime)s %(name)s %(levelname)s %(message)s')
+
+    if plantuml_server:
+        from termslides.renderers import UMLText
+        UMLText.use_server(plantuml_server, plantuml_workers)
+
+    profiler = None
+    if profile:
+        from termslides.profiler import Profiler
+        profiler = Profiler()
+
+    def phase(name):
+        # account the block to the named phase, when profiling
+        return nullcontext() if profiler is None else profiler.phase(name)
+
+    residency = Residency(int(memory_budget * 1024 * 1024), report=memory_report)
+    governor = None
+    if frame_budget > 0:
+        from termslides.governor import Governor
+        governor = Governor(frame_budget / 1000)
+    if metrics:
+        from termslides.metrics import Metrics
+        metrics = Metrics(metrics)
+    meter = None
+    if bandwidth_report:
+        from termslides.output import OutputMeter
+        meter = OutputMeter()
+    remote = None
+    if control:
+        from termslides.remote import Remote
+        remote = Remote(control)
+        remote.start()
 
     def slides_show(screen, scene):
-        scenes = []
-        screen.set_title(slides.pop('title', 'TermSlides'))
+        slide_view = None
+
+        def idle():
+            # the checkpoints of the slide previewed, then the next slides
+            return (slide_view is not None and slide_view.idle()) or residency.prefetch()
+
         screen.draw_next_frame = MethodType(patch_draw_next_frame, screen)
+        screen.play = MethodType(patch_play, screen)
+        screen._governor = governor
+        screen._metrics = metrics
+        screen._prefetch = idle
+        # output patches need the ANSI terminal screen
+        if hasattr(screen, '_safe_write'):
+            if low_bandwidth or bandwidth_cap > 0:
+                from termslides.output import LowBandwidth
+                LowBandwidth(int(bandwidth_cap * 1024)).install(screen)
+            if meter is not None:
+                meter.install(screen)
+        if profiler is not None:
+            profiler.watch('terminal refresh', screen.refresh)
+        if kiosk:
+            get_event = screen.get_event
 
-        # list view
-        slide_view = SlideView(screen, slides)
-        notes_view = NoteView(screen, slides)
-        title_view = TitleView(screen)
-        list_view = ListView(screen, slides, slide_view, notes_view, title_view)
-        scenes.append(Scene(
-            [title_view, notes_view, slide_view, list_view], -1, name="__slides_list__"))
-
-        # slides
-        progress = tqdm(slides.items())
-        progress.set_description('Loading slides')
-        for name, slide in progress:
-            # get slide content
-            content = slide.get('content', None)
-            if content is None:
-                raise InvalidParameter(f"Page {name} no 'content'")
-            # get slide duration
-            duration = slide.get('duration', -1)
-            # get starting / ending / page animation
-            start = slide.get('startAnimation', None)
-            if start not in _valid_start:
-                raise InvalidParameter(f'Invalid starting animation: {start}')
-            end = slide.get('endAnimation', None)
-            if end not in _valid_end:
-                raise InvalidParameter(f'Invalid ending animation: {end}')
-            page = slide.get('pageAnimation', None)
-            if page not in _valid_page:
-                raise InvalidParameter(f'Invalid page animation: {page}')
-            # get slide effects
-            effects = _get_effects(screen, content, start, end, page)
-            # input handler
-            effects.insert(0, InputHandler(screen, list_view))
-            # add to scenes
-            scenes.append(Scene(effects, duration, name=name, clear=(start is None)))
-
-        screen.play(scenes, stop_on_resize=True, start_scene=scene)
+            def kiosk_event():
+                # input is ignored, but for stopping the show
+                event = get_event()
+                if isinstance(event, KeyboardEvent) and event.key_code in [ord('q'), Screen.KEY_ESCAPE]:
+                    raise StopApplication('Kiosk stopped')
+                return None
+
+            screen.get_event = kiosk_event
+        if remote is not None:
+            remote.install(screen)
+        # slide name -> (slide, scene), reused while the slide is unchanged
+        built = {}
+
+        def builder(slide):
+            def build():
+                # a step at a time, see SlideScene.step
+                steps = _build_effects(screen, slide.items, slide.start, slide.end, slide.page)
+                while True:
+                    with phase(f'build {slide.name}'):
+                        try:
+                            next(steps)
+                        except StopIteration as e:
+                            return e.value
+                    yield
+            return build
+
+        while True:
+            with phase('load deck'):
+                deck, slides = load_slides(file)
+                slides = compile_slides(slides)
+            deck_seed = deck['seed'] if seed is None else seed
+            if plantuml_server:
+                # fetch all the diagrams of the deck at once
+                UMLText.prefetch([item.content for slide in slides.values() for item in slide.items
+                                  if item.type == 'uml'])
+            scenes = []
+            screen.set_title(deck['title'])
+
+            # list view, kiosk plays the slides only
+            if not kiosk:
+                slide_view = SlideView(screen, slides, deck_seed)
+                notes_view = NoteView(screen, slides)
+                title_view = TitleView(screen)
+                list_view = ListView(screen, slides, slide_view, notes_view, title_view)
+                scenes.append(Scene(
+                    [title_view, notes_view, slide_view, list_view], -1, name="__slides_list__"))
+
+            # slides
+            progress = tqdm(slides.items())
+            progress.set_description('Loading slides')
+            for name, slide in progress:
+                # input handler
+                if kiosk:
+                    handler = KioskHandler(screen, slide.duration)
+                else:
+                    handler = InputHandler(screen, list_view)
+                if name in built and built[name][0] is slide and built[name][1].seed == deck_seed:
+                    built[name][1].handler = handler
+                    scenes.append(built[name][1])
+                    continue
+                # add to scenes, slide effects are built when shown,
+                # kiosk handlers move on by themselves
+                scenes.append(SlideScene(builder(slide), handler, residency, -1 if kiosk else slide.duration,
+                                         name=name, clear=(slide.start is None), seed=deck_seed))
+                built[name] = (slide, scenes[-1])
+            for name in set(built).difference(slides):
+                del built[name]
+            residency.manage(scenes if kiosk else scenes[1:])
+
+            try:
+                # a no-op handler, so that screen doesn't build all the slides to check
+                # whether they are compatible with the default one
+                screen.play(scenes, stop_on_resize=True, start_scene=scene,
+                            unhandled_input=lambda event: None)
+                return
+            except ReloadSlides:
+                # reload the deck and go back to slides list
+                scene = scenes[0]
 
     last_scene = None
+    if profiler is not None:
+        profiler.start()
     while True:
         try:
             Screen.wrapper(slides_show, catch_interrupt=False, arguments=[last_scene])
+            if profiler is not None:
+                profiler.stop()
+                profiler.save(profile)
+                print(f'Profile written to {profile} and {profile}.txt')
+            if memory_report:
+                print('\n'.join(residency.report()))
+            if meter is not None:
+                print('\n'.join(meter.report()))
+            if metrics:
+                metrics.close()
+            if remote is not None:
+                remote.close()
             sys.exit(0)
         except ResizeScreenError as e:
             last_scene = e.scene
 
 
+@termslides.command()
+@argument('metrics')
+def stats(metrics):
+    """
+    Summarise a metrics file written with "--metrics".
+    """
+    from termslides.metrics import summarise
+
+    with open(metrics, encoding='utf-8') as stream:
+        print('\n'.join(summarise(stream)))
+
+
+@termslides.command()
+@argument('paths', nargs=-1, required=True)
+@option('--jobs', type=int, default=0, help='Decks checked in parallel, one per CPU by default.')
+def check(paths, jobs):
+    """
+    Validate decks, or the decks in directories, without a terminal.
+    """
+    import os
+    from termslides.spec import check_deck
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, x) for x in os.listdir(path) if x.endswith(('.yaml', '.yml'))))
+        else:
+            files.append(path)
+
+    if len(files) <= 1 or jobs == 1:
+        results = [check_deck(x) for x in files]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(jobs or None) as executor:
+            results = list(executor.map(check_deck, files, chunksize=max(1, len(files) // 64)))
+
+    for errors in results:
+        for error in errors:
+            print(error)
+    failed = sum(1 for x in results if x)
+    print(f'{len(files)} decks checked, {failed} with errors')
+    sys.exit(1 if failed else 0)
+
+
+@termslides.command()
+@argument('file')
+@option('--height', type=int, default=40, help='Height of the screen simulated.')
+@option('--width', type=int, default=120, help='Width of the screen simulated.')
+@option('--frames', type=int, default=60, help='Frames played before, and after, the ending animation starts.')
+@option('--seed', type=int, default=None, help='Seed of the animations. Overrides the deck "seed".')
+@option('--sort', type=Choice(['p90', 'mean', 'max', 'build', 'memory']), default='p90',
+        help='Sort the slides by frame time, build time or memory, most costly first.')
+@option('--json', 'json_file', type=str, default=None, help='Write the figures as JSON to this file, "-" for stdout.')
+def analyze(file, height, width, frames, seed, sort, json_file):
+    """
+    Estimate the build time, frame time and memory of each slide, without a terminal.
+    """
+    import json
+    from termslides.analyzer import analyze, report
+
+    records = analyze(file, height, width, frames, seed)
+    if json_file == '-':
+        print(json.dumps(records, indent=2))
+        return
+    print('\n'.join(report(records, sort)))
+    if json_file:
+        with open(json_file, 'w', encoding='utf-8') as stream:
+            json.dump(records, stream, indent=2)
+
+
 if __name__ == '__main__':
-    cli()
+    termslides()
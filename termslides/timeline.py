@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+import random
+from bisect import bisect_right
+from copy import copy, deepcopy
+
+from asciimatics.renderers import StaticRenderer
+from asciimatics.screen import _DoubleBuffer
+
+__all__ = ['Timeline']
+
+
+class Timeline(object):
+    """
+    Seekable playback of the effects of a slide on a canvas.
+
+    The state of the effects, of the random generator and the cells of the
+    canvas are saved every some frames as the slide plays, in the spare time
+    between frames, so that seeking to a frame restores the nearest checkpoint
+    before it and replays only the frames from there, without drawing them.
+    Seeking further than played so far plays the frames ahead headless, saving
+    checkpoints on the way.
+
+    Effects not started yet, e.g. the fireworks of a page animation, are as
+    they were reset: they are kept from the previous checkpoint rather than
+    copied again, and not restored while not started as played.
+
+    Frames are replayed from the checkpoints as they were played, but the
+    frames ahead are played without key presses: ending animations are not
+    started.
+    """
+
+    def __init__(self, canvas, effects, interval=5, limit=32):
+        """
+        :param canvas: The Canvas or Screen the effects draw on.
+        :param effects: The effects of the slide, just reset.
+        :param interval: The frames between two checkpoints.
+        :param limit: The most checkpoints kept.  Beyond, every other one is
+            dropped and the interval doubles.
+        """
+        self._canvas = canvas
+        self._effects = list(effects)
+        self._interval = interval
+        self._limit = limit
+        self._frame_no = 0
+        # frame numbers, and the checkpoints saved after them
+        self._frames = []
+        self._checkpoints = []
+        self._save()
+
+    def _shared(self):
+        # the objects left out of the checkpoints: those the effects point to
+        # but don't own, and the images of the static renderers
+        shared = {id(self._canvas): self._canvas, id(self._canvas._screen): self._canvas._screen}
+        for effect in self._effects:
+            shared[id(effect)] = effect
+            scene = getattr(effect, '_scene', None)
+            if scene is not None:
+                shared[id(scene)] = scene
+            for value in effect.__dict__.values():
+                if isinstance(value, StaticRenderer):
+                    shared[id(value)] = value
+        return shared
+
+    @staticmethod
+    def _copy_state(values, memo):
+        # the particles of particle effects hold numbers, functions and colours
+        # never changed: copied shallow, a lot faster than deep for the
+        # hundreds of an explosion
+        for system in values.get('_active_systems', ()):
+            for particle in system.particles:
+                memo[id(particle)] = copy(particle)
+        return deepcopy(values, memo)
+
+    @staticmethod
+    def _copy_buffer(buffer):
+        # the cells of a pure Python buffer are tuples, shared rather than
+        # copied deep
+        if not isinstance(buffer, _DoubleBuffer):
+            return deepcopy(buffer)
+        buffer = copy(buffer)
+        buffer._double_buffer = [x[:] for x in buffer._double_buffer]
+        buffer._screen_buffer = [x[:] for x in buffer._screen_buffer]
+        return buffer
+
+    @staticmethod
+    def _waiting(effect, frame_no):
+        # whether the effect is as reset at the frame, ending animations being
+        # started by key presses rather than frames
+        return frame_no < effect._start_frame and not getattr(effect, '_isEnding', False)
+
+    def _save(self):
+        canvas = self._canvas
+        shared = self._shared()
+        renderers = [x for x in shared.values() if isinstance(x, StaticRenderer)]
+        previous = self._checkpoints[-1][0] if self._checkpoints else None
+        states = []
+        for i, effect in enumerate(self._effects):
+            if previous is not None and self._waiting(effect, self._frame_no):
+                # not updated since the previous checkpoint, an earlier frame
+                states.append(previous[i])
+            else:
+                states.append(self._copy_state(effect.__dict__, shared))
+        checkpoint = (
+            states,
+            [(x, x._index) for x in renderers],
+            random.getstate(),
+            self._copy_buffer(canvas._buffer),
+            canvas._start_line,
+        )
+        self._frames.append(self._frame_no)
+        self._checkpoints.append(checkpoint)
+        if len(self._checkpoints) > self._limit:
+            # the first is kept, for seeking back to the start
+            self._frames[1:] = self._frames[2::2]
+            self._checkpoints[1:] = self._checkpoints[2::2]
+            self._interval *= 2
+
+    def _restore(self, index):
+        states, indices, state, buffer, start_line = self._checkpoints[index]
+        frame_no = self._frames[index]
+        shared = self._shared()
+        for effect, values in zip(self._effects, states):
+            if self._waiting(effect, frame_no) and self._waiting(effect, self._frame_no):
+                # as reset, both as played and in the checkpoint
+                continue
+            # copied again, as the replay changes them
+            effect.__dict__.clear()
+            effect.__dict__.update(self._copy_state(values, shared))
+        for renderer, index_ in indices:
+            renderer._index = index_
+        random.setstate(state)
+        canvas = self._canvas
+        canvas._buffer = self._copy_buffer(buffer)
+        canvas._buffer.invalidate()
+        canvas._start_line = start_line
+        self._frame_no = frame_no
+
+    def _due(self):
+        return self._frame_no >= self._frames[-1] + self._interval
+
+    @property
+    def frame_no(self):
+        """
+        The last frame played.
+        """
+        return self._frame_no
+
+    @property
+    def end(self):
+        """
+        The frame the animations of the slide are over, before its ending
+        animation.
+        """
+        return max([x.stop_frame for x in self._effects if not getattr(x, '_isEnding', False)], default=0)
+
+    def played(self, frame_no):
+        """
+        Record a frame played by the effects.  The checkpoint due, if any, is
+        saved by :py:meth:`.idle`, rather than while the frame is drawn.
+
+        :param frame_no: The frame just played.
+        """
+        self._frame_no = frame_no
+
+    def idle(self):
+        """
+        Save the checkpoint due, if any, in the spare time between frames.
+
+        :returns: Whether a checkpoint was saved.
+        """
+        if not self._due():
+            return False
+        self._save()
+        return True
+
+    def seek(self, frame_no):
+        """
+        Bring the effects and the canvas to the given frame, as if played from
+        the start.  The canvas is to be refreshed.
+
+        :param frame_no: The frame to seek to, from 0 for the slide just reset.
+        :returns: The frame reached.
+        """
+        frame_no = max(0, frame_no)
+        index = bisect_right(self._frames, frame_no) - 1
+        if not self._frames[index] <= self._frame_no <= frame_no:
+            # from the checkpoint, unless already on the way
+            self._restore(index)
+        while self._frame_no < frame_no:
+            self._frame_no += 1
+            for effect in self._effects:
+                effect.update(self._frame_no)
+            self.idle()
+        return self._frame_no
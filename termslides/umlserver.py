@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import zlib
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from time import sleep
+from urllib.parse import urlsplit
+
+__all__ = ['PlantUMLServer']
+
+_BASE64 = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+_PLANTUML64 = b'0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_'
+_TO_PLANTUML64 = bytes.maketrans(_BASE64, _PLANTUML64)
+
+
+def encode(text):
+    """
+    Encode a diagram source for PlantUML server URLs: deflated, then base64
+    encoded with the PlantUML alphabet.
+
+    :param text: The diagram source.
+    :returns: The encoded source.
+    """
+    data = zlib.compress(text.encode('utf-8'))[2:-4]
+    # PlantUML encodes a trailing partial group as if padded with zeros
+    data += b'\0' * (-len(data) % 3)
+    return b64encode(data).translate(_TO_PLANTUML64).decode('ascii')
+
+
+class PlantUMLServer(object):
+    """
+    Client of a PlantUML server, rendering diagrams to text.
+
+    Diagrams are fetched in parallel by a bounded number of workers, each
+    keeping its connection alive between requests.  Failed requests are
+    retried, and results are kept, so that a diagram is only fetched once.
+    """
+
+    def __init__(self, url, workers=8, timeout=10, retries=2, backoff=0.2):
+        """
+        :param url: The server URL, e.g. "http://localhost:8080".
+        :param workers: The maximum number of concurrent requests.
+        :param timeout: The timeout of connections and responses in seconds.
+        :param retries: How many times a failed request is tried again.
+        :param backoff: The delay before the first retry in seconds, doubled
+            for each further retry.
+        """
+        parts = urlsplit(url)
+        self._connection_class = HTTPSConnection if parts.scheme == 'https' else HTTPConnection
+        self._host = parts.netloc
+        self._path = parts.path.rstrip('/') + '/txt/'
+        self._timeout = timeout
+        self._retries = retries
+        self._backoff = backoff
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='plantuml')
+        # diagram source -> future of the rendered diagram
+        self._futures = {}
+        self.connections = 0
+
+    def submit(self, text):
+        """
+        Fetch a diagram, unless it is already fetched or being fetched.
+
+        :param text: The diagram source.
+        :returns: A future of the rendered diagram, as bytes.
+        """
+        with self._lock:
+            future = self._futures.get(text)
+            if future is None or (future.done() and future.exception() is not None):
+                future = self._futures[text] = self._pool.submit(self._fetch, text)
+        return future
+
+    def prefetch(self, texts):
+        """
+        Fetch diagrams in parallel, without waiting for them.
+
+        :param texts: The diagram sources.
+        :returns: The futures of the rendered diagrams.
+        """
+        return [self.submit(x) for x in texts]
+
+    def processes(self, text):
+        """
+        :param text: The diagram source.
+        :returns: The rendered diagram, as bytes.
+        """
+        return self.submit(text).result()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connection_class(self._host, timeout=self._timeout)
+            with self._lock:
+                self.connections += 1
+        return connection
+
+    def _fetch(self, text):
+        path = self._path + encode(text)
+        error = None
+        for attempt in range(self._retries + 1):
+            if attempt:
+                sleep(self._backoff * 2 ** (attempt - 1))
+            connection = self._connection()
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, HTTPException) as e:
+                # e.g. the server closed the kept-alive connection
+                connection.close()
+                self._local.connection = None
+                error = e
+                continue
+            # syntax errors are rendered, with a client error status
+            if response.status < 500:
+                return body
+            error = ConnectionError(f'{response.status} {response.reason}')
+        raise ConnectionError(f'PlantUML server {self._host}: {error}')
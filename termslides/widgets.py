@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import random
+from importlib import import_module
 from random import randint
 
 from asciimatics.constants import (
@@ -7,35 +9,39 @@ from asciimatics.constants import (
     COLOUR_BLUE, COLOUR_MAGENTA, COLOUR_CYAN, COLOUR_WHITE,
     A_BOLD, A_NORMAL, A_REVERSE, A_UNDERLINE,
 )
-from asciimatics.effects import Cycle, Print, RandomNoise, Stars, Snow
+from asciimatics.effects import Effect, Print, RandomNoise, Stars, Snow
 from asciimatics.particles import Explosion, StarFirework, Rain
-from asciimatics.renderers import FigletText, Rainbow, Fire, ColourImageFile, ImageFile, Box
 from asciimatics.widgets import Frame, Layout, Widget, ListBox, TextBox, PopUpDialog
 from asciimatics.event import KeyboardEvent
 from asciimatics.screen import Screen
 from asciimatics.exceptions import NextScene, StopApplication
-from pyfiglet import Figlet
 
-from termslides.effects import Mirage, Typing, ScrollSlide, MatrixSlide, WipeSlide, DropSlide, ShootSlide
-from termslides.renderers import NormalText, UMLText, TableText
+from termslides.effects import (
+    ColourCycle, ColourPrint, Mirage, Typing, ScrollTable, ScrollSlide, MatrixSlide, WipeSlide, DropSlide, ShootSlide
+)
+from termslides.events import ControlEvent
 
 
+# renderer of each content type as (module, class), imported on first use
 _type_map = {
-    'figlet': FigletText,
-    'text': NormalText,
-    'uml': UMLText,
-    'table': TableText,
-    'color-image': ColourImageFile,
-    'image': ImageFile,
-    'box': Box,
-    None: None
+    'figlet': ('asciimatics.renderers', 'FigletText'),
+    'text': ('termslides.renderers', 'NormalText'),
+    'code': ('termslides.renderers', 'CodeText'),
+    'uml': ('termslides.renderers', 'UMLText'),
+    'table': ('termslides.renderers', 'TableText'),
+    'table-source': ('termslides.renderers', 'CSVTableText'),
+    'color-image': ('asciimatics.renderers', 'ColourImageFile'),
+    'image': ('asciimatics.renderers', 'ImageFile'),
+    'box': ('asciimatics.renderers', 'Box'),
 }
 
 _required_param_map = {
     'figlet': set(['text', 'font']),
     'text': set(['text']),
+    'code': set(['text']),
     'uml': set(['text']),
     'table': set(['data']),
+    'table-source': set(['source', 'height']),
     'color-image': set(['screen', 'uni', 'dither', 'filename']),
     'image': set(['filename']),
     'box': set(['width', 'height']),
@@ -43,9 +49,11 @@ _required_param_map = {
 
 _param_map = {
     'figlet': set(['text', 'font']),
-    'text': set(['text']),
+    'text': set(['text', 'width', 'align', 'justify']),
+    'code': set(['text', 'lang', 'theme']),
     'uml': set(['text']),
     'table': set(['data', 'hasHeader', 'tablefmt', 'numalign', 'floatfmt']),
+    'table-source': set(['source', 'height', 'hasHeader', 'tablefmt', 'delimiter']),
     'color-image': set(['screen', 'uni', 'dither', 'filename', 'height']),
     'image': set(['filename', 'height', 'colours']),
     'box': set(['width', 'height']),
@@ -75,89 +83,155 @@ _valid_start = [None, 'scroll']
 _valid_end = [None, 'scroll', 'matrix', 'shoot', 'drop', 'wipe']
 _valid_page = [None, 'stars', 'snow', 'explosion', 'fireworks', 'rain']
 
+# frames a slide without duration is shown at least in kiosk mode, 10 seconds
+KIOSK_HOLD = 200
+# frames a scrub key moves the slide preview, 1 second
+SCRUB_FRAMES = 20
+
 
 class InvalidParameter(Exception):
     pass
 
 
-def _get_effects(screen, content, start_animation=None, end_animation=None, page_animation=None, next_fn=None):
+class ReloadSlides(Exception):
+    """
+    Raised to reload the slides file(s) and rebuild the changed slides.
+    """
+
+
+def _reseed(seed, *keys):
+    """
+    Seed the random generator, shared with asciimatics, from the deck seed and
+    the given keys, so that a slide plays the same whatever was shown before.
+    Does nothing without a deck seed.
+    """
+    if seed is not None:
+        random.seed(':'.join(str(x) for x in (seed,) + keys))
+
+
+def _get_renderer(type_):
+    module, name = _type_map[type_]
+    return getattr(import_module(module), name)
+
+
+def _text_width(width, screen):
+    """
+    :returns: The wrap width in cells of a "text" item, given in cells or as a
+        percentage of the screen width, e.g. "80%".
+    """
+    if isinstance(width, str) and width.endswith('%'):
+        return max(1, screen.width * int(width[:-1]) // 100)
+    return int(width)
+
+
+def _swap_in(screen, effect, renderer, centre):
+    """
+    :returns: A callback clearing the placeholder of a diagram rendered in
+        background and pointing the effect to the diagram.
+    """
+    def swap(width, height):
+        x = getattr(effect, '_x', None)
+        if x is None:
+            x = (screen.width - width) // 2
+        for i in range(height):
+            screen.print_at(' ' * width, x, effect._y + i)
+        if effect._renderer is not renderer:
+            # colours are baked from the placeholder
+            from termslides.renderers import RainbowText
+            effect._renderer = RainbowText(screen, renderer)
+        if centre and getattr(effect, '_x', None) is not None:
+            effect._x = (screen.width - renderer.max_width) // 2
+        if isinstance(effect, Typing):
+            # type the diagram rather than the placeholder, which sets the stop frame
+            effect._frame_cnt = effect._count_frames()
+    return swap
+
+
+def _get_effects(screen, content, start_animation=None, end_animation=None, page_animation=None, next_fn=None,
+                 background=True):
+    steps = _build_effects(screen, content, start_animation, end_animation, page_animation, next_fn, background)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as e:
+            return e.value
+
+
+def _build_effects(screen, content, start_animation=None, end_animation=None, page_animation=None, next_fn=None,
+                   background=True):
+    """
+    Build the effects of a slide a step at a time, yielding after each content
+    item, so that it can be built in the spare time between frames.
+
+    :returns: The effects, as the value of the StopIteration.
+    """
+    from termslides.spec import ItemSpec, compile_item
+
     effects = []
     for item in content:
-        # get type and required param
-        type_ = item.get('type', None)
-        content = item.get('content', None)
-        if type_ is None or content is None:
-            raise InvalidParameter(str(item.items()))
-
-        # check required param
-        if type_ in ['figlet', 'text', 'uml']:
-            item['text'] = content
-        elif type_ in ['table']:
-            item['data'] = content
-        elif type_ in ['color-image']:
-            item['filename'] = content
-            item['screen'] = screen
-            item['uni'] = screen.unicode_aware
-            item['dither'] = screen.unicode_aware
-        elif type_ in ['image']:
-            item['filename'] = content
-            item['colours'] = screen.colours
-        elif type_ in ['box']:
-            item['uni'] = screen.unicode_aware
-        if _required_param_map[type_].intersection(item.keys()) != _required_param_map[type_]:
-            raise InvalidParameter(f'{type_}: require {_required_param_map[type_].difference(item.keys())}')
-
-        # optional param
-        # - afterStart: default is False
-        # - animation: default if None
-        # - colour: default is white
-        # - y: default is middle of the screen
-        afterStart = item.get('afterStart', False)
-        animation = item.get('animation', None)
-        colour = _colour_map[item.get('colour', 'white')]
-        y = int(item.get('y', screen.height / 2))
-        delay = int(item.get('delay', 0))
-
-        # check conflict
-        if animation in ['typing', 'mirage', 'fire'] and colour == 'cycle':
-            raise InvalidParameter(f"'{animation}' and '{colour}' can't be used together")
-        elif animation in ['fire', 'noise'] and type_ != 'figlet':
-            raise InvalidParameter(f"'{animation}' only works with 'figlet'")
+        if not isinstance(item, ItemSpec):
+            item = compile_item(item)
+        type_ = item.type
+        animation = item.animation
+        colour = item.colour
+        # y: default is middle of the screen
+        y = int(screen.height / 2) if item.y is None else item.y
 
         # get render
+        params = dict(item.params)
         if animation == 'fire':
-            text_ = Figlet(font=item['font'], width=200).renderText(item['text'])
+            from asciimatics.renderers import FigletText
+            from pyfiglet import Figlet
+            try:
+                from termslides.fire import FireText as Fire
+            except ImportError:
+                # without NumPy
+                from asciimatics.renderers import Fire
+            text_ = Figlet(font=params['font'], width=200).renderText(params['text'])
             text_h = len(text_.split('\n'))
             fire_h = int(text_h * 2.5)
             fire_w = max([len(x) for x in text_.split('\n')])
             render = Fire(fire_h, fire_w, text_, 0.3, 45, screen.colours)
         else:
-            render = _type_map[type_](**{k: item[k] for k in _param_map[type_] if k in item})
+            # params given by the screen
+            if type_ == 'table-source':
+                # fill the rest of the screen, leaving room for borders and header
+                params.setdefault('height', max(1, screen.height - y - 4))
+            elif type_ == 'color-image':
+                params.update(screen=screen, uni=screen.unicode_aware, dither=screen.unicode_aware)
+            elif type_ == 'image':
+                params['colours'] = screen.colours
+            elif type_ == 'uml':
+                # never block on PlantUML, show a placeholder until rendered
+                params['background'] = background
+            elif type_ == 'text' and 'width' in params:
+                params['width'] = _text_width(params['width'], screen)
+            render = _get_renderer(type_)(**params)
+        source = render
 
         # modify "start_frame" and "y"
         start_frame = 0
         if start_animation == 'scroll':
             y += screen.height
-            if afterStart:
+            if item.after_start:
                 start_frame += screen.height
-        start_frame += delay
+        start_frame += item.delay
 
         # get effect
         if colour == 'cycle':
-            effect = Cycle(screen, render, y, start_frame=start_frame)
+            effect = ColourCycle(screen, render, y, start_frame=start_frame)
         else:
+            # rainbow cells are computed once, and copied at each frame
+            print_ = Print
             if colour == 'rainbow':
-                render = Rainbow(screen, render)
+                from termslides.renderers import RainbowText
+                render = RainbowText(screen, render)
                 colour = COLOUR_WHITE
-            # optional param
-            # - x: default is middle of the screen
-            # - attr: default is None
-            # - bg: default is black
-            x = item.get('x', None)
-            if x is not None:
-                x = int(x)
-            attr = _attr_map[item.get('attr', 'normal')]
-            bg = _colour_map[item.get('bg', 'black')]
+                print_ = ColourPrint
+            # x: default is middle of the screen
+            x = item.x
+            attr = item.attr
+            bg = item.bg
 
             if animation == 'fire':
                 effect = Print(screen, render,
@@ -165,37 +239,43 @@ def _get_effects(screen, content, start_animation=None, end_animation=None, page
                                speed=1, transparent=False,
                                start_frame=start_frame)
                 effects.append(effect)
-                effect = Print(screen, FigletText(item['text'], item['font']),
+                effect = Print(screen, FigletText(params['text'], params['font']),
                                y, x=(x if x is not None else (screen.width - fire_w) // 2) + 1,
                                colour=Screen.COLOUR_BLACK, bg=Screen.COLOUR_BLACK,
                                speed=1,
                                start_frame=start_frame)
                 effects.append(effect)
                 effect = Print(screen,
-                               FigletText(item['text'], item['font']),
+                               FigletText(params['text'], params['font']),
                                y, x,
                                colour=colour, bg=colour,
                                speed=1,
                                start_frame=start_frame)
             elif animation == 'mirage':
                 duration = 30
-                effect = Mirage(screen, render, y, x if type_ in ['text', 'uml'] else None, colour,
+                effect = Mirage(screen, render, y, x if type_ in ['text', 'code', 'uml'] else None, colour,
                                 start_frame=start_frame,
                                 stop_frame=start_frame + duration)
                 effects.append(effect)
-                effect = Print(screen, render, y, x, colour, attr, bg,
-                               start_frame=start_frame + duration,
-                               stop_frame=start_frame + duration + 10)
+                effect = print_(screen, render, y, x, colour, attr, bg,
+                                start_frame=start_frame + duration,
+                                stop_frame=start_frame + duration + 10)
             elif animation == 'noise':
                 effect = RandomNoise(screen, render)
+            elif type_ == 'table-source':
+                effect = ScrollTable(screen, render, y, x, colour, attr, bg, start_frame=start_frame)
             else:
                 if animation == 'typing':
                     effect_ = Typing
                 else:
-                    effect_ = Print
+                    effect_ = print_
                 effect = effect_(screen, render, y, x, colour,
                                  attr, bg, start_frame=start_frame)
         effects.append(effect)
+        if type_ == 'uml':
+            source.on_ready(_swap_in(screen, effect, source, item.x is None),
+                            getattr(screen, 'force_update', None))
+        yield
 
     # starting / ending / page animation
     if start_animation == 'scroll':
@@ -204,7 +284,7 @@ def _get_effects(screen, content, start_animation=None, end_animation=None, page
         effects.append(MatrixSlide(screen, start_frame=0))
 
     if end_animation:
-        last_frame = max([effect.stop_frame for effect in effects])
+        last_frame = max([effect.stop_frame for effect in effects], default=0)
         for effect in effects:
             if not effect.stop_frame:
                 effect._stop_frame = max(last_frame, start_frame + 1)
@@ -222,6 +302,7 @@ def _get_effects(screen, content, start_animation=None, end_animation=None, page
             effects.append(WipeSlide(screen, start_frame=last_frame + 1))
 
     if page_animation:
+        yield
         if page_animation == 'stars':
             effects.insert(0, Stars(screen, 200))
         elif page_animation == 'snow':
@@ -269,6 +350,8 @@ class InputHandler(Frame):
 
     def process_event(self, event):
         super(InputHandler, self).process_event(event)
+        if isinstance(event, ControlEvent) and event.command == 'goto':
+            raise NextScene(event.argument)
         if isinstance(event, KeyboardEvent):
             if event.key_code in [ord('q'), ord('\r'), ord('\n'), Screen.KEY_ESCAPE]:
                 self._list_view.index = self._screen._scene_index - 1
@@ -285,6 +368,58 @@ class InputHandler(Frame):
         return event
 
 
+class KioskHandler(Effect):
+    """
+    Invisible effect moving on by itself in kiosk mode, as if space was
+    pressed once the slide has been shown long enough: the ending animation
+    plays, or else the next slide is shown.
+    """
+
+    def __init__(self, screen, hold=-1, **kwargs):
+        """
+        :param screen: The Screen being used for the Scene.
+        :param hold: How many frames to show the slide before moving on, or -1
+            for as long as its animations take, and at least :py:data:`KIOSK_HOLD`.
+
+        Also see the common keyword arguments in :py:obj:`.Effect`.
+        """
+        super(KioskHandler, self).__init__(screen, **kwargs)
+        self._hold = hold
+        self._frames = hold
+        self._frame_no = 0
+        self._done = False
+
+    def reset(self):
+        self._frame_no = 0
+        self._done = False
+        if self._hold < 0:
+            self._frames = max([KIOSK_HOLD] + [x.stop_frame for x in self._scene.effects
+                                               if x is not self and not getattr(x, '_isEnding', False)])
+
+    def _update(self, frame_no):
+        self._frame_no = frame_no
+        if not self._done and frame_no >= self._frames:
+            self._done = True
+            self._scene.process_event(KeyboardEvent(ord(' ')))
+
+    def process_event(self, event):
+        if self._done and isinstance(event, KeyboardEvent) and event.key_code == ord(' '):
+            # no ending animation took it
+            raise NextScene()
+        if isinstance(event, ControlEvent) and event.command == 'goto':
+            raise NextScene(event.argument)
+        return event
+
+    @property
+    def frame_update_count(self):
+        # Only demand update when the slide is done.
+        return 0 if self._done else max(1, self._frames - self._frame_no)
+
+    @property
+    def stop_frame(self):
+        return 0
+
+
 class TitleView(Frame):
     """
     A frame to show slide name as title.
@@ -303,30 +438,74 @@ class TitleView(Frame):
 
 class SlideView(Frame):
     """
-    A frame to show slides.
+    A frame to show slides, which can be scrubbed back and forth.
     """
 
-    def __init__(self, screen, slides):
+    def __init__(self, screen, slides, seed=None):
         super(SlideView, self).__init__(
             screen,
             screen.height - screen.height // 5 - 2,
             screen.width - screen.width // 6 - 1,
             x=screen.width // 6, y=1,
             has_border=False, can_scroll=False)
+        try:
+            from termslides.canvas import ArrayCanvas
+        except ImportError:
+            # without NumPy
+            pass
+        else:
+            canvas = self._canvas
+            self._canvas = ArrayCanvas(screen, canvas.height, canvas.width, *canvas.origin)
         self.slides = slides
+        self._seed = seed
+        self._timeline = None
         self.show_slide()
         self.fix()
         self.set_theme('monochrome')
 
+    def _clear(self):
+        # the effects draw over the previous frame, the canvas is cleared for
+        # each slide only, to avoid flicker
+        pass
+
     def _update(self, frame_no):
-        # disable "_clear" to avoid flicker
-        _clear = self._clear
-        self._clear = lambda: None
         super(SlideView, self)._update(frame_no)
-        self._clear = _clear
+        self._timeline.played(frame_no)
+
+    def idle(self):
+        """
+        Save a checkpoint of the slide, if due, in the spare time between
+        frames.
+
+        :returns: Whether one was saved.
+        """
+        return self._timeline is not None and self._timeline.idle()
+
+    def seek(self, frame_no):
+        """
+        Show the slide at the given frame, and play on from there.
+
+        :param frame_no: The frame of the slide, from 0.
+        """
+        screen = self._screen
+        screen._frame = self._timeline.seek(frame_no)
+        clock = getattr(screen, '_clock', None)
+        if clock is not None:
+            clock.seek(screen._frame)
+        screen.force_update()
 
     def process_event(self, event):
         super(SlideView, self).process_event(event)
+        if isinstance(event, KeyboardEvent):
+            seek = {
+                Screen.KEY_LEFT: lambda: self._timeline.frame_no - SCRUB_FRAMES,
+                Screen.KEY_RIGHT: lambda: self._timeline.frame_no + SCRUB_FRAMES,
+                Screen.KEY_HOME: lambda: 0,
+                Screen.KEY_END: lambda: self._timeline.end,
+            }.get(event.key_code)
+            if seek is not None:
+                self.seek(seek())
+                return None
         # if event is not None:
         for effect in self._effects:
             event = effect.process_event(event)
@@ -341,29 +520,20 @@ class SlideView(Frame):
 
         # clear current effects
         self._effects = []
-        self._clear()
+        self._canvas.clear_buffer(*self.palette['background'])
         self._canvas.scroll_to(0)
 
-        # get slide content
-        content = slide.get('content', None)
-        if content is None:
-            raise InvalidParameter(f"Page {name} no 'content'")
-        # get starting / ending / page animation
-        start = slide.get('startAnimation', None)
-        if start not in _valid_start:
-            raise InvalidParameter(f'Invalid starting animation: {start}')
-        end = slide.get('endAnimation', None)
-        if end not in _valid_end:
-            raise InvalidParameter(f'Invalid ending animation: {end}')
-        page = slide.get('pageAnimation', None)
-        if page not in _valid_page:
-            raise InvalidParameter(f'Invalid page animation: {page}')
         # get slide effects
-        effects = _get_effects(self._canvas, content, start, end, page, lambda: self.show_slide(name))
+        _reseed(self._seed, name, 'build')
+        effects = _get_effects(self._canvas, slide.items, slide.start, slide.end, slide.page,
+                               lambda: self.show_slide(name))
         # add effects
+        _reseed(self._seed, name)
         for effect in effects:
             effect.reset()
             self.add_effect(effect)
+        from termslides.timeline import Timeline
+        self._timeline = Timeline(self._canvas, effects)
 
 
 class NoteView(Frame):
@@ -377,7 +547,7 @@ class NoteView(Frame):
             x=screen.width // 6 - 1, y=screen.height - screen.height // 5 - 1,
             can_scroll=True,
             title="Notes")
-        self._notes = {k: v['notes'] for k, v in slides.items()}
+        self._notes = {k: v.notes for k, v in slides.items()}
         self._notes_view = TextBox(
             Widget.FILL_FRAME,
             as_string=True, line_wrap=True,
@@ -466,10 +636,14 @@ class ListView(Frame):
 
     def process_event(self, event):
         super(ListView, self).process_event(event)
+        if isinstance(event, ControlEvent) and event.command == 'goto':
+            raise NextScene(event.argument)
         if isinstance(event, KeyboardEvent):
             if event.key_code in [ord('q'), Screen.KEY_ESCAPE]:
                 self._quit()
                 return None
+            elif event.key_code in [ord('r')]:
+                raise ReloadSlides()
         return event
 
     def _quit(self):
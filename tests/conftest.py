@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests marked "benchmark" assert on wall-clock time or resident memory, which
+only holds on a quiet machine.  They are skipped unless TERMSLIDES_BENCHMARK is set, e.g.:
+
+    TERMSLIDES_BENCHMARK=1 pytest -m benchmark -s
+"""
+
+import os
+
+import pytest
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'benchmark: asserts on time or memory, run with TERMSLIDES_BENCHMARK=1')
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get('TERMSLIDES_BENCHMARK'):
+        return
+    skip = pytest.mark.skip(reason='wall-clock benchmark, run with TERMSLIDES_BENCHMARK=1')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
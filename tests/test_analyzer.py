@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+
+from click.testing import CliRunner
+
+from termslides.analyzer import analyze, report
+from termslides.renderers import UMLText
+from termslides.termslides import termslides
+
+DECK = '''\
+seed: 2020
+Plain:
+  content:
+    - type: text
+      content: hello
+Fireworks:
+  pageAnimation: fireworks
+  endAnimation: drop
+  content:
+    - type: figlet
+      content: Bang
+      font: banner
+    - type: text
+      content: world
+Empty:
+  endAnimation: wipe
+  content: []
+'''
+UML_DECK = '''\
+Diagram:
+  content:
+    - type: uml
+      content: |
+        A -> B
+'''
+
+
+class _Backend(object):
+    # a PlantUML taking 50 ms to render any diagram
+    @staticmethod
+    def processes(text):
+        time.sleep(0.05)
+        return b'+---+\n| A |\n+---+'
+
+
+class TestAnalyzer(object):
+
+    def test_analyze(self, tmp_path):
+        (tmp_path / 'deck.yaml').write_text(DECK)
+        records = analyze(str(tmp_path / 'deck.yaml'), 24, 80, frames=20)
+        plain, fireworks, empty = records
+        assert [x['slide'] for x in records] == ['Plain', 'Fireworks', 'Empty']
+        assert plain['line'] == 3 and plain['effects'] == 1 and plain['cells'] == 5
+        # the 200 fireworks, the banner, the text and the ending
+        assert fireworks['effects'] == 203
+        assert [x['type'] for x in fireworks['items']] == ['figlet', 'text']
+        assert fireworks['cells'] == fireworks['items'][0]['cells'] > 5
+        assert fireworks['memory_kb'] > plain['memory_kb'] * 10
+        assert fireworks['frame_ms']['max'] >= fireworks['frame_ms']['p90'] >= 0
+        assert empty['effects'] == 1 and empty['items'] == []
+
+        lines = report(records)
+        assert lines[0].startswith('Slide')
+        slides = [x.split()[0] for x in lines[1:] if not x.startswith(' ')]
+        assert slides == [x['slide'] for x in sorted(records, key=lambda x: -x['frame_ms']['p90'])]
+        assert [x.split()[0] for x in report(records, 'memory')[1:3]] == ['Fireworks', 'figlet']
+
+    def test_command(self, tmp_path):
+        (tmp_path / 'deck.yaml').write_text(DECK)
+        result = CliRunner().invoke(termslides, ['analyze', '--frames', '5', '--json', str(tmp_path / 'deck.json'),
+                                                 str(tmp_path / 'deck.yaml')])
+        assert result.exit_code == 0
+        assert result.output.startswith('Slide') and 'Fireworks' in result.output
+        records = json.loads((tmp_path / 'deck.json').read_text())
+        assert [x['slide'] for x in records] == ['Plain', 'Fireworks', 'Empty']
+
+        result = CliRunner().invoke(termslides, ['analyze', '--frames', '5', '--json', '-', str(tmp_path / 'deck.yaml')])
+        assert json.loads(result.output)[1]['effects'] == 203
+
+    def test_uml(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(UMLText, '_BACKEND', _Backend())
+        (tmp_path / 'deck.yaml').write_text(UML_DECK)
+        record, = analyze(str(tmp_path / 'deck.yaml'), 24, 80, frames=5)
+        # the diagram, not the placeholder
+        item, = record['items']
+        assert item['type'] == 'uml' and item['cells'] == 5 * 3
+        assert item['build_ms'] >= 50
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+import random
+from time import perf_counter
+
+import pytest
+from asciimatics.event import KeyboardEvent
+from asciimatics.exceptions import NextScene
+from asciimatics.screen import Canvas
+
+numpy = pytest.importorskip('numpy')
+
+from termslides.canvas import ArrayCanvas, Planes  # noqa: E402
+from termslides.headless import HeadlessScreen  # noqa: E402
+from termslides.residency import footprint  # noqa: E402
+from termslides.spec import compile_slides  # noqa: E402
+from termslides.widgets import _get_effects, _reseed  # noqa: E402
+
+TEXTS = ['hello', 'a b  c', ' ', 'x', 'é', '中文 text', '中', 'éx', '  中 文  ', 'ＡＢＣ' * 10, 'wide' * 40]
+SEED = 2020
+DECK = {
+    'Fire': {'content': [{'type': 'text', 'content': 'The following text is on fire', 'animation': 'typing',
+                          'colour': 'red', 'y': 2},
+                         {'type': 'figlet', 'content': 'FIRE', 'font': 'banner', 'animation': 'fire', 'y': 20}]},
+    'Colours': {'endAnimation': 'matrix', 'pageAnimation': 'snow',
+                'content': [{'type': 'figlet', 'content': 'Cycle', 'font': 'banner', 'colour': 'cycle', 'y': 2},
+                            {'type': 'text', 'content': '中文 rainbow text', 'colour': 'rainbow', 'y': 12},
+                            {'type': 'text', 'content': 'mirage', 'animation': 'mirage', 'colour': 'rainbow',
+                             'y': 14}]},
+    'Table': {'startAnimation': 'scroll', 'endAnimation': 'drop', 'pageAnimation': 'stars',
+              'content': [{'type': 'table', 'content': [['Name', 'Age'], ['Alice', 24], ['中文', 25]],
+                           'hasHeader': True, 'tablefmt': 'fancy_grid', 'y': 4}]},
+    'Wipe': {'endAnimation': 'wipe', 'pageAnimation': 'fireworks',
+             'content': [{'type': 'text', 'content': 'Wiped\nout', 'y': 3}]},
+}
+
+
+def _cells(canvas):
+    return [canvas._buffer.slice(0, y, canvas.width) for y in range(canvas._buffer_height)]
+
+
+def _canvases(height=12, width=40, unicode_aware=True):
+    screen = HeadlessScreen(height + 4, width + 4, unicode_aware=unicode_aware)
+    return screen, Canvas(screen, height, width, 2, 2), ArrayCanvas(screen, height, width, 2, 2)
+
+
+def _full(cls, height, width):
+    # a canvas filled with distinct cells, and refreshed
+    canvas = cls(HeadlessScreen(height, width), height, width, 0, 0)
+    for y in range(height):
+        canvas.print_at(''.join(chr(33 + (x * y) % 90) for x in range(width)), 0, y, y % 16, 0, y % 8)
+    canvas.refresh()
+    return canvas
+
+
+def _play(canvas, name, frames, shots):
+    # the effects of a slide, as a SlideView plays them, and their cells at some frames
+    slide = compile_slides(DECK)[name]
+    canvas.reset()
+    ended = []
+    _reseed(SEED, name, 'build')
+    effects = _get_effects(canvas, slide.items, slide.start, slide.end, slide.page, lambda: ended.append(True))
+    _reseed(SEED, name)
+    for effect in effects:
+        effect.reset()
+    cells = []
+    started = perf_counter()
+    for frame_no in range(frames):
+        if frame_no == frames // 2:
+            # to the ending animation
+            for effect in effects:
+                effect.process_event(KeyboardEvent(ord(' ')))
+        for effect in effects:
+            try:
+                effect.update(frame_no)
+            except NextScene:
+                ended.append(True)
+        canvas.refresh()
+        if frame_no in shots:
+            cells.append(_cells(canvas))
+    return cells, (perf_counter() - started) / frames, effects
+
+
+class TestCanvas(object):
+
+    def test_print_at(self):
+        rng = random.Random(0)
+        for unicode_aware in [True, False]:
+            screen, canvas, array = _canvases(unicode_aware=unicode_aware)
+            for _ in range(400):
+                text = rng.choice(TEXTS)
+                x, y = rng.randint(-8, 42), rng.randint(-1, 12)
+                colour, attr, bg = rng.randint(0, 255), rng.randint(0, 3), rng.randint(0, 15)
+                transparent = rng.random() < 0.5
+                for target in [canvas, array]:
+                    target.print_at(text, x, y, colour, attr, bg, transparent)
+                if rng.random() < 0.1:
+                    colour_map = [(rng.randint(0, 7), 0, 0) for _ in text]
+                    for target in [canvas, array]:
+                        target.paint(text, x, y, 3, colour_map=colour_map)
+                        target.highlight(x, y, 5, 2, fg=4, bg=1)
+                if rng.random() < 0.05:
+                    x, y = rng.randint(0, 30), rng.randint(0, 10)
+                    for target in [canvas, array]:
+                        target.clear_buffer(2, 1, 3, x, y, 8, 3)
+                assert _cells(array) == _cells(canvas)
+            assert [array.get_from(x, y) for x in range(-1, 41) for y in range(-1, 13)] == \
+                [canvas.get_from(x, y) for x in range(-1, 41) for y in range(-1, 13)]
+            assert array._buffer.plain_image == canvas._buffer.plain_image
+            assert array._buffer.colour_map == canvas._buffer.colour_map
+
+            for lines in [3, -5, 20, -1]:
+                for target in [canvas, array]:
+                    target.scroll(lines)
+                assert _cells(array) == _cells(canvas)
+
+    def test_refresh(self):
+        screen, canvas, array = _canvases()
+        expected = []
+        for target in [canvas, array]:
+            screen.clear_buffer(7, 0, 0)
+            target.print_at('中文 refresh', 3, 4, 2)
+            target.refresh()
+            screen.print_at('popup', 5, 6)
+            target.refresh()
+            expected.append(_cells(screen))
+        assert expected[0] == expected[1]
+
+        # between planes, a block at once
+        planes = Planes(screen._buffer_height, screen.width)
+        planes.sync()
+        planes.block_transfer(array._buffer, 2, 2)
+        assert [planes.slice(2, y + 2, array.width) for y in range(array.height)] == _cells(array)
+        assert list(planes.deltas(0, planes.height)) == \
+            [(y, x) for y in range(2, 2 + array.height) for x in range(2, 2 + array.width)]
+        planes.sync()
+        assert list(planes.deltas(0, planes.height)) == []
+        planes.set(4, 7, ('a', 1, 0, 0, 1))
+        planes.put(numpy.array([5, 6]), 9, ord('b'), 2, 0, 0)
+        assert list(planes.deltas(0, planes.height)) == [(7, 4), (9, 5), (9, 6)]
+        planes.invalidate()
+        assert list(planes.deltas(1, 2)) == [(y, x) for y in range(1, 3) for x in range(screen.width)]
+
+    def test_effects(self):
+        for name in DECK:
+            shots = [5, 30, 59, 80, 119]
+            cells = [_play(target, name, 120, shots)[0] for target in _canvases(24, 80)[1:]]
+            assert cells[0] == cells[1], name
+
+    @pytest.mark.benchmark
+    def test_benchmark(self):
+        print('\n')
+        print('Slide preview by canvas size, ms per frame and KB')
+        print('#' * 50)
+        for height, width in [(24, 80), (60, 240)]:
+            for name in ['Fire', 'Colours']:
+                results = []
+                for target in _canvases(height, width)[1:]:
+                    _, cost, effects = _play(target, name, 60, [])
+                    buffer = [target._buffer]
+                    if isinstance(target, ArrayCanvas):
+                        buffer += [target._rows, target._cells]
+                    started = perf_counter()
+                    for _ in range(20):
+                        target.refresh()
+                    copy = (perf_counter() - started) / 20
+                    results.append((cost, copy, footprint(buffer) / 1024))
+                (cost, copy, memory), (array_cost, array_copy, array_memory) = results
+                print(f'{name:<8}{height:>3} x {width:<4} frame {cost * 1000:6.2f} {array_cost * 1000:6.2f}'
+                      f'  copy {copy * 1000:5.2f} {array_copy * 1000:5.2f}'
+                      f'  memory {memory:8.1f} {array_memory:8.1f}')
+
+    def test_memory(self):
+        for height, width in [(24, 80), (90, 960)]:
+            canvas, array = (_full(cls, height, width) for cls in [Canvas, ArrayCanvas])
+            memory = footprint([canvas._buffer]) / 1024
+            array_memory = footprint([array._buffer, array._rows, array._cells]) / 1024
+            assert array_memory < memory
+        # on the widest canvas, with and without the rows copied to the Screen
+        assert array_memory * 2 < memory and footprint([array._buffer]) / 1024 * 4 < memory
+
+    @pytest.mark.benchmark
+    def test_benchmark_full(self):
+        print('\n')
+        print('Full canvas by size, KB and ms per copy')
+        print('#' * 50)
+        for height, width in [(24, 80), (60, 240), (90, 960)]:
+            results = []
+            for cls in [Canvas, ArrayCanvas]:
+                canvas = _full(cls, height, width)
+                into = Planes(height, width) if cls is ArrayCanvas else canvas._buffer.__class__(height, width)
+                started = perf_counter()
+                for _ in range(20):
+                    into.block_transfer(canvas._buffer, 0, 0)
+                copy = (perf_counter() - started) / 20
+                buffer = [canvas._buffer] + ([canvas._rows, canvas._cells] if cls is ArrayCanvas else [])
+                results.append((footprint(buffer) / 1024, footprint([canvas._buffer]) / 1024, copy))
+            (memory, _, copy), (array_memory, planes, array_copy) = results
+            print(f'{height:>3} x {width:<4} memory {memory:8.1f} {array_memory:8.1f}  planes {planes:8.1f}'
+                  f'  copy {copy * 1000:6.2f} {array_copy * 1000:6.2f}')
+        # on the widest canvas
+        assert array_copy * 5 < copy
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import time
+from itertools import chain, repeat
+from types import MethodType, SimpleNamespace
+
+import pytest
+from asciimatics.effects import Print, Stars
+from asciimatics.scene import Scene
+from asciimatics.screen import Screen
+
+import termslides.clock
+import termslides.termslides
+from termslides.clock import FRAME_TIME, Clock
+from termslides.effects import Typing
+from termslides.headless import HeadlessScreen
+from termslides.renderers import NormalText
+from termslides.spec import compile_item, compile_slide
+from termslides.termslides import patch_draw_next_frame, patch_play
+from termslides.widgets import InvalidParameter
+
+SLIDES = 4
+# frames each slide is shown, and the time a slow terminal takes to refresh
+DURATION = 10
+REFRESH = FRAME_TIME * 1.6
+
+
+def _runtime(play):
+    """
+    Play timed slides on a slow terminal and return how long they took.
+    """
+    screen = HeadlessScreen()
+    screen.draw_next_frame = MethodType(patch_draw_next_frame, screen)
+    screen.play = MethodType(play, screen)
+    refresh = screen.refresh
+
+    def slow_refresh():
+        refresh()
+        time.sleep(REFRESH)
+
+    screen.refresh = slow_refresh
+    scenes = [Scene([Print(screen, NormalText(f'slide {i}'), 2, speed=1)], DURATION, name=f'slide{i}')
+              for i in range(SLIDES)]
+    started = time.perf_counter()
+    screen.play(scenes, repeat=False)
+    return time.perf_counter() - started
+
+
+class TestClock(object):
+
+    def test_seconds(self):
+        slide = compile_slide('One', {'duration': '7.5s', 'content': [{'type': 'text', 'content': 'hi', 'delay': 20}]})
+        assert slide.duration == 150 and slide.items[0].delay == 20
+        assert compile_item({'type': 'text', 'content': 'hi', 'delay': '0.5s'}).delay == 10
+        for value in ['0.5', 'soon', '1.5m']:
+            with pytest.raises(InvalidParameter, match='delay must be frames or seconds, e.g. "2.5s"'):
+                compile_item({'type': 'text', 'content': 'hi', 'delay': value})
+
+    def test_catch_up(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(termslides.clock, 'perf_counter', lambda: now[0])
+        # a draw takes 0.9 s, whatever the frames played
+        ticks = chain([0.0, 0.9, 1.0, 1.9], repeat(2.0))
+        monkeypatch.setattr(termslides.termslides, 'perf_counter', lambda: next(ticks))
+        screen = HeadlessScreen(5, 20)
+        screen.draw_next_frame = MethodType(patch_draw_next_frame, screen)
+        screen._clock = clock = Clock(FRAME_TIME)
+        costs = []
+        screen._governor = SimpleNamespace(apply=lambda scene, frame_no: None, skip=lambda effect, frame_no: False,
+                                           measure=lambda scene, frame_no, cost: costs.append(cost))
+        refreshed = []
+        screen.refresh = lambda: refreshed.append(screen._frame)
+        typing = Typing(screen, NormalText('hello'), 0, 0, step=1, speed=1)
+        stars = Stars(screen, 2)
+        updates = []
+        stars._update = updates.append
+        screen.set_scenes([Scene([typing, stars], 20), Scene([], -1)])
+
+        # late by 9 frames: all played, but for the stars, one drawn
+        screen.draw_next_frame()
+        now[0] += FRAME_TIME * 9.5
+        screen.draw_next_frame()
+        assert screen._frame == 10 and refreshed == [1, 10]
+        assert updates == [1, 10]
+        assert costs == pytest.approx([0.9, 0.1])
+        assert ''.join(screen.get_from(x, 0)[0] and chr(screen.get_from(x, 0)[0]) for x in range(5)) == 'hello'
+
+        # the next scene starts when the first one was due to end, not later
+        now[0] += FRAME_TIME * 11
+        screen.draw_next_frame()
+        assert screen._scene_index == 1
+        assert clock.deadline(1) == 100.0 + FRAME_TIME * 20
+
+        # suspended: the schedule is pushed back
+        now[0] += 60
+        screen.draw_next_frame()
+        screen.draw_next_frame()
+        assert screen._frame == 21
+
+    @pytest.mark.benchmark
+    def test_schedule(self):
+        stock = _runtime(Screen.play)
+        patched = _runtime(patch_play)
+        schedule = SLIDES * DURATION * FRAME_TIME
+        print('\n')
+        print(f'Runtime of {SLIDES} slides of {DURATION} frames, {REFRESH * 1000:.0f} ms refresh, s')
+        print('#' * 50)
+        print(f'{"schedule":<20} {schedule:6.2f}')
+        for name, value in [('asciimatics play', stock), ('termslides play', patched)]:
+            print(f'{name:<20} {value:6.2f}  drift {value - schedule:+6.2f}')
+        # within a few frames of the schedule, whatever the frame cost
+        assert abs(patched - schedule) < FRAME_TIME * 4
+        assert stock > schedule * 1.4
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+from time import perf_counter
+
+import pytest
+from asciimatics.effects import Cycle, Print
+from asciimatics.renderers import FigletText, Rainbow
+
+from termslides.effects import ColourCycle, ColourPrint
+from termslides.headless import HeadlessScreen
+from termslides.renderers import NormalText, RainbowText
+
+FRAMES = 64
+
+
+def _play(screen, effect, frames=FRAMES):
+    # the cells after each frame, and the time per frame
+    screen.clear()
+    screen.print_at('x' * screen.width, 0, 2)
+    screen.print_at('中文' * (screen.width // 4), 0, 3)
+    cells = []
+    started = perf_counter()
+    for frame in range(frames):
+        effect.update(frame)
+        if frame < 16:
+            cells.append([list(row) for row in screen._buffer._double_buffer])
+    return cells, (perf_counter() - started) / frames
+
+
+class TestColours(object):
+
+    def test_same_cells(self):
+        for unicode_aware in [True, False]:
+            screen = HeadlessScreen(12, 60, unicode_aware=unicode_aware)
+            for renderer in [FigletText('Cycle', 'banner'), NormalText('中文 and text\n   spaced   out'),
+                             FigletText('Much wider than the screen', 'banner')]:
+                for y in [-3, 1, 8]:
+                    assert _play(screen, ColourCycle(screen, renderer, y), 16)[0] == \
+                        _play(screen, Cycle(screen, renderer, y), 16)[0]
+                    for x in [None, -5, 50]:
+                        for transparent in [True, False]:
+                            expected = Print(screen, Rainbow(screen, renderer), y, x, bg=4,
+                                             transparent=transparent, speed=1)
+                            effect = ColourPrint(screen, RainbowText(screen, renderer), y, x, bg=4,
+                                                 transparent=transparent, speed=1)
+                            assert _play(screen, effect, 3)[0] == _play(screen, expected, 3)[0]
+
+    @pytest.mark.benchmark
+    def test_benchmark(self):
+        screen = HeadlessScreen(40, 200)
+        banner = FigletText('Terminal Slides', 'banner')
+        print('\n')
+        print(f'Colour effects on a {banner.max_width} x {banner.max_height} banner, ms')
+        print('#' * 50)
+
+        started = perf_counter()
+        stock = Rainbow(screen, banner)
+        stock.rendered_text
+        built = perf_counter() - started
+        started = perf_counter()
+        RainbowText._CACHE.clear()
+        cached = RainbowText(screen, banner)
+        faster = perf_counter() - started
+        print(f'{"rainbow build":<20} asciimatics {built * 1000:8.2f}  termslides {faster * 1000:8.2f}')
+        assert faster * 5 < built
+
+        for name, before, after in [
+                ('rainbow frame', Print(screen, stock, 5, speed=1), ColourPrint(screen, cached, 5, speed=1)),
+                ('cycle frame', Cycle(screen, banner, 5), ColourCycle(screen, banner, 5))]:
+            before, after = _play(screen, before)[1], _play(screen, after)[1]
+            print(f'{name:<20} asciimatics {before * 1000:8.2f}  termslides {after * 1000:8.2f}'
+                  f'  x{before / after:.1f}')
+            assert after * 3 < before
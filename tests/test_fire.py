@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import random
+from time import perf_counter
+
+import pytest
+from asciimatics.renderers import Fire
+from pyfiglet import Figlet
+
+numpy = pytest.importorskip('numpy')
+
+from termslides.fire import FireText  # noqa: E402
+
+# banner texts, from a short title to a full width one
+BANNERS = ['Fire', 'TermSlides', 'Terminal Slides Show']
+FRAMES = 40
+
+
+def _banner(text):
+    emitter = Figlet(font='banner', width=400).renderText(text)
+    lines = emitter.split('\n')
+    return emitter, int(len(lines) * 2.5), max(len(x) for x in lines)
+
+
+def _cost(cls, emitter, height, width):
+    random.seed(2020)
+    renderer = cls(height, width, emitter, 0.3, 45, 256)
+    started = perf_counter()
+    for _ in range(FRAMES):
+        renderer.rendered_text
+    return (perf_counter() - started) / FRAMES
+
+
+class TestFire(object):
+
+    def test_frames(self):
+        emitter, height, width = _banner('Hi')
+        random.seed(2020)
+        renderer = FireText(height, width, emitter, 0.3, 45, 256)
+        for _ in range(20):
+            text, colours = renderer.rendered_text
+        assert len(text) == len(colours) == renderer.max_height == height
+        assert all(len(x) == len(y) == width for x, y in zip(text, colours))
+        assert set(''.join(text)) <= set(Fire._CHARS)
+        assert {x for row in colours for x in row} <= {(None, 0, 0)} | {(fg, attr, 0) for fg, attr in Fire._COLOURS_256}
+        # the flames rise above the emitter at the bottom
+        assert text[height // 2].strip()
+
+        # repeatable with the same seed
+        random.seed(2020)
+        again = FireText(height, width, emitter, 0.3, 45, 256)
+        for _ in range(20):
+            repeated = again.rendered_text
+        assert repeated == (text, colours)
+
+    @pytest.mark.benchmark
+    def test_benchmark(self):
+        print('\n')
+        print('Fire frame time by banner size, ms')
+        print('#' * 50)
+        for text in BANNERS:
+            emitter, height, width = _banner(text)
+            before = _cost(Fire, emitter, height, width)
+            after = _cost(FireText, emitter, height, width)
+            print(f'{height:>3} x {width:<4} asciimatics {before * 1000:8.2f}  numpy {after * 1000:8.2f}'
+                  f'  x{before / after:.1f}')
+        assert after * 5 < before
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+"""
+Golden frames of the sample deck, played off-screen with a fixed seed.
+
+Run with TERMSLIDES_GOLDEN=update to write the golden files again after an
+intended visual change, and review their diff.  The frame budget is checked
+with TERMSLIDES_BENCHMARK=1.
+"""
+
+import os
+from hashlib import sha256
+from time import perf_counter
+from types import MethodType
+
+import pytest
+
+from termslides.headless import HeadlessScreen
+from termslides.loader import load_slides
+from termslides.residency import SlideScene, Residency
+from termslides.termslides import patch_draw_next_frame
+from termslides.widgets import InputHandler, _get_effects
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'sample.yaml')
+GOLDEN = os.path.join(os.path.dirname(__file__), 'golden')
+SEED = 2020
+# slide -> frames to compare, the "Diagram" slide needs PlantUML
+FRAMES = {
+    'Table_and_Star': [20, 45, 90],
+    'Figlet_and_Snow': [45, 60],
+    'Fire': [10, 40, 80],
+}
+# mean frame time, generous enough for slow machines
+FRAME_BUDGET = 0.05
+
+
+def _play(name, frames):
+    screen = HeadlessScreen(40, 120)
+    screen.draw_next_frame = MethodType(patch_draw_next_frame, screen)
+    slide = load_slides(SAMPLE)[1][name]
+    start, end, page = (slide.get(x) for x in ('startAnimation', 'endAnimation', 'pageAnimation'))
+    scene = SlideScene(lambda: _get_effects(screen, slide['content'], start, end, page),
+                       InputHandler(screen, None), Residency(), name=name, clear=(start is None), seed=SEED)
+    screen.set_scenes([scene], unhandled_input=lambda event: None)
+
+    shots = []
+    drawn = 0
+    started = perf_counter()
+    for frame in frames:
+        screen.run(frame - drawn)
+        drawn = frame
+        shots.append((frame, screen.cells))
+    return shots, (perf_counter() - started) / drawn
+
+
+def _format(shots):
+    text = []
+    for frame, cells in shots:
+        digest = sha256(repr(cells).encode('utf-8')).hexdigest()
+        text.append(f'--- frame {frame} {digest}\n')
+        text.extend(''.join(x[0] for x in row).rstrip() + '\n' for row in cells)
+    return ''.join(text)
+
+
+class TestGolden(object):
+
+    @pytest.mark.parametrize('name', list(FRAMES))
+    def test_frames(self, name):
+        if name == 'Fire':
+            # the fire of asciimatics burns differently
+            pytest.importorskip('numpy')
+        shots, _ = _play(name, FRAMES[name])
+        text = _format(shots)
+
+        filename = os.path.join(GOLDEN, f'{name}.txt')
+        if os.environ.get('TERMSLIDES_GOLDEN') == 'update':
+            os.makedirs(GOLDEN, exist_ok=True)
+            with open(filename, 'w', encoding='utf-8') as golden:
+                golden.write(text)
+        with open(filename, encoding='utf-8') as golden:
+            assert text == golden.read()
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize('name', list(FRAMES))
+    def test_frame_budget(self, name):
+        if name == 'Fire':
+            pytest.importorskip('numpy')
+        _, cost = _play(name, FRAMES[name][-1:])
+        assert cost < FRAME_BUDGET
+
+    def test_repeatable(self):
+        # the same seed plays the same, whatever was played before
+        first, _ = _play('Fire', [30])
+        _play('Table_and_Star', [30])
+        second, _ = _play('Fire', [30])
+        assert first == second
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from asciimatics.particles import Rain
+from asciimatics.scene import Scene
+from asciimatics.screen import TemporaryCanvas
+
+from termslides.effects import DropSlide, WipeSlide
+from termslides.governor import Governor
+
+
+class TestGovernor(object):
+
+    def test_levels(self, caplog):
+        canvas = TemporaryCanvas(24, 80)
+        rain = Rain(canvas, 100)
+        drop = DropSlide(canvas, start_frame=100)
+        scene = Scene([rain, drop], -1, name='slide')
+        count = rain._active_systems[0]._count
+        governor = Governor(0.05, window=3)
+
+        with caplog.at_level(logging.INFO, logger='termslides.governor'):
+            for frame_no in range(1, 31):
+                governor.apply(scene, frame_no)
+                governor.measure(scene, frame_no, 0.2)
+        assert governor.level == 3
+        assert rain._active_systems[0]._count == max(1, count // 2)
+        assert governor.skip(rain, 31) and not governor.skip(rain, 32)
+        assert isinstance(scene.effects[1], WipeSlide)
+        assert len([x for x in caplog.records if 'level' in x.getMessage()]) == 3
+
+        # recover with headroom
+        for frame_no in range(31, 200):
+            governor.apply(scene, frame_no)
+            governor.measure(scene, frame_no, 0.001)
+        assert governor.level == 0
+        assert rain._active_systems[0]._count == count
+        assert not governor.skip(rain, 201)
+        assert scene.effects[1] is drop
+
+    def test_drop_particles(self):
+        # the drop emitter keeps counts of its own, not to be mixed up with
+        canvas = TemporaryCanvas(24, 80)
+        drop = DropSlide(canvas, start_frame=100)
+        scene = Scene([drop], -1, name='slide')
+        emitter = drop._active_systems[0]
+        count = emitter._count
+        governor = Governor(0.05, window=1)
+        frame_no = 0
+        while governor.level < 1:
+            frame_no += 1
+            governor.apply(scene, frame_no)
+            governor.measure(scene, frame_no, 0.2)
+        governor.apply(scene, frame_no + 1)
+        assert emitter._count == max(1, count // 2)
+        while governor.level > 0:
+            frame_no += 1
+            governor.apply(scene, frame_no)
+            governor.measure(scene, frame_no, 0.001)
+        assert emitter._count == count > 0
+
+    def test_swap_back(self):
+        canvas = TemporaryCanvas(24, 80)
+        drop = DropSlide(canvas, start_frame=100)
+        scene = Scene([drop], -1, name='slide')
+        governor = Governor(0.05, window=1)
+
+        # up to cheap transitions and back down, before the transition starts
+        frame_no = 0
+        while governor.level < 3:
+            frame_no += 1
+            governor.apply(scene, frame_no)
+            governor.measure(scene, frame_no, 0.2)
+        governor.apply(scene, frame_no + 1)
+        assert isinstance(scene.effects[0], WipeSlide)
+        while governor.level == 3:
+            frame_no += 1
+            governor.apply(scene, frame_no)
+            governor.measure(scene, frame_no, 0.001)
+        assert isinstance(scene.effects[0], WipeSlide)
+        governor.apply(scene, frame_no + 1)
+        assert frame_no < 100 and scene.effects[0] is drop and not governor._swapped
+
+        # a wipe started is left to finish
+        while governor.level < 3:
+            frame_no += 1
+            governor.apply(scene, frame_no)
+            governor.measure(scene, frame_no, 0.2)
+        governor.apply(scene, frame_no + 1)
+        wipe = scene.effects[0]
+        assert isinstance(wipe, WipeSlide)
+        for frame_no in range(100, 200):
+            governor.apply(scene, frame_no)
+            governor.measure(scene, frame_no, 0.001)
+        assert governor.level < 3 and scene.effects[0] is wipe
+        # until the scene is played again
+        governor.apply(scene, 1)
+        assert scene.effects[0] is drop
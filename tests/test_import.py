@@ -38,4 +38,103 @@ class TestImport(object):
         print('1. Import module')
         print('#' * 50)
 
-        from termslides import termslides
\ No newline at end of file
+        from termslides import termslides
+
+    def test_command(self):
+        print('\n')
+        print('2. Import the command after the deck modules')
+        print('#' * 50)
+
+        import subprocess
+        from os import environ, path
+
+        root = path.dirname(path.dirname(path.abspath(__file__)))
+        code = ("import termslides.spec\n"
+                "from click import Group\n"
+                "from termslides import termslides\n"
+                "assert isinstance(termslides, Group), termslides\n")
+        proc = subprocess.run([sys.executable, '-c', code], env=dict(environ, PYTHONPATH=root),
+                              capture_output=True, text=True)
+        assert proc.returncode == 0, proc.stderr
+
+
+_TEXT_DECK = '''
+Hello:
+  notes: text only
+  content:
+    - type: text
+      content: Hello world!
+      animation: typing
+      y: 2
+'''
+
+# import time budgets, as multiples of importing the dependencies alone
+_HELP_BASELINE = "import click\n"
+_HELP_BUDGET = 2
+_TEXT_DECK_BASELINE = ("import yaml\n"
+                       "from asciimatics.screen import TemporaryCanvas\n")
+_TEXT_DECK_BUDGET = 4
+
+
+def _import_time(code, cwd):
+    """
+    Run code in a fresh interpreter and return the total import time and the
+    set of imported modules.
+    """
+    import subprocess
+    from os import environ, path
+
+    root = path.dirname(path.dirname(path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=cwd, env=dict(environ, PYTHONPATH=root), capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    total, modules = 0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        modules.add(name.strip())
+        # only count top level imports, nested ones are in the cumulative
+        if not name[1:].startswith(' '):
+            total += int(cumulative)
+    return total, modules
+
+
+@pytest.mark.usefixtures('setup')
+class TestImportTime(object):
+
+    def test_help(self, tmp_path):
+        print('\n')
+        print('1. Import time of "termslides --help"')
+        print('#' * 50)
+
+        baseline, _ = _import_time(_HELP_BASELINE, tmp_path)
+        code = ("import sys\n"
+                "from termslides import termslides\n"
+                "sys.argv = ['termslides', '--help']\n"
+                "termslides()\n")
+        total, modules = _import_time(code, tmp_path)
+        print(f'total: {total / 1000:.1f} ms, click alone: {baseline / 1000:.1f} ms')
+        for name in ['yaml', 'asciimatics.screen', 'tabulate', 'plantuml', 'pyfiglet', 'PIL', 'asyncio']:
+            assert name not in modules, name
+        assert total < baseline * _HELP_BUDGET
+
+    def test_text_deck(self, tmp_path):
+        print('\n')
+        print('2. Import time of a text-only deck')
+        print('#' * 50)
+
+        (tmp_path / 'deck.yaml').write_text(_TEXT_DECK)
+        baseline, _ = _import_time(_TEXT_DECK_BASELINE, tmp_path)
+        code = (_TEXT_DECK_BASELINE +
+                "from termslides.widgets import _get_effects\n"
+                "slides = yaml.full_load(open('deck.yaml'))\n"
+                "canvas = TemporaryCanvas(40, 120)\n"
+                "for slide in slides.values():\n"
+                "    _get_effects(canvas, slide['content'])\n")
+        total, modules = _import_time(code, tmp_path)
+        print(f'total: {total / 1000:.1f} ms, dependencies alone: {baseline / 1000:.1f} ms')
+        for name in ['tabulate', 'plantuml', 'asyncio']:
+            assert name not in modules, name
+        assert total < baseline * _TEXT_DECK_BUDGET
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""
+Soak the kiosk mode: loop the sample deck off-screen and check that memory
+and frame time stay flat.
+
+The default is a short soak, run with TERMSLIDES_SOAK_LOOPS=5000 for a long
+one.  Memory and frame time are only checked by the benchmark, on Linux.
+"""
+
+import gc
+import os
+from time import perf_counter
+from types import MethodType
+
+import pytest
+
+from termslides.effects import DropSlide, ShootSlide
+from termslides.headless import HeadlessScreen
+from termslides.loader import load_slides
+from termslides.residency import SlideScene, Residency
+from termslides.termslides import patch_draw_next_frame
+from termslides.widgets import KioskHandler, _get_effects, _valid_end
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'sample.yaml')
+LOOPS = int(os.environ.get('TERMSLIDES_SOAK_LOOPS', 15))
+WARM_UP = 3
+# frames each slide is shown before its ending
+HOLD = 10
+
+
+def _rss():
+    # resident memory in KB
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+class _Frames(object):
+    # frame costs, recorded as metrics
+    def __init__(self):
+        self.costs = []
+
+    def input(self, event):
+        pass
+
+    def idle(self):
+        pass
+
+    def frame(self, scene, frame_no, cost):
+        self.costs.append(cost)
+
+    def transition(self, old, new, cost):
+        pass
+
+
+def _kiosk(screen):
+    # the sample deck, but the diagram needing PlantUML, with every ending in turn
+    slides = load_slides(SAMPLE)[1]
+    del slides['Diagram']
+    residency = Residency()
+    scenes = []
+    for i, (name, slide) in enumerate(slides.items()):
+        start, page = slide.get('startAnimation'), slide.get('pageAnimation')
+        end = _valid_end[i % len(_valid_end)]
+
+        def build(content=slide['content'], start=start, end=end, page=page):
+            return _get_effects(screen, content, start, end, page)
+
+        scenes.append(SlideScene(build, KioskHandler(screen, HOLD), residency,
+                                 name=name, clear=(start is None), seed=2020))
+    residency.manage(scenes)
+    screen.set_scenes(scenes, unhandled_input=lambda event: None)
+    return scenes
+
+
+def _soak(measure_rss=False):
+    # live objects, frame costs and, if asked, rss after each loop
+    screen = HeadlessScreen(40, 120)
+    screen.draw_next_frame = MethodType(patch_draw_next_frame, screen)
+    screen._metrics = frames = _Frames()
+    _kiosk(screen)
+
+    loops = []
+    index = 0
+    started = perf_counter()
+    while len(loops) < LOOPS:
+        screen.draw_next_frame()
+        if screen._scene_index < index:
+            gc.collect()
+            loops.append((_rss() if measure_rss else None, len(gc.get_objects()), frames.costs))
+            frames.costs = []
+        index = screen._scene_index
+    return loops[WARM_UP:], perf_counter() - started
+
+
+class TestKiosk(object):
+
+    def test_soak(self):
+        loops, _ = _soak()
+        objects = [x[1] for x in loops]
+        # flat, allowing for the odd cached object
+        assert max(objects) - objects[0] < 100
+        assert all(x[2] for x in loops)
+
+    @pytest.mark.benchmark
+    def test_soak_benchmark(self):
+        loops, elapsed = _soak(measure_rss=True)
+        rss = [x[0] for x in loops]
+        objects = [x[1] for x in loops]
+        early, late = (sorted(y for x in part for y in x[2]) for part in (loops[:5], loops[-5:]))
+        early, late = early[len(early) // 2], late[len(late) // 2]
+        print('\n')
+        print(f'Kiosk soak, {LOOPS} loops in {elapsed:.1f}s')
+        print('#' * 50)
+        print(f'RSS KB       after warm-up {rss[0]:8d}  end {rss[-1]:8d}  max {max(rss):8d}')
+        print(f'Objects      after warm-up {objects[0]:8d}  end {objects[-1]:8d}  max {max(objects):8d}')
+        print(f'Frame ms     early median {early * 1000:8.2f}  late median {late * 1000:8.2f}')
+        # flat, allowing for allocator noise and a busy machine
+        assert max(rss) - rss[0] < 2048
+        assert late < early * 1.5 + 0.001
+
+    def test_emitters_reused(self):
+        screen = HeadlessScreen(10, 40)
+        for effect in [DropSlide(screen, 20), ShootSlide(screen, duration=20)]:
+            emitter = effect._active_systems[0]
+            particles = []
+            for _ in range(2):
+                screen.clear()
+                screen.print_at('hello', 0, 0)
+                effect.reset()
+                effect._go = True
+                for frame in range(20):
+                    effect.update(frame)
+                particles.append(emitter._particles)
+            # the same emitter, and the same particles found on the unchanged screen
+            assert effect._emitter is emitter
+            assert particles[0] is particles[1] and len(particles[0]) == 5
+
+            screen.clear()
+            screen.print_at('hello world', 0, 0)
+            effect.reset()
+            effect._go = True
+            effect.update(0)
+            assert len(emitter._particles) == 10
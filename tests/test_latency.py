@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import random
+import threading
+import time
+from types import MethodType
+
+import pytest
+from asciimatics.effects import Print
+from asciimatics.event import KeyboardEvent
+from asciimatics.exceptions import StopApplication
+from asciimatics.scene import Scene
+from asciimatics.screen import Screen
+
+from termslides.clock import FRAME_TIME
+from termslides.headless import HeadlessScreen
+from termslides.renderers import NormalText
+from termslides.termslides import patch_draw_next_frame, patch_play
+from termslides.widgets import InputHandler
+
+PRESSES = 20
+
+
+def _latencies(play):
+    """
+    Play slides, pressing right and left arrows at random times, and return
+    the delays from key presses to the paint of the new slides.
+    """
+    screen = HeadlessScreen()
+    screen.draw_next_frame = MethodType(patch_draw_next_frame, screen)
+    screen.play = MethodType(play, screen)
+    scenes = [Scene([], -1, name='__slides_list__')]
+    for i in range(2):
+        scenes.append(Scene([InputHandler(screen, None), Print(screen, NormalText(f'slide {i}'), 2, speed=4)],
+                            -1, name=f'slide{i}'))
+
+    painted = []
+    refresh = screen.refresh
+
+    def timed_refresh():
+        refresh()
+        painted.append((time.perf_counter(), screen._scene_index))
+
+    screen.refresh = timed_refresh
+
+    def press():
+        rng = random.Random(0)
+        for i in range(PRESSES):
+            time.sleep(rng.uniform(0.06, 0.12))
+            pressed.append(time.perf_counter())
+            screen.feed(KeyboardEvent(Screen.KEY_RIGHT if i % 2 == 0 else Screen.KEY_LEFT))
+        time.sleep(0.1)
+        screen.feed(KeyboardEvent(ord('x')))
+
+    pressed = []
+    thread = threading.Thread(target=press)
+    thread.start()
+    screen.play(scenes, start_scene=scenes[1], unhandled_input=_quit)
+    thread.join()
+
+    latencies = []
+    for i, start in enumerate(pressed):
+        # the first paint of the slide entered by the key press
+        target = 2 if i % 2 == 0 else 1
+        latencies.append(min(t for t, index in painted if t >= start and index == target) - start)
+    return latencies
+
+
+def _quit(event):
+    raise StopApplication('done')
+
+
+class TestLatency(object):
+
+    def test_key_to_paint(self):
+        # every key press paints the slide it enters
+        assert len(_latencies(patch_play)) == PRESSES
+
+    @pytest.mark.benchmark
+    def test_latency(self):
+        stock = _latencies(Screen.play)
+        patched = _latencies(patch_play)
+        print('\n')
+        print('Key press to paint latency, ms')
+        print('#' * 50)
+        for name, values in [('asciimatics play', stock), ('termslides play', patched)]:
+            values = sorted(values)
+            print(f'{name:<20} median {values[len(values) // 2] * 1000:6.1f}  max {values[-1] * 1000:6.1f}')
+        # consistently below one frame
+        assert max(patched) < FRAME_TIME / 2
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from termslides.loader import load_slides
+from termslides.widgets import InvalidParameter
+
+
+def _touch(path, text):
+    path.write_text(text)
+    # make sure the modification is seen even on coarse clocks
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+
+class TestLoader(object):
+
+    def test_include(self, tmp_path):
+        (tmp_path / 'chapters').mkdir()
+        (tmp_path / 'deck.yaml').write_text(
+            'title: Course\n'
+            'Intro: {content: []}\n'
+            'include: [chapters/one.yaml, chapters/two.yaml]\n'
+            'End: {content: []}\n')
+        (tmp_path / 'chapters' / 'one.yaml').write_text('One: {content: []}\n')
+        (tmp_path / 'chapters' / 'two.yaml').write_text(
+            'Two:\n  notes: !include notes.yaml\n  content: []\n')
+        (tmp_path / 'chapters' / 'notes.yaml').write_text('"shared notes"\n')
+
+        deck, slides = load_slides(str(tmp_path / 'deck.yaml'))
+        assert deck['title'] == 'Course'
+        assert list(slides) == ['Intro', 'One', 'Two', 'End']
+        assert slides['Two']['notes'] == 'shared notes'
+
+    def test_reload_changed_only(self, tmp_path):
+        (tmp_path / 'deck.yaml').write_text('include: [one.yaml, two.yaml]\n')
+        (tmp_path / 'one.yaml').write_text('One: {content: []}\n')
+        (tmp_path / 'two.yaml').write_text('Two: {content: []}\n')
+        _, first = load_slides(str(tmp_path / 'deck.yaml'))
+
+        _touch(tmp_path / 'two.yaml', 'Two: {content: [], notes: changed}\n')
+        _, second = load_slides(str(tmp_path / 'deck.yaml'))
+        assert second['One'] is first['One']
+        assert second['Two'] is not first['Two']
+        assert second['Two']['notes'] == 'changed'
+
+    def test_errors(self, tmp_path):
+        (tmp_path / 'deck.yaml').write_text('include: deck.yaml\n')
+        with pytest.raises(InvalidParameter):
+            load_slides(str(tmp_path / 'deck.yaml'))
+
+        (tmp_path / 'deck.yaml').write_text('One: {content: []}\ninclude: one.yaml\n')
+        (tmp_path / 'one.yaml').write_text('One: {content: []}\n')
+        with pytest.raises(InvalidParameter):
+            load_slides(str(tmp_path / 'deck.yaml'))
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import json
+import socket
+from types import MethodType
+
+from asciimatics.effects import Print
+from asciimatics.event import KeyboardEvent
+from asciimatics.scene import Scene
+from click.testing import CliRunner
+
+from termslides.headless import HeadlessScreen
+from termslides.metrics import Metrics, summarise
+from termslides.renderers import NormalText
+from termslides.termslides import patch_draw_next_frame, termslides
+
+
+def _play(metrics):
+    screen = HeadlessScreen()
+    screen.draw_next_frame = MethodType(patch_draw_next_frame, screen)
+    screen._metrics = metrics
+    scenes = [Scene([Print(screen, NormalText(f'slide {i}'), 2, speed=4)], 20, name=f'slide{i}')
+              for i in range(2)]
+    screen.set_scenes(scenes)
+    screen.run(10)
+    screen.feed(KeyboardEvent(ord('a')))
+    screen.run(20)
+    metrics.close()
+
+
+class TestMetrics(object):
+
+    def test_stream(self, tmp_path):
+        filename = str(tmp_path / 'metrics.jsonl')
+        _play(Metrics(filename))
+        with open(filename) as stream:
+            records = [json.loads(x) for x in stream]
+        frames = [x for x in records if x['type'] == 'frame']
+        # drawn every 4 frames, plus the frame after the key press
+        assert [x['frame'] for x in frames[:4]] == [1, 4, 8, 11]
+        assert frames[1]['idle'] == 2
+        assert [x['type'] for x in records].count('input') == 1
+        assert [(x['from'], x['to']) for x in records if x['type'] == 'scene'] == [('slide0', 'slide1')]
+
+        lines = summarise(open(filename))
+        assert lines[0].split()[:2] == ['Frame', 'time']
+        assert lines[1].split()[0] == 'slide0'
+        assert lines[-1].startswith(f'Frames drawn: {len(frames)}')
+
+        result = CliRunner().invoke(termslides, ['stats', filename])
+        assert result.exit_code == 0
+        assert result.output.strip().split('\n') == lines
+
+    def test_socket(self, tmp_path):
+        path = str(tmp_path / 'metrics.sock')
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+        metrics = Metrics(f'unix:{path}')
+        reader, _ = server.accept()
+        _play(metrics)
+        data = b''
+        while True:
+            chunk = reader.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+        assert data.endswith(b'\n')
+        assert {json.loads(x)['type'] for x in data.decode().splitlines()} == {'frame', 'input', 'scene'}
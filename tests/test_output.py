@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+from termslides.effects import ScrollSlide
+from termslides.headless import HeadlessScreen
+from termslides.output import OutputMeter, LowBandwidth
+from termslides.widgets import _get_effects
+
+_CONTENT = [
+    {'type': 'text', 'content': 'Hello world! ' * 4, 'y': 2, 'colour': 'rainbow'},
+    {'type': 'text', 'content': 'a   b   c   d', 'y': 4},
+]
+
+
+def _play(low_bandwidth):
+    screen = HeadlessScreen(24, 80, record=True)
+    if low_bandwidth:
+        LowBandwidth().install(screen)
+    meter = OutputMeter()
+    meter.install(screen)
+    screen._scenes = []
+    effects = _get_effects(screen, [dict(x) for x in _CONTENT], 'scroll')
+    for frame_no in range(60):
+        for effect in effects:
+            effect.update(frame_no)
+        screen.refresh()
+    return screen, meter
+
+
+class TestOutput(object):
+
+    def test_low_bandwidth(self):
+        normal, normal_meter = _play(False)
+        low, low_meter = _play(True)
+        assert normal._buffer.plain_image == low._buffer.plain_image
+        assert low_meter.slides[None][1] < normal_meter.slides[None][1] * 0.8
+        assert low_meter.slides[None][0] == 60
+        assert 'Total' in low_meter.report()[-1]
+
+    def test_single_write(self):
+        screen = HeadlessScreen(24, 80, record=True)
+        LowBandwidth().install(screen)
+        writes = []
+        write = screen._safe_write
+        screen._safe_write = lambda msg: (writes.append(msg), write(msg))
+        screen.print_at('ab  cd', 2, 3)
+        screen.print_at('x', 40, 3)
+        screen.refresh()
+        assert len(writes) == 1
+        # the short gap is bridged, the long one is a relative cursor move
+        assert 'ab  cd\x1b[32Cx' in screen.output
+
+    def test_scroll(self):
+        screen = HeadlessScreen(24, 80, record=True)
+        LowBandwidth().install(screen)
+        effect = ScrollSlide(screen)
+        effect.reset()
+        for frame_no in range(4):
+            effect.update(frame_no)
+            screen.refresh()
+        # the scroll region is set once
+        assert screen.output == '\x1b[1;24r' + '\x1b[S' * 3
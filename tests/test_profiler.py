@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+import pstats
+from types import MethodType
+
+from asciimatics.scene import Scene
+
+from termslides.headless import HeadlessScreen
+from termslides.profiler import Profiler
+from termslides.termslides import patch_draw_next_frame
+from termslides.widgets import _get_effects
+
+
+class TestProfiler(object):
+
+    def test_summary(self, tmp_path):
+        screen = HeadlessScreen()
+        screen.draw_next_frame = MethodType(patch_draw_next_frame, screen)
+        profiler = Profiler()
+        profiler.watch('terminal refresh', screen.refresh)
+        # as the screen is opened again after a resize
+        profiler.watch('terminal refresh', screen.refresh)
+        profiler.start()
+        with profiler.phase('build Intro'):
+            effects = _get_effects(screen, [
+                {'type': 'figlet', 'content': 'Hi', 'font': 'standard', 'y': 2},
+                {'type': 'text', 'content': 'hello', 'animation': 'typing', 'y': 10},
+            ])
+        screen.set_scenes([Scene(effects, -1)])
+        screen.run(20)
+        profiler.stop()
+
+        filename = str(tmp_path / 'show.prof')
+        profiler.save(filename)
+        assert pstats.Stats(filename).total_calls > 0
+        with open(f'{filename}.txt') as summary:
+            text = summary.read()
+        lines = text.split('\n')
+        assert lines[1].startswith('build Intro') and lines[1].split()[2] == '1'
+        rows = {x.split()[0] for x in lines if x.strip()}
+        # renderers by content type, effects by class and the refresh
+        assert {'figlet', 'text', 'Print', 'Typing', 'terminal'} <= rows
+        assert len([x for x in lines if x.startswith('terminal refresh')]) == 1
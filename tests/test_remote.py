@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+import random
+import socket
+import threading
+import time
+from types import MethodType, SimpleNamespace
+
+import pytest
+from asciimatics.effects import Print
+from asciimatics.event import KeyboardEvent
+from asciimatics.exceptions import StopApplication
+from asciimatics.scene import Scene
+
+from termslides.clock import FRAME_TIME
+from termslides.headless import HeadlessScreen
+from termslides.remote import Remote
+from termslides.renderers import NormalText
+from termslides.termslides import patch_draw_next_frame, patch_play
+from termslides.widgets import InputHandler
+
+PRESSES = 20
+
+
+def _quit(event):
+    if isinstance(event, KeyboardEvent) and event.key_code == ord('x'):
+        raise StopApplication('done')
+
+
+def _play(address, client):
+    """
+    Play slides controlled by a client, and return the times the slides were
+    painted, as (time, scene index).
+    """
+    screen = HeadlessScreen()
+    screen.draw_next_frame = MethodType(patch_draw_next_frame, screen)
+    screen.play = MethodType(patch_play, screen)
+    scenes = [Scene([], -1, name='__slides_list__')]
+    list_view = SimpleNamespace(index=0)
+    for i in range(3):
+        scenes.append(Scene([InputHandler(screen, list_view), Print(screen, NormalText(f'slide {i}'), 2, speed=4)],
+                            -1, name=f'slide{i}'))
+
+    painted = []
+    refresh = screen.refresh
+
+    def timed_refresh():
+        refresh()
+        painted.append((time.perf_counter(), screen._scene_index))
+
+    screen.refresh = timed_refresh
+
+    remote = Remote(address)
+    remote.start()
+    remote.install(screen)
+
+    def run():
+        family = socket.AF_UNIX if remote.address.startswith('unix:') else socket.AF_INET
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.settimeout(5)
+                if family == socket.AF_UNIX:
+                    sock.connect(remote.address[len('unix:'):])
+                else:
+                    host, port = remote.address.rsplit(':', 1)
+                    sock.connect((host, int(port)))
+                client(sock.makefile('rw', buffering=1, encoding='utf-8'))
+        finally:
+            screen.feed(KeyboardEvent(ord('x')))
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    try:
+        screen.play(scenes, start_scene=scenes[1], unhandled_input=_quit)
+    finally:
+        thread.join()
+        remote.close()
+    return painted
+
+
+def _send(stream, command):
+    stream.write(command + '\n')
+    return stream.readline().rstrip('\n')
+
+
+class TestRemote(object):
+
+    @pytest.mark.parametrize('tcp', [False, True])
+    def test_commands(self, tmp_path, tcp):
+        replies = []
+
+        def client(stream):
+            for command in ['current', 'next', 'current', 'goto slide0', 'current', 'goto 3', 'current',
+                            'prev', 'current', 'goto 9', 'jump', '', 'list', 'current', 'list', 'current']:
+                if command:
+                    replies.append(_send(stream, command))
+                    time.sleep(FRAME_TIME)
+                else:
+                    stream.write('\n')
+
+        _play('127.0.0.1:0' if tcp else f'unix:{tmp_path / "control.sock"}', client)
+        assert replies == [
+            'ok 1 slide0', 'ok', 'ok 2 slide1', 'ok', 'ok 1 slide0', 'ok', 'ok 3 slide2', 'ok', 'ok 2 slide1',
+            'error no slide 9', 'error unknown command jump, expect one of next, prev, goto, list, current',
+            'ok', 'ok list', 'ok', 'ok list']
+        assert not (tmp_path / 'control.sock').exists()
+
+    @pytest.mark.benchmark
+    def test_latency(self):
+        pressed = []
+
+        def client(stream):
+            rng = random.Random(0)
+            for i in range(PRESSES):
+                time.sleep(rng.uniform(0.06, 0.12))
+                pressed.append(time.perf_counter())
+                _send(stream, 'next' if i % 2 == 0 else 'prev')
+            time.sleep(0.1)
+
+        painted = _play('127.0.0.1:0', client)
+        latencies = []
+        for i, start in enumerate(pressed):
+            # the first paint of the slide entered by the command
+            target = 2 if i % 2 == 0 else 1
+            latencies.append(min(t for t, index in painted if t >= start and index == target) - start)
+        latencies.sort()
+        print('\n')
+        print('Remote command to paint latency, ms')
+        print('#' * 50)
+        print(f'{"tcp client":<20} median {latencies[len(latencies) // 2] * 1000:6.1f}'
+              f'  max {latencies[-1] * 1000:6.1f}')
+        # consistently below one frame
+        assert latencies[-1] < FRAME_TIME / 2
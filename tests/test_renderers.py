@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import threading
+
+from termslides.effects import Typing
+from termslides.headless import HeadlessScreen
+from termslides.renderers import CodeText, CSVTableText, NormalText, UMLText
+from termslides.widgets import _get_effects
+
+
+def _write(path, rows, delimiter=','):
+    with open(path, 'w', newline='', encoding='utf-8') as stream:
+        csv.writer(stream, delimiter=delimiter).writerows(rows)
+
+
+class TestCSVTableText(object):
+
+    def test_window(self, tmp_path):
+        source = str(tmp_path / 'table.csv')
+        _write(source, [['id', 'name']] + [[i, f'row{i}'] for i in range(1000)])
+        table = CSVTableText(source, 5, hasHeader=True)
+        image = table.rendered_text[0]
+        assert table.rows == 1000
+        # top, header, header line, 5 rows and bottom
+        assert len(image) == 9
+        assert image[1] == '| id  | name   |'
+        assert image[3] == '|   0 | row0   |'
+
+        assert table.scroll(600)
+        assert table.rendered_text[0][3] == '| 600 | row600 |'
+        # the window stops at the last page
+        table.scroll(1000)
+        assert table.rendered_text[0][-2] == '| 999 | row999 |'
+        assert not table.scroll(1)
+
+    def test_tsv(self, tmp_path):
+        source = str(tmp_path / 'table.tsv')
+        _write(source, [['a', '1.5'], ['bb', 'x']], delimiter='\t')
+        table = CSVTableText(source, 10, tablefmt='plain')
+        assert table.rendered_text[0] == ['a   1.5', 'bb  x  ']
+
+
+class TestCodeText(object):
+
+    def test_highlight(self):
+        source = 'def f(x):\n    return x + 1\n'
+        code = CodeText(source, lang='python')
+        image, colours = code.rendered_text
+        assert image == ['def f(x):', '    return x + 1']
+        assert [len(line) for line in colours] == [len(line) for line in image]
+        # keyword and function name are styled differently from the rest
+        assert colours[0][0] != colours[0][4] != colours[0][5]
+
+    def test_cache(self):
+        source = 'SELECT 1;'
+        first = CodeText.highlight(source, 'sql')
+        assert CodeText.highlight(source, 'sql') is first
+        assert CodeText.highlight(source, 'sql', 'monochrome') is not first
+
+
+class TestNormalText(object):
+
+    def test_layout(self):
+        text = 'The quick brown fox jumps over the lazy dog.\nThe end.'
+        assert NormalText.layout(text, 20) == [
+            'The quick brown fox ',
+            'jumps over the lazy ',
+            'dog.                ',
+            'The end.            ',
+        ]
+        assert NormalText.layout(text, 20, 'right', justify=True) == [
+            'The  quick brown fox',
+            'jumps  over the lazy',
+            '                dog.',
+            '            The end.',
+        ]
+        assert NormalText.layout('a b', 6, 'centre') == [' a b  ']
+        # words longer than the width are broken
+        assert NormalText.layout('abcdefgh', 3) == ['abc', 'def', 'gh ']
+
+    def test_wide(self):
+        # CJK and emoji take two cells, and lines may break between them
+        lines = NormalText.layout('你好世界 ok 😀😀😀', 7)
+        assert lines == ['你好世 ', '界 ok  ', '😀😀😀 ']
+        text = NormalText('你好世界 ok 😀😀😀', 7)
+        assert text.max_width == 7 and text.max_height == 3
+
+    def test_cache(self):
+        text = 'Reflowed only when the width changes'
+        first = NormalText.layout(text, 10)
+        assert NormalText.layout(text, 10) is first
+        assert NormalText.layout(text, 12) is not first
+        assert NormalText.layout(text, 10, justify=True) is not first
+
+    def test_percent(self):
+        screen = HeadlessScreen(24, 80)
+        effects = _get_effects(screen, [{'type': 'text', 'content': 'word ' * 30, 'width': '50%', 'y': 2}])
+        image = effects[0]._renderer.rendered_text[0]
+        assert [len(x) for x in image] == [40] * 4
+
+
+def _line(screen, y):
+    return ''.join(chr(screen.get_from(x, y)[0]) for x in range(screen.width))
+
+
+class _SlowPlantUML(object):
+    """
+    Stands for PlantUML, rendering when told to.
+    """
+
+    def __init__(self, diagram=b'+------+\n| A->B |\n+------+'):
+        self.go = threading.Event()
+        self.diagram = diagram
+
+    def processes(self, text):
+        assert self.go.wait(5)
+        return self.diagram
+
+
+class TestUMLText(object):
+
+    def test_background(self, monkeypatch):
+        backend = _SlowPlantUML()
+        monkeypatch.setattr(UMLText, '_BACKEND', backend)
+        monkeypatch.setattr(UMLText, '_CACHE', {})
+        screen = HeadlessScreen(24, 80)
+        effect = _get_effects(screen, [{'type': 'uml', 'content': 'A->B: hi', 'y': 2}])[0]
+        woken = threading.Event()
+        effect._renderer.on_ready(lambda width, height: None, woken.set)
+
+        # the placeholder is shown, centred, while PlantUML works
+        effect.update(4)
+        assert UMLText.PLACEHOLDER in _line(screen, 3)
+        assert not effect._renderer.ready
+
+        backend.go.set()
+        assert woken.wait(5)
+        effect.update(8)
+        assert effect._renderer.ready
+        assert effect._x == (80 - 8) // 2
+        assert _line(screen, 3).strip() == '| A->B |'
+
+    def test_typing_larger(self, monkeypatch):
+        # a diagram wider and taller than the placeholder
+        lines = ['+' + '-' * 58 + '+'] + ['|' + ' ' * 58 + '|'] * 8 + ['+' + '-' * 58 + '+']
+        backend = _SlowPlantUML('\n'.join(lines).encode('utf-8'))
+        monkeypatch.setattr(UMLText, '_BACKEND', backend)
+        monkeypatch.setattr(UMLText, '_CACHE', {})
+        screen = HeadlessScreen(24, 80)
+        effect = _get_effects(screen, [{'type': 'uml', 'content': 'A->B: hi', 'y': 2, 'animation': 'typing'}])[0]
+        placeholder = effect.stop_frame
+
+        backend.go.set()
+        assert effect._renderer._future.result(5)
+        effect.update(6)
+        typing = Typing(screen, NormalText('\n'.join(lines)), 2, step=effect._step, speed=effect._speed)
+        assert effect._x == (80 - 60) // 2
+        assert effect._frame_cnt == typing._frame_cnt
+        assert effect.stop_frame == typing._frame_cnt > placeholder
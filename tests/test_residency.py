@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+from asciimatics.effects import Print
+from asciimatics.screen import TemporaryCanvas
+
+from termslides.renderers import NormalText
+from termslides.residency import SlideScene, Residency
+
+
+class TestResidency(object):
+
+    def _scenes(self, residency, count):
+        canvas = TemporaryCanvas(24, 80)
+
+        def build(i):
+            return lambda: [Print(canvas, NormalText(f'slide {i} ' * 500), 0)]
+
+        scenes = [SlideScene(build(i), Print(canvas, NormalText(''), 0), residency, name=f'slide{i}')
+                  for i in range(count)]
+        residency.manage(scenes)
+        return scenes
+
+    def test_lazy(self):
+        residency = Residency(report=True)
+        scenes = self._scenes(residency, 3)
+        assert not any(x.resident for x in scenes)
+        scenes[1].reset()
+        assert [x.resident for x in scenes] == [False, True, False]
+        assert scenes[1].footprint > 0
+        assert len(scenes[1].effects) == 2
+
+    def test_unmeasured(self):
+        # without a budget or a report, the effects are not walked
+        residency = Residency()
+        scenes = self._scenes(residency, 2)
+        scenes[0].reset()
+        scenes[0].exit()
+        assert scenes[0].resident and scenes[0].footprint == 0
+
+    def test_evict(self):
+        residency = Residency(report=True)
+        scenes = self._scenes(residency, 6)
+        scenes[0].reset()
+        # room for about three slides
+        residency._budget = scenes[0].footprint * 3.5
+        for scene in scenes[1:]:
+            scene.exit()
+            scene.reset()
+        # the current slide and its neighbour are kept, the oldest are evicted
+        assert [x.resident for x in scenes] == [False, False, False, True, True, True]
+        assert residency.total <= residency._budget
+
+        scenes[0].reset()
+        assert scenes[0].resident and scenes[1].resident is False
+        assert 'slide0' in '\n'.join(residency.report())
+
+    def test_prefetch(self):
+        residency = Residency()
+        scenes = self._scenes(residency, 3)
+        scenes[1].reset()
+        # the next slide first, then the previous one
+        assert residency.prefetch()
+        assert [x.resident for x in scenes] == [False, True, True]
+        assert residency.prefetch()
+        assert all(x.resident for x in scenes)
+        assert not residency.prefetch()
+        assert scenes[0].effects[1]._renderer._plain_images
+
+    def test_steps(self):
+        residency = Residency()
+        canvas = TemporaryCanvas(24, 80)
+        built = []
+
+        def build():
+            # three steps, drawing from the random generator
+            for _ in range(3):
+                built.append(random.random())
+                yield
+            return [Print(canvas, NormalText(f'{x}'), 0) for x in built]
+
+        handler = Print(canvas, NormalText(''), 0)
+        scenes = [SlideScene(lambda: [], handler, residency, name='current'),
+                  SlideScene(build, handler, residency, name='next', seed=1)]
+        residency.manage(scenes)
+        scenes[0].reset()
+        random.seed(2)
+        expected = [random.random() for _ in range(4)]
+        random.seed(2)
+        played = []
+        while residency.prefetch():
+            played.append(random.random())
+        # a step per idle time, the playing slide keeping its random sequence
+        assert played == expected and scenes[1].resident
+        assert len(scenes[1].effects) == 4
+
+        # the same as built at once
+        stepped, built[:] = list(built), []
+        scenes[1].evict()
+        scenes[1].materialise()
+        assert built == stepped
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from click.testing import CliRunner
+
+from termslides.loader import load_slides
+from termslides.spec import ItemSpec, check_deck, compile_slides
+from termslides.termslides import termslides
+from termslides.widgets import InvalidParameter
+
+DECK = '''\
+title: Deck
+One:
+  content:
+    - type: text
+      content: hello
+      colour: red
+Two:
+  notes: some notes
+  endAnimation: wipe
+  content:
+    - type: figlet
+      content: hi
+      font: banner
+'''
+
+
+class TestSpec(object):
+
+    def test_compile(self, tmp_path):
+        (tmp_path / 'deck.yaml').write_text(DECK)
+        slides = load_slides(str(tmp_path / 'deck.yaml'))[1]
+        specs = compile_slides(slides)
+        one, two = specs['One'], specs['Two']
+        assert one.notes == '' and one.duration == -1 and one.end is None
+        assert two.notes == 'some notes' and two.end == 'wipe'
+        item = one.items[0]
+        assert isinstance(item, ItemSpec) and item.type == 'text' and item.content == 'hello'
+        assert item.mark == (str(tmp_path / 'deck.yaml'), 4, 7)
+        # compact and immutable, and the YAML items left untouched
+        assert not hasattr(item, '__dict__')
+        with pytest.raises(AttributeError):
+            item.colour = 0
+        with pytest.raises(TypeError):
+            item.params['text'] = 'changed'
+        assert dict(slides['One']['content'][0]) == {'type': 'text', 'content': 'hello', 'colour': 'red'}
+
+        # unchanged slides are not compiled again
+        assert compile_slides(slides)['One'] is one
+
+    def test_errors(self, tmp_path):
+        (tmp_path / 'deck.yaml').write_text(
+            DECK.replace('colour: red', 'colour: purple').replace('endAnimation: wipe', 'endAnimation: spin'))
+        slides = load_slides(str(tmp_path / 'deck.yaml'))[1]
+        with pytest.raises(InvalidParameter, match=r'deck.yaml:6:7: Invalid colour: purple'):
+            compile_slides(slides)
+
+        errors = check_deck(str(tmp_path / 'deck.yaml'))
+        deck = tmp_path / 'deck.yaml'
+        assert [x.split(': ', 1)[0] for x in errors] == [f'{deck}:6:7', f'{deck}:9:3']
+
+        (tmp_path / 'deck.yaml').write_text(DECK.replace('font: banner', 'font: nofont'))
+        assert check_deck(str(tmp_path / 'deck.yaml'))[0].endswith('deck.yaml:13:7: Unknown figlet font: nofont')
+
+        (tmp_path / 'deck.yaml').write_text(DECK.replace('''    - type: figlet
+      content: hi
+      font: banner''', '''    - type: code
+      content: print(1)
+      lang: pythn'''))
+        assert check_deck(str(tmp_path / 'deck.yaml'))[0].endswith('deck.yaml:13:7: Unknown code language: pythn')
+        (tmp_path / 'deck.yaml').write_text((tmp_path / 'deck.yaml').read_text().replace('pythn', 'python'))
+        assert check_deck(str(tmp_path / 'deck.yaml')) == []
+
+    def test_check(self, tmp_path):
+        for i in range(4):
+            (tmp_path / f'deck{i}.yaml').write_text(DECK)
+        (tmp_path / 'bad.yml').write_text(DECK.replace('type: text', 'type: txt'))
+        (tmp_path / 'notes.txt').write_text('not a deck')
+
+        result = CliRunner().invoke(termslides, ['check', '--jobs', '2', str(tmp_path)])
+        assert result.exit_code == 1
+        assert 'bad.yml:4:7: Invalid type: txt' in result.output
+        assert result.output.endswith('5 decks checked, 1 with errors\n')
+
+        result = CliRunner().invoke(termslides, ['check', str(tmp_path / 'deck0.yaml')])
+        assert result.exit_code == 0
+        assert result.output == '1 decks checked, 0 with errors\n'
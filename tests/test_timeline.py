@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+import gc
+from time import perf_counter
+from types import MethodType
+
+import pytest
+from asciimatics.event import KeyboardEvent
+from asciimatics.scene import Scene
+from asciimatics.screen import Canvas, Screen
+
+import termslides.clock
+from termslides.clock import FRAME_TIME, Clock
+from termslides.headless import HeadlessScreen
+from termslides.spec import compile_slides
+from termslides.termslides import patch_draw_next_frame
+from termslides.timeline import Timeline
+from termslides.widgets import SCRUB_FRAMES, ListView, NoteView, SlideView, TitleView, _get_effects, _reseed
+
+SEED = 2020
+DECK = {
+    'Typing': {'pageAnimation': 'stars',
+               'content': [{'type': 'text', 'content': 'Typed ' * 40, 'animation': 'typing', 'y': 2},
+                           {'type': 'text', 'content': 'mirage', 'animation': 'mirage', 'colour': 'rainbow',
+                            'y': 8, 'delay': 30}]},
+    'Boom': {'pageAnimation': 'explosion',
+             'content': [{'type': 'figlet', 'content': 'BOOM', 'font': 'banner', 'y': 2}]},
+    'Fire': {'endAnimation': 'wipe', 'pageAnimation': 'fireworks',
+             'content': [{'type': 'figlet', 'content': 'FIRE', 'font': 'banner', 'animation': 'fire', 'y': 10}]},
+    'Scroll': {'startAnimation': 'scroll', 'endAnimation': 'matrix', 'pageAnimation': 'snow',
+               'content': [{'type': 'figlet', 'content': 'Cycle', 'font': 'banner', 'colour': 'cycle', 'y': 2}]},
+}
+FRAMES = 150
+
+
+def _canvases(height=24, width=80):
+    screen = HeadlessScreen(height, width)
+    canvases = [Canvas(screen, height - 4, width - 4, 2, 2)]
+    try:
+        from termslides.canvas import ArrayCanvas
+    except ImportError:
+        pass
+    else:
+        canvases.append(ArrayCanvas(screen, height - 4, width - 4, 2, 2))
+    return canvases
+
+
+def _effects(canvas, name):
+    # the effects of a slide, as a SlideView builds them
+    slide = compile_slides(DECK)[name]
+    canvas.reset()
+    _reseed(SEED, name, 'build')
+    effects = _get_effects(canvas, slide.items, slide.start, slide.end, slide.page)
+    _reseed(SEED, name)
+    for effect in effects:
+        effect.reset()
+    return effects
+
+
+def _cells(canvas):
+    canvas.refresh()
+    return [canvas._buffer.slice(0, y, canvas.width) for y in range(canvas._buffer_height)]
+
+
+class TestTimeline(object):
+
+    def test_seek(self):
+        for canvas in _canvases():
+            for name in DECK:
+                effects = _effects(canvas, name)
+                expected = [_cells(canvas)]
+                for frame_no in range(1, FRAMES + 1):
+                    for effect in effects:
+                        effect.update(frame_no)
+                    expected.append(_cells(canvas))
+
+                effects = _effects(canvas, name)
+                timeline = Timeline(canvas, effects, interval=10, limit=8)
+                for frame_no in range(1, 40):
+                    for effect in effects:
+                        effect.update(frame_no)
+                    timeline.played(frame_no)
+                    timeline.idle()
+                assert _cells(canvas) == expected[39]
+                for frame_no in [FRAMES, 3, 0, 57, 58, 120, 12, 100, FRAMES]:
+                    assert timeline.seek(frame_no) == frame_no == timeline.frame_no
+                    assert _cells(canvas) == expected[frame_no], (name, frame_no)
+                # thinned out on the way
+                assert len(timeline._frames) <= 8 and timeline._frames[0] == 0
+
+                # and plays on
+                for frame_no in range(FRAMES - 20, FRAMES + 1):
+                    timeline.seek(frame_no - 1)
+                    for effect in effects:
+                        effect.update(frame_no)
+                    timeline.played(frame_no)
+                    timeline.idle()
+                    assert _cells(canvas) == expected[frame_no]
+
+    def test_idle(self):
+        canvas = _canvases()[0]
+        effects = _effects(canvas, 'Boom')
+        timeline = Timeline(canvas, effects)
+        for frame_no in range(1, 26):
+            for effect in effects:
+                effect.update(frame_no)
+            timeline.played(frame_no)
+        # saved in the spare time, not as played
+        assert timeline._frames == [0]
+        assert timeline.idle() and timeline._frames == [0, 25]
+        assert not timeline.idle()
+        # explosions to come are kept from the previous checkpoint
+        waiting = [i for i, x in enumerate(effects) if x._start_frame > 25]
+        assert waiting and all(timeline._checkpoints[1][0][i] is timeline._checkpoints[0][0][i] for i in waiting)
+
+    def test_end(self):
+        canvas = _canvases()[0]
+        timeline = Timeline(canvas, _effects(canvas, 'Typing'))
+        # a character typed a frame
+        assert timeline.end == len('Typed ' * 40)
+        timeline = Timeline(canvas, _effects(canvas, 'Fire'))
+        assert timeline.seek(timeline.end) == timeline.end > 0
+
+    def test_scrub(self, monkeypatch):
+        # the list mode, scrubbed with keys, on a stopped clock
+        monkeypatch.setattr(termslides.clock, 'perf_counter', lambda: 100.0)
+        screen = HeadlessScreen(30, 120)
+        screen.draw_next_frame = MethodType(patch_draw_next_frame, screen)
+        screen._clock = Clock(FRAME_TIME)
+        slides = compile_slides(DECK)
+        slide_view = SlideView(screen, slides, SEED)
+        title_view = TitleView(screen)
+        list_view = ListView(screen, slides, slide_view, NoteView(screen, slides), title_view)
+        screen.set_scenes([Scene([title_view, slide_view, list_view], -1)])
+        screen.draw_next_frame()
+        screen.draw_next_frame()
+        assert screen._frame == 2 == slide_view._timeline.frame_no
+
+        for key, frame_no in [(Screen.KEY_RIGHT, 2 + SCRUB_FRAMES), (Screen.KEY_RIGHT, 3 + SCRUB_FRAMES * 2),
+                              (Screen.KEY_LEFT, 4 + SCRUB_FRAMES), (Screen.KEY_END, 240), (Screen.KEY_HOME, 0)]:
+            screen.feed(KeyboardEvent(key))
+            screen.draw_next_frame()
+            # seeked, then the next frame played at once
+            assert screen._frame == frame_no + 1 == slide_view._timeline.frame_no
+
+    @pytest.mark.benchmark
+    def test_benchmark(self):
+        canvas = _canvases()[-1]
+        print('\n')
+        print('Seek to a frame of a slide, ms')
+        print('#' * 50)
+        for name in DECK:
+            effects = _effects(canvas, name)
+            timeline = Timeline(canvas, effects)
+            started = perf_counter()
+            timeline.seek(FRAMES)
+            first = perf_counter() - started
+            started = perf_counter()
+            for frame_no in range(FRAMES - 1, FRAMES - 41, -1):
+                timeline.seek(frame_no)
+            scrub = (perf_counter() - started) / 40
+            print(f'{name:<8} first {first * 1000:8.2f}  back a frame {scrub * 1000:8.2f}')
+            assert scrub * 5 < first
+
+    @pytest.mark.benchmark
+    def test_frame_budget(self):
+        # the preview of a particle slide on a large terminal
+        print('\n')
+        print('Frames of an explosion previewed at 160x40, ms')
+        print('#' * 50)
+        for canvas in _canvases(44, 164):
+            effects = _effects(canvas, 'Boom')
+            timeline = Timeline(canvas, effects)
+            frames, idles, seeks = [], [], []
+            # without the pauses of the garbage collector, as timeit does
+            gc.disable()
+            try:
+                for frame_no in range(1, FRAMES + 1):
+                    started = perf_counter()
+                    for effect in effects:
+                        effect.update(frame_no)
+                    timeline.played(frame_no)
+                    canvas.refresh()
+                    frames.append(perf_counter() - started)
+                    started = perf_counter()
+                    timeline.idle()
+                    idles.append(perf_counter() - started)
+                for frame_no in range(FRAMES - SCRUB_FRAMES - 3, 0, -SCRUB_FRAMES):
+                    started = perf_counter()
+                    timeline.seek(frame_no)
+                    seeks.append(perf_counter() - started)
+            finally:
+                gc.enable()
+            print(f'{type(canvas).__name__:<12} frame {max(frames) * 1000:6.2f}  idle {max(idles) * 1000:6.2f}  '
+                  f'scrub {max(seeks) * 1000:6.2f}')
+            # no checkpoint in the frames, a few ms each in the spare time
+            assert max(frames) < FRAME_TIME
+            assert max(idles) < FRAME_TIME / 2
+            assert max(seeks) < FRAME_TIME
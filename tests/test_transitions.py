@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+import random
+from time import perf_counter
+
+import pytest
+from asciimatics.effects import Matrix, Wipe
+from asciimatics.event import KeyboardEvent
+from asciimatics.exceptions import NextScene
+
+from termslides.effects import MatrixSlide, WipeSlide
+from termslides.headless import HeadlessScreen
+
+# terminal sizes, up to a 4K screen with a small font
+SIZES = [(24, 80), (50, 200), (60, 480), (90, 960)]
+FRAMES = 40
+
+
+def _paint(screen):
+    screen.clear()
+    for y in range(screen.height):
+        screen.print_at('中文 text ' * (screen.width // 9), y % 3, y)
+
+
+def _cost(effect, frames=FRAMES):
+    random.seed(2020)
+    effect.reset()
+    if isinstance(effect, Wipe):
+        effect._y = 0
+    started = perf_counter()
+    for frame_no in range(frames):
+        effect._update(frame_no)
+    return (perf_counter() - started) / frames
+
+
+def _whole(row):
+    # no half of a double-width glyph is left
+    return all((cell[4] == 2) == (i + 1 < len(row) and row[i + 1][4] == 0) for i, cell in enumerate(row))
+
+
+class TestTransitions(object):
+
+    def test_wipe_cells(self):
+        for unicode_aware in [True, False]:
+            screen = HeadlessScreen(12, 40, unicode_aware=unicode_aware)
+            expected = []
+            for effect in [Wipe(screen), WipeSlide(screen)]:
+                _paint(screen)
+                effect.reset()
+                effect._y = 3
+                effect._go = True
+                for frame_no in range(12):
+                    effect._update(frame_no)
+                expected.append([list(row) for row in screen._buffer._double_buffer])
+            assert expected[0] == expected[1]
+
+    def test_matrix_trails(self):
+        pytest.importorskip('numpy')
+        screen = HeadlessScreen(20, 60)
+        random.seed(2020)
+        effect = MatrixSlide(screen)
+        _paint(screen)
+        effect.reset()
+        trails = effect._trails
+        for frame_no in range(0, 80, 2):
+            y, clear, life, rate = trails._y.copy(), trails._clear.copy(), trails._life.copy(), trails._rate.copy()
+            effect._update(frame_no)
+            rows = screen._buffer._double_buffer
+            for x in range(screen.width):
+                for dy in [0, 1, 2, 4, 5]:
+                    if not 0 <= y[x] + dy < screen.height or (clear[x] and dy > 2):
+                        continue
+                    c, fg, attr, bg, width = rows[y[x] + dy][x]
+                    if clear[x]:
+                        assert (c, fg, attr, bg, width) == (' ', 7, 0, 0, 1)
+                    else:
+                        assert (fg, attr, bg, width) == (2, 0 if dy < 3 else 1, 0, 1) and 32 <= ord(c) <= 126
+            moving = life > 1
+            assert (trails._y[moving] == y[moving] + rate[moving]).all()
+            assert (trails._clear[moving] == clear[moving]).all()
+            assert (trails._clear[~moving] != clear[~moving]).all()
+            assert ((trails._rate >= 1) & (trails._rate <= 2)).all()
+            assert all(_whole(row) for row in rows)
+
+        # repeatable with the same seed
+        random.seed(2020)
+        again = MatrixSlide(screen)
+        again.reset()
+        for frame_no in range(0, 80, 2):
+            again._update(frame_no)
+        assert (again._trails._y == trails._y).all() and (again._trails._life == trails._life).all()
+
+    def test_matrix_scrolled(self):
+        # after a "scroll" start animation, the trails fall down the rows shown,
+        # as the stock ones which print at "start_line" plus their row
+        pytest.importorskip('numpy')
+        for cls in [Matrix, MatrixSlide]:
+            screen = HeadlessScreen(20, 60)
+            screen.scroll(screen.height)
+            for y in range(screen.height):
+                screen.print_at('#' * screen.width, 0, screen.start_line + y)
+            random.seed(2020)
+            effect = cls(screen)
+            effect.reset()
+            for frame_no in range(0, 40, 2):
+                if cls is Matrix:
+                    heads = [trail._y for trail in effect._chars]
+                else:
+                    heads = effect._trails._y.tolist()
+                before = [list(row) for row in screen._buffer._double_buffer]
+                effect._update(frame_no)
+                rows = screen._buffer._double_buffer
+                changed = [(x, y) for y in range(screen.height) for x in range(screen.width)
+                           if rows[y][x] != before[y][x]]
+                assert changed
+                assert all(heads[x] <= y <= heads[x] + 5 for x, y in changed), cls
+
+    def test_ending(self):
+        screen = HeadlessScreen(10, 30)
+        for cls, count in [(MatrixSlide, 100), (WipeSlide, 20)]:
+            called = []
+            effect = cls(screen, is_ending=True, next_fn=lambda: called.append(True)) if cls is MatrixSlide else \
+                cls(screen, next_fn=lambda: called.append(True))
+            effect.reset()
+            assert effect.stop_frame == count
+            # waits for a key
+            for frame_no in range(5):
+                effect._update(frame_no)
+            assert effect._current == 0
+            assert effect.process_event(KeyboardEvent(ord('a'))) is not None
+            assert effect.process_event(KeyboardEvent(ord(' '))) is None
+            assert effect.process_event(KeyboardEvent(ord(' '))) is not None
+            for frame_no in range(count):
+                effect._update(frame_no)
+            assert not called
+            effect._update(count)
+            assert called == [True] and effect._current == 0 and not effect._go
+
+            effect = cls(screen, is_ending=True) if cls is MatrixSlide else cls(screen)
+            effect.reset()
+            effect._go = True
+            for frame_no in range(count):
+                effect._update(frame_no)
+            with pytest.raises(NextScene):
+                effect._update(count)
+
+        # starting animation plays at once
+        effect = MatrixSlide(screen, duration=4)
+        effect.reset()
+        assert effect.process_event(KeyboardEvent(ord(' '))) is not None
+        for frame_no in range(10):
+            effect._update(frame_no)
+        assert effect._current == 4
+
+    @pytest.mark.benchmark
+    def test_benchmark(self):
+        pytest.importorskip('numpy')
+        print('\n')
+        print('Ending transition frame time by terminal size, ms')
+        print('#' * 50)
+        ratios = {}
+        for height, width in SIZES:
+            screen = HeadlessScreen(height, width)
+            for name, before, after in [('matrix', Matrix(screen), MatrixSlide(screen)),
+                                        ('wipe', Wipe(screen), WipeSlide(screen))]:
+                _paint(screen)
+                before = _cost(before)
+                _paint(screen)
+                after = _cost(after)
+                print(f'{name:<8}{height:>3} x {width:<4} asciimatics {before * 1000:8.2f}'
+                      f'  termslides {after * 1000:8.2f}  x{before / after:.1f}')
+                ratios[name] = before / after
+        # on the widest screen
+        assert ratios['matrix'] > 3 and ratios['wipe'] > 10
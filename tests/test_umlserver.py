@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from termslides.umlserver import PlantUMLServer, encode
+
+DELAY = 0.2
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Stands for a PlantUML server, answering with the encoded source after a delay.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            fail = server.failures > 0
+            server.failures -= 1
+        time.sleep(server.delay)
+        status, body = (503, b'busy') if fail else (200, self.path.rsplit('/', 1)[-1].encode('ascii'))
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # accept all the workers connecting at once
+    request_queue_size = 64
+
+
+@pytest.fixture
+def server():
+    server = _Server(('127.0.0.1', 0), _Handler)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.failures = 0
+    server.delay = DELAY
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestPlantUMLServer(object):
+
+    def test_encode(self):
+        # the example of the PlantUML text encoding documentation
+        assert encode('Bob -> Alice : hello') == 'SyfFKj2rKt3CoKnELR1Io4ZDoSa70000'
+
+    def test_parallel(self, server):
+        client = PlantUMLServer(f'http://127.0.0.1:{server.server_port}', workers=50)
+        texts = [f'A -> B : {i}' for i in range(50)]
+        results = [x.result() for x in client.prefetch(texts)]
+        assert results == [encode(x).encode('ascii') for x in texts]
+
+        # results are kept, and connections are kept alive
+        assert client.processes(texts[0]) == results[0]
+        assert server.requests == 50
+        server.delay = 0
+        client.prefetch([f'B -> C : {i}' for i in range(50)])
+        connections = client.connections
+        assert [x.result() for x in client.prefetch([f'C -> D : {i}' for i in range(50)])]
+        assert client.connections == connections <= 50
+
+    @pytest.mark.benchmark
+    def test_parallel_benchmark(self, server):
+        client = PlantUMLServer(f'http://127.0.0.1:{server.server_port}', workers=50)
+        texts = [f'A -> B : {i}' for i in range(50)]
+        start = time.perf_counter()
+        assert all(x.result() for x in client.prefetch(texts))
+        elapsed = time.perf_counter() - start
+        print('\n')
+        print(f'PlantUML prefetch, {len(texts)} diagrams at {DELAY * 1000:.0f}ms each')
+        print('#' * 50)
+        print(f'Elapsed ms   {elapsed * 1000:8.1f}')
+        # about one round trip rather than fifty
+        assert elapsed < DELAY * 5
+
+    def test_retries(self, server):
+        server.delay = 0
+        server.failures = 2
+        client = PlantUMLServer(f'http://127.0.0.1:{server.server_port}', retries=2, backoff=0.01)
+        assert client.processes('A -> B') == encode('A -> B').encode('ascii')
+        assert server.requests == 3
+
+        server.failures = 3
+        with pytest.raises(ConnectionError):
+            client.processes('B -> C')
+
+    def test_timeout(self, server):
+        server.delay = 1
+        client = PlantUMLServer(f'http://127.0.0.1:{server.server_port}', timeout=0.1, retries=1, backoff=0.01)
+        start = time.perf_counter()
+        with pytest.raises(ConnectionError):
+            client.processes('A -> B')
+        assert time.perf_counter() - start < 0.9